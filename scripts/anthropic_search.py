@@ -12,21 +12,33 @@ Claude Messages API의 web_search + web_fetch 서버 도구를 활용한 검색
     python3 scripts/anthropic_search.py "검색어" --mode search|verify|deep
     python3 scripts/anthropic_search.py "검색어" --fetch  # 검색 후 상위 결과 페치
     python3 scripts/anthropic_search.py "검색어" --dynamic  # 동적 필터링 (Opus 4.6/Sonnet 4.6)
+    python3 scripts/anthropic_search.py "검색어" --max-searches 8  # 적응형 max_uses 대신 고정값
+    python3 scripts/anthropic_search.py "검색어" --mode deep --max-continuations 8  # 끊긴 응답 이어받기 한도
 """
 
 import argparse
 import json
-import os
+import re
 import sys
 from datetime import datetime
 
 
-def get_api_key():
-    key = os.environ.get("ANTHROPIC_API_KEY")
-    if not key:
+MAX_TOKENS = 4096
+# 이 stop_reason으로 끝나면 이어받기 요청 (그 밖의 end_turn, stop_sequence, refusal 등은 종료)
+CONTINUE_STOP_REASONS = {"pause_turn", "max_tokens"}
+MAX_CONTINUATIONS = 5
+_CONTINUE_PATTERN = re.compile(rb'"stop_reason"\s*:\s*"(?:pause_turn|max_tokens)"')
+
+
+def get_key_pool():
+    """ANTHROPIC_API_KEY / ANTHROPIC_API_KEYS / ANTHROPIC_API_KEY_FILE로 구성한 키 풀 (key_pool 참고)"""
+    from key_pool import get_pool
+
+    pool = get_pool("anthropic")
+    if pool is None:
         print("ERROR: ANTHROPIC_API_KEY 환경 변수가 설정되지 않았습니다.", file=sys.stderr)
         sys.exit(1)
-    return key
+    return pool
 
 
 def search(
@@ -34,13 +46,17 @@ def search(
     mode: str = "search",
     lang: str = "both",
     model: str = "claude-sonnet-4-6",
-    max_search_uses: int = 5,
+    max_search_uses: int | None = None,
+    max_fetch_uses: int = 5,
     allowed_domains: list[str] | None = None,
     blocked_domains: list[str] | None = None,
     enable_fetch: bool = False,
     dynamic_filtering: bool = False,
     user_location: dict | None = None,
-) -> dict:
+    max_continuations: int | None = None,
+    on_event=None,
+    raw_bytes: bool = False,
+) -> dict | bytes:
     """
     Claude Messages API + web_search / web_fetch 서버 도구를 사용한 검색.
 
@@ -51,11 +67,33 @@ def search(
     - web_fetch_20260209: 동적 필터링 지원
 
     동적 필터링은 code-execution-web-tools-2026-02-09 베타 헤더 필요.
+
+    max_search_uses=None이면 모드별 검색 수익 기록으로 max_uses를 정합니다 (anthropic_tuning).
+    값을 지정하면 그대로 사용하며, 어느 경우든 이번 응답의 검색 수익을 기록에 누적합니다.
+
+    stop_reason이 pause_turn(서버 도구 실행 중 일시 중지) 또는 max_tokens(출력 한도 도달)이면
+    지금까지의 assistant content를 대화에 다시 보내 이어서 생성합니다 (max_continuations회까지,
+    None이면 MAX_CONTINUATIONS). 이어받는 요청의 max_uses는 앞 턴들이 쓴 검색 수를 뺀 값이고,
+    남은 검색이 없으면 pause_turn은 더 이어받지 않고, max_tokens는 tool_choice none으로 본문만 마저 받습니다. 반환 응답의 content/usage는 모든 턴을 합친 값이며,
+    max_tokens로 끊긴 텍스트 블록은 다음 턴의 첫 텍스트와 이어 붙입니다.
+
+    on_event(name, **fields): 진행 이벤트 콜백 (선택)
+    - "first_token": 응답 첫 바이트 수신 (비스트리밍 호출이므로 헤더 도착 시점)
+    - "response": 응답 본문 수신 완료 (bytes, 턴마다)
+    - "continuation": 이어받기 요청 시작 (turn, stop_reason)
+
+    raw_bytes=True이면 JSON 파싱 없이 응답 본문(bytes)을 그대로 반환합니다 (postprocess 파이프라인용).
+    이때는 검색 수익을 기록하지 않으므로 호출자가 anthropic_tuning.record_steps로 기록합니다.
     """
     import urllib.request
     import urllib.error
 
-    api_key = get_api_key()
+    import anthropic_tuning
+
+    key_pool = get_key_pool()
+
+    if max_search_uses is None:
+        max_search_uses = anthropic_tuning.choose_max_uses(mode)
 
     # 모드별 시스템 프롬프트
     system_prompts = {
@@ -112,7 +150,7 @@ def search(
         fetch_tool = {
             "type": fetch_tool_type,
             "name": "web_fetch",
-            "max_uses": 5,
+            "max_uses": max_fetch_uses,
             "citations": {"enabled": True},
         }
         if allowed_domains:
@@ -121,7 +159,7 @@ def search(
 
     payload = {
         "model": model,
-        "max_tokens": 4096,
+        "max_tokens": MAX_TOKENS,
         "system": system_prompt,
         "messages": [
             {"role": "user", "content": user_query},
@@ -131,24 +169,71 @@ def search(
 
     headers = {
         "Content-Type": "application/json",
-        "x-api-key": api_key,
         "anthropic-version": "2023-06-01",
     }
 
     if dynamic_filtering:
         headers["anthropic-beta"] = "code-execution-web-tools-2026-02-09"
 
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        "https://api.anthropic.com/v1/messages",
-        data=data,
-        headers=headers,
-        method="POST",
-    )
+    def request(payload: dict) -> bytes:
+        data = json.dumps(payload).encode("utf-8")
+
+        def make_request(api_key: str) -> urllib.request.Request:
+            return urllib.request.Request(
+                "https://api.anthropic.com/v1/messages",
+                data=data,
+                headers={**headers, "x-api-key": api_key},
+                method="POST",
+            )
+
+        with key_pool.urlopen(make_request, timeout=180) as resp:
+            if on_event and len(payload["messages"]) == 1:
+                on_event("first_token")
+            body = resp.read()
+        if on_event:
+            on_event("response", bytes=len(body))
+        return body
+
+    if max_continuations is None:
+        max_continuations = MAX_CONTINUATIONS
 
     try:
-        with urllib.request.urlopen(req, timeout=180) as resp:
-            result = json.loads(resp.read().decode("utf-8"))
+        body = request(payload)
+        # 끝난 응답(대부분)은 파싱하지 않고 그대로 반환 (postprocess 파이프라인용)
+        if raw_bytes and not _CONTINUE_PATTERN.search(body):
+            return body
+        result = json.loads(body.decode("utf-8"))
+        turn = 0
+        while result.get("stop_reason") in CONTINUE_STOP_REASONS and turn < max_continuations:
+            assistant_content = continuation_content(result.get("content", []), result["stop_reason"])
+            if not assistant_content:
+                break
+            # max_uses는 요청마다 새로 적용되므로 지금까지 쓴 검색 수를 빼서 전체 한도를 지킴
+            used = result.get("usage", {}).get("server_tool_use", {}).get("web_search_requests", 0)
+            remaining = max_search_uses - used
+            if remaining > 0:
+                web_search_tool["max_uses"] = remaining
+            elif result["stop_reason"] == "pause_turn":
+                print(f"   ⏹ 검색 한도({max_search_uses}회)를 모두 사용해 이어받지 않습니다", file=sys.stderr)
+                break
+            else:
+                # max_tokens로 끊긴 본문은 검색 없이 마저 쓰게 함 (이전 턴의 도구 블록 때문에 도구 정의는 유지)
+                payload["tool_choice"] = {"type": "none"}
+            turn += 1
+            if on_event:
+                on_event("continuation", turn=turn, stop_reason=result["stop_reason"])
+            print(
+                f"   ↪️ Claude 응답 이어받기 ({result['stop_reason']}, {turn}/{max_continuations})",
+                file=sys.stderr,
+            )
+            payload["messages"] = [
+                {"role": "user", "content": user_query},
+                {"role": "assistant", "content": assistant_content},
+            ]
+            part = json.loads(request(payload).decode("utf-8"))
+            result = merge_turns(result, part)
+        if raw_bytes:
+            return json.dumps(result, ensure_ascii=False).encode("utf-8")
     except urllib.error.HTTPError as e:
         error_body = e.read().decode("utf-8") if e.fp else ""
         print(f"ERROR: Anthropic API 호출 실패 (HTTP {e.code}): {error_body}", file=sys.stderr)
@@ -157,38 +242,86 @@ def search(
         print(f"ERROR: 네트워크 오류: {e.reason}", file=sys.stderr)
         sys.exit(1)
 
+    try:
+        anthropic_tuning.record_yield(mode, result, max_search_uses)
+    except OSError as e:
+        print(f"   ⚠️ 검색 수익 기록 실패: {e}", file=sys.stderr)
+
     return result
 
 
-def extract_response(result: dict) -> str:
+def continuation_content(content: list, stop_reason: str) -> list:
     """
-    Claude Messages API 응답에서 텍스트와 인용 추출.
+    이어받기 요청에 다시 보낼 assistant content.
+    pause_turn은 그대로 보내 서버가 진행 중인 도구 호출을 이어가게 하고, max_tokens면 끝의
+    결과 없는 server_tool_use(출력 한도로 끊긴 도구 호출)를 뺍니다.
+    마지막 텍스트 블록의 끝 공백은 제거합니다 (API가 끝 공백이 있는 assistant 메시지를 거부함).
+    """
+    content = list(content)
+    while stop_reason == "max_tokens" and content and content[-1].get("type") == "server_tool_use":
+        content.pop()
+    if content and content[-1].get("type") == "text":
+        last = {**content[-1], "text": content[-1].get("text", "").rstrip()}
+        if last["text"]:
+            content[-1] = last
+        else:
+            content.pop()
+    return content
+
+
+def merge_turns(result: dict, part: dict) -> dict:
+    """
+    이어받은 턴의 응답(part)을 누적 응답에 합침: content 이어 붙이기, usage 합산,
+    stop_reason 등 나머지 필드는 마지막 턴 값 사용.
+    이전 턴이 max_tokens로 끊겼으면 이어지는 첫 텍스트 블록을 마지막 텍스트 블록에 붙입니다.
+    """
+    content = list(result.get("content", []))
+    new_blocks = list(part.get("content", []))
+    if (
+        result.get("stop_reason") == "max_tokens"
+        and content and new_blocks
+        and content[-1].get("type") == "text" and new_blocks[0].get("type") == "text"
+    ):
+        first = new_blocks.pop(0)
+        merged = {**content[-1], "text": content[-1].get("text", "") + first.get("text", "")}
+        citations = (content[-1].get("citations") or []) + (first.get("citations") or [])
+        if citations:
+            merged["citations"] = citations
+        content[-1] = merged
+    content += new_blocks
+    return {**result, **part, "content": content, "usage": _add_usage(result.get("usage", {}), part.get("usage", {}))}
+
+
+def _add_usage(a: dict, b: dict) -> dict:
+    """usage 합산 (숫자는 더하고 server_tool_use 같은 하위 객체는 재귀로 합산, 나머지는 마지막 값)"""
+    total = dict(a)
+    for key, value in b.items():
+        if isinstance(value, bool) or value is None:
+            total[key] = value
+        elif isinstance(value, (int, float)) and isinstance(total.get(key, 0), (int, float)):
+            total[key] = (total.get(key) or 0) + value
+        elif isinstance(value, dict) and isinstance(total.get(key), dict):
+            total[key] = _add_usage(total[key], value)
+        else:
+            total[key] = value
+    return total
+
+
+def extract_sources(result: dict) -> dict:
+    """
+    Claude Messages API 응답에서 인용과 검색 결과 소스를 구조화하여 추출.
 
-    응답 content 배열 구조:
-    - type: "text" → 텍스트 (citations 배열 포함 가능)
-      - citation.type: "web_search_result_location" → url, title, cited_text
-    - type: "server_tool_use" → 검색/페치 실행 (name: "web_search" | "web_fetch")
-    - type: "web_search_tool_result" → 검색 결과
-      - content[].type: "web_search_result" → url, title, page_age, encrypted_content
-    - type: "web_fetch_tool_result" → 페치 결과
+    반환: {"citations": [{url, title, cited_text}], "sources": [{url, title, page_age}]}
+    (중복 포함, 응답 순서 유지)
     """
-    output_parts = []
     citations = []
     search_results = []
 
-    content_blocks = result.get("content", [])
-
-    for block in content_blocks:
+    for block in result.get("content", []):
         block_type = block.get("type")
 
-        # 텍스트 블록 (인용 포함 가능)
         if block_type == "text":
-            text = block.get("text", "")
-            if text.strip():
-                output_parts.append(text)
-
-            # 인용 추출
-            for citation in block.get("citations", []):
+            for citation in block.get("citations") or []:
                 if citation.get("type") == "web_search_result_location":
                     citations.append({
                         "url": citation.get("url", ""),
@@ -202,7 +335,6 @@ def extract_response(result: dict) -> str:
                         "cited_text": citation.get("cited_text", ""),
                     })
 
-        # 검색 결과
         elif block_type == "web_search_tool_result":
             for item in block.get("content", []):
                 if isinstance(item, dict) and item.get("type") == "web_search_result":
@@ -212,6 +344,64 @@ def extract_response(result: dict) -> str:
                         "page_age": item.get("page_age", ""),
                     })
 
+    return {"citations": citations, "sources": search_results}
+
+
+def extract_spans(result: dict) -> dict:
+    """
+    답변 본문과 인용 구간 추출 (span_index용).
+
+    Messages API는 인용이 붙은 문장을 별도 text 블록으로 나누므로, 인용이 있는 블록 전체를
+    하나의 구간으로 봅니다. 본문 결합 방식은 extract_response와 같습니다 (공백 블록 제외, 줄바꿈 연결).
+    반환 형식은 openai_search.extract_spans와 같습니다.
+    """
+    parts, spans, sources, source_ids = [], [], [], {}
+    offset = 0  # 다음 part의 본문 내 시작 위치
+    for block in result.get("content", []):
+        if block.get("type") != "text" or not block.get("text", "").strip():
+            continue
+        base = offset
+        parts.append(block["text"])
+        offset += len(block["text"]) + 1
+        ids = []
+        for citation in block.get("citations") or []:
+            url = citation.get("url", "")
+            if not url:
+                continue
+            if url not in source_ids:
+                source_ids[url] = len(sources)
+                sources.append({"title": citation.get("title", ""), "url": url})
+            if source_ids[url] not in ids:
+                ids.append(source_ids[url])
+        if ids:
+            spans.append({"start": base, "end": base + len(block["text"]), "sources": ids, "confidence": []})
+    return {"text": "\n".join(parts), "sources": sources, "spans": spans}
+
+
+def extract_response(result: dict) -> str:
+    """
+    Claude Messages API 응답에서 텍스트와 인용 추출.
+
+    응답 content 배열 구조:
+    - type: "text" → 텍스트 (citations 배열 포함 가능)
+      - citation.type: "web_search_result_location" → url, title, cited_text
+    - type: "server_tool_use" → 검색/페치 실행 (name: "web_search" | "web_fetch")
+    - type: "web_search_tool_result" → 검색 결과
+      - content[].type: "web_search_result" → url, title, page_age, encrypted_content
+    - type: "web_fetch_tool_result" → 페치 결과
+    """
+    output_parts = []
+
+    for block in result.get("content", []):
+        if block.get("type") == "text":
+            text = block.get("text", "")
+            if text.strip():
+                output_parts.append(text)
+
+    refs = extract_sources(result)
+    citations = refs["citations"]
+    search_results = refs["sources"]
+
     text = "\n".join(output_parts)
 
     # 인용
@@ -273,8 +463,14 @@ def main():
     parser.add_argument(
         "--max-searches",
         type=int,
+        default=None,
+        help="최대 검색 횟수 (기본: 모드별 검색 수익 기록으로 자동 결정, 기록이 부족하면 5)",
+    )
+    parser.add_argument(
+        "--max-fetches",
+        type=int,
         default=5,
-        help="최대 검색 횟수 (기본: 5)",
+        help="--fetch 사용 시 최대 페치 횟수 (기본: 5)",
     )
     parser.add_argument(
         "--domains",
@@ -296,6 +492,29 @@ def main():
         action="store_true",
         help="동적 필터링 활성화 (Opus 4.6/Sonnet 4.6 전용)",
     )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="유사 검색어의 최근 결과를 재사용하지 않고 항상 새로 검색",
+    )
+    parser.add_argument(
+        "--reuse-hours",
+        type=float,
+        default=6.0,
+        help="유사 검색어 결과 재사용 기간(시간, 0이면 재사용 안 함, 기본: 6)",
+    )
+    parser.add_argument(
+        "--similarity",
+        type=float,
+        default=0.6,
+        help="재사용할 최소 검색어 유사도 0~1 (기본: 0.6)",
+    )
+    parser.add_argument(
+        "--max-continuations",
+        type=int,
+        default=None,
+        help=f"pause_turn/max_tokens로 끊긴 응답을 이어받을 최대 횟수 (기본: {MAX_CONTINUATIONS}, 0이면 이어받지 않음)",
+    )
     parser.add_argument("--raw", action="store_true", help="원본 JSON 출력")
 
     args = parser.parse_args()
@@ -305,16 +524,25 @@ def main():
 
     print(f"🔍 Claude Web Search: '{args.query}' (mode={args.mode}, model={args.model})", file=sys.stderr)
 
-    result = search(
+    from query_index import search_with_reuse
+
+    result, _ = search_with_reuse(
+        "anthropic",
+        search,
         args.query,
+        fresh=args.fresh,
+        threshold=args.similarity,
+        max_age_hours=args.reuse_hours,
         mode=args.mode,
         lang=args.lang,
         model=args.model,
         max_search_uses=args.max_searches,
+        max_fetch_uses=args.max_fetches,
         allowed_domains=allowed_domains,
         blocked_domains=blocked_domains,
         enable_fetch=args.fetch,
         dynamic_filtering=args.dynamic,
+        max_continuations=args.max_continuations,
     )
 
     if args.raw:
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Anthropic web_search max_uses 적응형 조정
+모드별로 "검색을 한 번 더 했을 때 새로 얻은 소스/인용 수"(한계 수익)를 기록하고,
+한계 수익이 목표치 이상인 지점까지만 검색하도록 max_uses를 고릅니다.
+
+- i번째 web_search_tool_result 블록이 i번째 검색 결과
+- 새 소스: 이전 검색에서 나오지 않은 정규화 URL
+- 새 인용: 본문 인용 중 그 URL을 처음 찾아낸 검색에 귀속
+- 수익 = 새 소스 + CITATION_WEIGHT x 새 인용
+
+기록이 충분하지 않으면 기본값(5)을 쓰고, 마지막 관측 지점에서도 수익이 목표 이상이면
+한 번 더 허용해 상한 너머를 탐색합니다. 그 밖에도 EXPLORE_EVERY번째 실행마다 한 회 더 허용해
+선택값 바로 다음 회차의 수익을 계속 재측정합니다 (수익이 회복되면 선택값이 다시 올라감).
+deep 모드는 기본값 아래로 내려가지 않습니다.
+
+사용법:
+    python3 scripts/anthropic_tuning.py            # 모드별 통계와 현재 선택값
+    python3 scripts/anthropic_tuning.py --reset
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+
+from source_utils import canonicalize_url
+
+CACHE_DIR = os.environ.get("REAL_RESEARCH_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "real-research")
+STATS_PATH = os.path.join(CACHE_DIR, "anthropic_search_yield.json")
+
+DEFAULT_MAX_USES = 5
+MAX_MAX_USES = 10
+MIN_USES = {"search": 2, "verify": 2, "deep": DEFAULT_MAX_USES}
+TARGET_YIELD = 1.5
+CITATION_WEIGHT = 2.0
+MIN_RUNS = 5
+MIN_SAMPLES_PER_STEP = 3
+EXPLORE_EVERY = 10
+
+_lock = threading.Lock()
+
+
+def search_yields(result: dict) -> list[dict]:
+    """응답 하나에서 검색 회차별 {"new_sources", "new_citations"} 목록"""
+    first_seen = {}
+    steps = []
+    for block in result.get("content", []):
+        if block.get("type") != "web_search_tool_result":
+            continue
+        items = block.get("content")
+        new_sources = 0
+        if isinstance(items, list):
+            for item in items:
+                if isinstance(item, dict) and item.get("type") == "web_search_result":
+                    key = canonicalize_url(item.get("url", ""))
+                    if key and key not in first_seen:
+                        first_seen[key] = len(steps)
+                        new_sources += 1
+        steps.append({"new_sources": new_sources, "new_citations": 0})
+
+    cited = set()
+    for block in result.get("content", []):
+        if block.get("type") != "text":
+            continue
+        for citation in block.get("citations") or []:
+            key = canonicalize_url(citation.get("url", ""))
+            if key in first_seen and key not in cited:
+                cited.add(key)
+                steps[first_seen[key]]["new_citations"] += 1
+    return steps
+
+
+def load_stats(path: str = STATS_PATH) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_stats(stats: dict, path: str = STATS_PATH) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+@contextlib.contextmanager
+def stats_lock(path: str = STATS_PATH):
+    """
+    통계 파일의 읽기-수정-쓰기 잠금. 같은 프로세스의 스레드뿐 아니라
+    동시에 실행한 다른 검색 프로세스의 갱신이 서로 덮어쓰지 않도록 path.lock에 flock을 겁니다.
+    """
+    with _lock:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(f"{path}.lock", "a") as lock_file:
+            try:
+                import fcntl
+            except ImportError:  # Windows: 프로세스 간 잠금 없이 스레드 잠금만
+                yield
+                return
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def record_yield(mode: str, result: dict, max_uses: int, path: str = STATS_PATH) -> None:
+    """응답의 회차별 수익을 모드 통계에 누적"""
+    steps = search_yields(result)
+    used = result.get("usage", {}).get("server_tool_use", {}).get("web_search_requests", len(steps))
+    record_steps(mode, steps, used, max_uses, path)
+
+
+def record_steps(mode: str, steps: list[dict], used: int, max_uses: int, path: str = STATS_PATH) -> None:
+    """
+    search_yields 결과(steps)와 사용한 검색 수를 모드 통계에 누적.
+    응답 파싱은 워커 프로세스에서 하고 기록은 부모 프로세스 한 곳에서 할 때 사용합니다 (postprocess).
+
+    max_uses 전에 스스로 멈춘 실행은 남은 회차를 수익 0으로 기록합니다. 더 검색할 수 있었는데
+    멈췄다는 것도 관측이므로, 빼 버리면 뒤 회차 평균이 끝까지 검색한 실행 쪽으로 치우칩니다.
+    """
+    if used < max_uses:
+        steps = steps + [{"new_sources": 0, "new_citations": 0}] * (max_uses - len(steps))
+    if not steps:
+        return
+    with stats_lock(path):
+        stats = load_stats(path)
+        entry = stats.setdefault(mode, {"runs": 0, "samples": [], "yield_sum": [], "cap_hits": 0})
+        entry["runs"] += 1
+        if used >= max_uses:
+            entry["cap_hits"] += 1
+        for i, step in enumerate(steps):
+            if i >= len(entry["samples"]):
+                entry["samples"].append(0)
+                entry["yield_sum"].append(0.0)
+            entry["samples"][i] += 1
+            entry["yield_sum"][i] += step["new_sources"] + CITATION_WEIGHT * step["new_citations"]
+        save_stats(stats, path)
+
+
+def marginal_yields(entry: dict) -> list[float]:
+    """회차별 평균 수익 (표본이 충분한 회차까지만)"""
+    yields = []
+    for count, total in zip(entry.get("samples", []), entry.get("yield_sum", [])):
+        if count < MIN_SAMPLES_PER_STEP:
+            break
+        yields.append(total / count)
+    return yields
+
+
+def choose_max_uses(mode: str, target: float = TARGET_YIELD, path: str = STATS_PATH) -> int:
+    """모드 통계로 max_uses 선택 (통계가 부족하면 DEFAULT_MAX_USES)"""
+    entry = load_stats(path).get(mode)
+    if not entry or entry["runs"] < MIN_RUNS:
+        return DEFAULT_MAX_USES
+
+    yields = marginal_yields(entry)
+    if not yields:
+        return DEFAULT_MAX_USES
+
+    chosen = 1
+    for i, value in enumerate(yields):
+        if value >= target:
+            chosen = i + 1
+    # 관측한 마지막 회차까지 수익이 목표 이상이고 상한에 자주 걸렸다면 한 회 더 탐색
+    if chosen == len(yields) and entry.get("cap_hits", 0) * 2 >= entry["runs"]:
+        chosen += 1
+    # 한 번 낮아진 값에 갇히지 않도록 EXPLORE_EVERY회마다 한 회 더 허용해 그 다음 회차 표본을 계속 모음
+    elif (entry["runs"] + 1) % EXPLORE_EVERY == 0:
+        chosen += 1
+
+    return max(MIN_USES.get(mode, 1), min(chosen, MAX_MAX_USES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Anthropic web_search max_uses 적응형 조정 통계")
+    parser.add_argument("--reset", action="store_true", help="누적 통계 삭제")
+    args = parser.parse_args()
+
+    if args.reset:
+        if os.path.exists(STATS_PATH):
+            os.remove(STATS_PATH)
+        print(f"🗑 통계 삭제: {STATS_PATH}", file=sys.stderr)
+        return
+
+    stats = load_stats()
+    for mode in ("search", "verify", "deep"):
+        entry = stats.get(mode, {"runs": 0})
+        yields = ", ".join(f"{y:.1f}" for y in marginal_yields(entry)) or "-"
+        print(f"{mode:7s} 실행 {entry['runs']:4d}회 · 회차별 평균 수익 [{yields}] → max_uses {choose_max_uses(mode)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+추출/보고서 생성 마이크로 벤치마크
+합성 프로바이더 응답(small/medium/huge)으로 extract_response, 소스 중복 제거,
+format_combined_report의 실행 시간과 최대 메모리를 측정하고 저장된 기준값과 비교합니다.
+
+- 크기: small(인용 20개, ~4KB) / medium(인용 500개, ~200KB) / huge(인용 5,000개, ~4MB)
+- 시간: 반복 실행의 중앙값 (ms), 메모리: tracemalloc 최대 할당량 (KiB, 별도 1회 실행)
+- 기기 차이는 고정 파이썬 작업량(보정 루프) 대비 비율로 정규화해서 비교
+- 기준값(benchmark_baseline.json)보다 --threshold 이상 느려지거나 메모리가 늘면 회귀로 표시하고 종료 코드 1
+
+사용법:
+    python3 scripts/benchmark.py                      # 기준값과 비교
+    python3 scripts/benchmark.py --sizes small,medium --filter openai
+    python3 scripts/benchmark.py --save-baseline      # 현재 결과를 기준값으로 저장
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from source_utils import collect_sources
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+SIZES = {
+    "small": {"citations": 20, "sources": 30, "paragraphs": 8, "repeat": 50},
+    "medium": {"citations": 500, "sources": 800, "paragraphs": 400, "repeat": 10},
+    "huge": {"citations": 5000, "sources": 8000, "paragraphs": 8000, "repeat": 3},
+}
+
+_WORDS = (
+    "GLP-1 위고비 semaglutide 임상 시험 결과 체중 감소 부작용 nausea study 2024 FDA 승인 "
+    "연구 meta-analysis cohort 환자 효과 risk ratio 15% 20% guideline 보고서 analysis market"
+).split()
+
+
+def make_text(rng: random.Random, paragraphs: int) -> str:
+    return "\n\n".join(
+        ". ".join(" ".join(rng.choice(_WORDS) for _ in range(12)) for _ in range(4)) + "."
+        for _ in range(paragraphs)
+    )
+
+
+def make_urls(rng: random.Random, count: int) -> list[tuple[str, str]]:
+    """(url, title) 목록. 약 20%는 추적 파라미터/www 변형으로 중복을 섞음"""
+    urls = []
+    for i in range(count):
+        base = f"https://site{rng.randrange(count // 4 + 1)}.example.com/article/{i}"
+        if urls and rng.random() < 0.2:
+            base = urls[rng.randrange(len(urls))][0].replace("https://", "https://www.") + "?utm_source=x"
+        urls.append((base, f"문서 {i} — " + " ".join(rng.choice(_WORDS) for _ in range(5))))
+    return urls
+
+
+def make_openai(size: dict, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    text = make_text(rng, size["paragraphs"])
+    citations = make_urls(rng, size["citations"])
+    sources = make_urls(rng, size["sources"])
+    step = max(1, len(text) // max(1, len(citations)))
+    return {
+        "output": [
+            {
+                "type": "web_search_call",
+                "status": "completed",
+                "action": {"sources": [{"title": t, "url": u} for u, t in sources]},
+            },
+            {
+                "type": "message",
+                "content": [{
+                    "type": "output_text",
+                    "text": text,
+                    "annotations": [
+                        {"type": "url_citation", "title": t, "url": u, "start_index": i * step, "end_index": i * step + step}
+                        for i, (u, t) in enumerate(citations)
+                    ],
+                }],
+            },
+        ],
+    }
+
+
+def make_anthropic(size: dict, seed: int = 2) -> dict:
+    rng = random.Random(seed)
+    sources = make_urls(rng, size["sources"])
+    citations = make_urls(rng, size["citations"])
+    content = []
+    per_search = max(1, len(sources) // 5)
+    for i in range(0, len(sources), per_search):
+        content.append({"type": "server_tool_use", "name": "web_search"})
+        content.append({
+            "type": "web_search_tool_result",
+            "content": [
+                {"type": "web_search_result", "url": u, "title": t, "page_age": "3 days ago"}
+                for u, t in sources[i:i + per_search]
+            ],
+        })
+    paragraphs = make_text(rng, size["paragraphs"]).split("\n\n")
+    for i, paragraph in enumerate(paragraphs):
+        block = {"type": "text", "text": paragraph}
+        cited = citations[i * len(citations) // len(paragraphs):(i + 1) * len(citations) // len(paragraphs)]
+        if cited:
+            block["citations"] = [
+                {"type": "web_search_result_location", "url": u, "title": t, "cited_text": paragraph[:200]}
+                for u, t in cited
+            ]
+        content.append(block)
+    return {
+        "content": content,
+        "usage": {"server_tool_use": {"web_search_requests": len(sources) // per_search}},
+        "stop_reason": "end_turn",
+    }
+
+
+def make_gemini(size: dict, seed: int = 3) -> dict:
+    rng = random.Random(seed)
+    text = make_text(rng, size["paragraphs"])
+    chunks = make_urls(rng, size["sources"])
+    step = max(1, len(text) // max(1, size["citations"]))
+    return {
+        "candidates": [{
+            "content": {"parts": [{"text": text}]},
+            "groundingMetadata": {
+                "webSearchQueries": [" ".join(rng.choice(_WORDS) for _ in range(4)) for _ in range(5)],
+                "groundingChunks": [{"web": {"uri": u, "title": t}} for u, t in chunks],
+                "groundingSupports": [
+                    {
+                        "segment": {"startIndex": i * step, "endIndex": i * step + step, "text": text[i * step:i * step + step]},
+                        "groundingChunkIndices": [rng.randrange(len(chunks)), rng.randrange(len(chunks))],
+                        "confidenceScores": [0.9, 0.7],
+                    }
+                    for i in range(size["citations"])
+                ],
+            },
+        }],
+    }
+
+
+def build_cases(size_name: str) -> dict:
+    """벤치마크 이름 → 인자 없는 함수"""
+    import anthropic_search
+    import gemini_search
+    import openai_search
+    from multi_search import format_combined_report
+
+    size = SIZES[size_name]
+    raws = {"OpenAI": make_openai(size), "Anthropic": make_anthropic(size), "Gemini": make_gemini(size)}
+    modules = {"OpenAI": openai_search, "Anthropic": anthropic_search, "Gemini": gemini_search}
+    results = [
+        {"provider": p, "status": "success", "text": modules[p].extract_response(raw), "raw": raw}
+        for p, raw in raws.items()
+    ]
+
+    cases = {}
+    for provider, raw in raws.items():
+        extract = modules[provider].extract_response
+        cases[f"{size_name}/extract_response/{provider.lower()}"] = lambda extract=extract, raw=raw: extract(raw)
+    cases[f"{size_name}/collect_sources"] = lambda: collect_sources(results)
+    cases[f"{size_name}/format_combined_report"] = lambda: format_combined_report("벤치마크", results, "deep")
+    return cases
+
+
+def calibrate(rounds: int = 5) -> float:
+    """기기 속도 보정용 고정 작업량 실행 시간 (ms, 중앙값)"""
+    def work():
+        data = {}
+        for i in range(200_000):
+            key = f"k{i % 5000}"
+            data[key] = data.get(key, "")[-20:] + str(i)
+        return sorted(data)
+
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        work()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def measure(func, repeat: int) -> dict:
+    func()  # 워밍업
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"median_ms": round(statistics.median(timings), 3), "peak_kib": round(peak / 1024, 1)}
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """회귀 목록. 시간은 보정 루프 대비 비율로 비교"""
+    scale = current["calibration_ms"] / baseline["calibration_ms"] if baseline.get("calibration_ms") else 1.0
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base:
+            continue
+        expected_ms = base["median_ms"] * scale
+        if result["median_ms"] > expected_ms * (1 + threshold) and result["median_ms"] - expected_ms > 0.05:
+            regressions.append(f"{name}: 시간 {result['median_ms']:.2f}ms (기준 {expected_ms:.2f}ms 보정값)")
+        if result["peak_kib"] > base["peak_kib"] * (1 + threshold) and result["peak_kib"] - base["peak_kib"] > 16:
+            regressions.append(f"{name}: 메모리 {result['peak_kib']:.0f}KiB (기준 {base['peak_kib']:.0f}KiB)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추출/보고서 생성 마이크로 벤치마크")
+    parser.add_argument("--sizes", default="small,medium,huge", help="측정할 크기 (콤마 구분, 기본: 전체)")
+    parser.add_argument("--filter", default=None, help="이름에 이 문자열이 포함된 벤치마크만 실행")
+    parser.add_argument("--repeat", type=int, default=None, help="반복 횟수 (기본: 크기별 설정값)")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"회귀 판정 기준 (기준값 대비 증가율, 기본: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="기준값 JSON 경로")
+    parser.add_argument("--save-baseline", action="store_true", help="현재 결과를 기준값으로 저장")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"알 수 없는 크기: {', '.join(unknown)} (선택: {', '.join(SIZES)})")
+
+    print("⏱ 보정 루프 측정 중...", file=sys.stderr)
+    current = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "calibration_ms": round(calibrate(), 3),
+        "results": {},
+    }
+    for size_name in sizes:
+        print(f"🧪 {size_name} 응답 생성 중...", file=sys.stderr)
+        for name, func in build_cases(size_name).items():
+            if args.filter and args.filter not in name:
+                continue
+            result = measure(func, args.repeat or SIZES[size_name]["repeat"])
+            current["results"][name] = result
+            print(f"   {name:45s} {result['median_ms']:10.2f} ms  {result['peak_kib']:10.1f} KiB", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(current, ensure_ascii=False, indent=2))
+
+    if args.save_baseline:
+        merged = current
+        if os.path.exists(args.baseline) and (args.filter or set(sizes) != set(SIZES)):
+            # 일부만 측정한 경우 나머지 항목의 기준값은 유지
+            with open(args.baseline, encoding="utf-8") as f:
+                previous = json.load(f)
+            merged = {**current, "results": {**previous.get("results", {}), **current["results"]}}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(merged, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"💾 기준값 저장: {args.baseline}", file=sys.stderr)
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️ 기준값 없음: {args.baseline} (--save-baseline으로 생성)", file=sys.stderr)
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(current, baseline, args.threshold)
+    if regressions:
+        print(f"🔴 회귀 {len(regressions)}건 (기준 대비 +{args.threshold:.0%} 초과)", file=sys.stderr)
+        for line in regressions:
+            print(f"   - {line}", file=sys.stderr)
+        sys.exit(1)
+    print(f"✅ 회귀 없음 (기준 대비 +{args.threshold:.0%} 이내)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
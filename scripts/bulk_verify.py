@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+주장 일괄 검증 (verify 모드 묶음 요청)
+주장마다 프로바이더별 verify 검색을 한 번씩 호출하는 대신(N×3회), 토큰 한도 안에서 여러 주장을
+한 요청에 묶어 주장별 판정(확인됨/부분확인/미확인/오류)과 근거 URL을 JSON으로 받습니다.
+
+- 묶음 크기: 입력 토큰 추정치(--max-input-tokens)와 프로바이더 출력 한도 대비 주장당 출력 추정치로 결정
+- 응답에서 빠졌거나 판정을 읽을 수 없는 주장은 더 작은 묶음으로 나눠 재요청 (마지막엔 1개씩)
+- 요청 자체가 실패하면 묶음을 반으로 나눠 재시도
+- 근거 URL은 프로바이더가 실제로 검색/인용한 소스와 대조해 grounded 여부 표시
+- 주장×프로바이더 판정은 캐시(CACHE_DIR/bulk_verify)에 저장해 같은 주장은 다시 묻지 않음
+
+사용법:
+    python3 scripts/bulk_verify.py "주장 1" "주장 2" --providers openai,anthropic
+    python3 scripts/bulk_verify.py --file claims.txt --output research-output/verify.md
+    python3 scripts/bulk_verify.py --from-report research-output/report.md --max-claims 50 --json
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+CACHE_DIR = os.environ.get("REAL_RESEARCH_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "real-research")
+VERIFY_CACHE_DIR = os.path.join(CACHE_DIR, "bulk_verify")
+
+VERDICTS = ["확인됨", "부분확인", "미확인", "오류"]
+# 보수적 순서 (합의 판정에서 동률이면 앞쪽 판정 사용)
+CONSERVATIVE_ORDER = ["오류", "미확인", "부분확인", "확인됨"]
+VERDICT_ALIASES = {
+    "confirmed": "확인됨",
+    "true": "확인됨",
+    "partially confirmed": "부분확인",
+    "partial": "부분확인",
+    "partially": "부분확인",
+    "unverified": "미확인",
+    "unconfirmed": "미확인",
+    "false": "오류",
+    "incorrect": "오류",
+    "error": "오류",
+}
+
+DEFAULT_MAX_INPUT_TOKENS = 1500
+DEFAULT_MAX_BATCH = 12
+OUTPUT_TOKENS_PER_CLAIM = 250
+PROMPT_OVERHEAD_TOKENS = 300
+# 프로바이더별 응답 본문에 쓸 수 있는 출력 토큰 (검색 요약/서론 여유분 제외)
+OUTPUT_BUDGET = {"openai": 6000, "anthropic": 3000, "gemini": 6000}
+MAX_SPLIT_ROUNDS = 3
+
+_JSON_BLOCK = re.compile(r"```(?:json)?\s*(\[.*?\])\s*```", re.DOTALL)
+_LINE_VERDICT = re.compile(r"^\s*[\[(#]?\s*(\d+)\s*[\]).:\-]\s*.*?(확인됨|부분확인|미확인|오류)", re.MULTILINE)
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 추정 (UTF-8 바이트/3: 한글 1자 ≈ 1토큰, 영문은 약간 과대 추정)"""
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def normalize_verdict(value) -> str | None:
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    for verdict in VERDICTS:
+        if verdict in value:
+            return verdict
+    return VERDICT_ALIASES.get(value.lower().rstrip("."))
+
+
+def pack_claims(claims: list[str], provider: str, max_input_tokens: int, max_batch: int) -> list[list[int]]:
+    """
+    주장 인덱스를 묶음으로 나눔 (순서 유지, 그리디).
+    입력 토큰 추정치와 출력 한도(OUTPUT_BUDGET / OUTPUT_TOKENS_PER_CLAIM) 중 작은 쪽을 넘지 않게 묶습니다.
+    """
+    per_output = max(1, OUTPUT_BUDGET.get(provider, 4000) // OUTPUT_TOKENS_PER_CLAIM)
+    limit = max(1, min(max_batch, per_output))
+    batches, current, used = [], [], PROMPT_OVERHEAD_TOKENS
+    for i, claim in enumerate(claims):
+        cost = estimate_tokens(claim) + 8
+        if current and (len(current) >= limit or used + cost > max_input_tokens):
+            batches.append(current)
+            current, used = [], PROMPT_OVERHEAD_TOKENS
+        current.append(i)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_prompt(claims: list[str]) -> str:
+    """묶음 검증 요청문. 번호는 1부터, 응답은 같은 번호의 JSON 배열"""
+    numbered = "\n".join(f"{n}. {claim}" for n, claim in enumerate(claims, 1))
+    return (
+        f"아래 {len(claims)}개 주장을 각각 웹 검색으로 검증하세요. 주장마다 원본 출처를 추적하고 "
+        "판정을 '확인됨/부분확인/미확인/오류' 중 하나로 분류하세요.\n\n"
+        f"{numbered}\n\n"
+        "응답 마지막에 모든 주장에 대한 결과를 아래 형식의 JSON 배열 하나로 ```json 코드 블록에 넣어 주세요. "
+        "번호(id)를 빠뜨리지 말고, 근거 URL은 실제로 확인한 페이지만 넣으세요.\n"
+        '```json\n[{"id": 1, "verdict": "확인됨", "reason": "한두 문장 근거", "sources": ["https://..."]}]\n```'
+    )
+
+
+def parse_verdicts(text: str, count: int) -> dict:
+    """
+    응답 본문 → {번호(1부터): {"verdict", "reason", "sources"}}.
+    JSON 배열을 우선 읽고, 없으면 "3. ... 확인됨" 형식의 줄을 읽습니다. 범위 밖 번호와 판정 없는 항목은 제외.
+    """
+    items = None
+    candidates = _JSON_BLOCK.findall(text)
+    if not candidates and "[" in text and "]" in text:
+        candidates = [text[text.find("["):text.rfind("]") + 1]]
+    for candidate in reversed(candidates):
+        try:
+            items = json.loads(candidate)
+            break
+        except json.JSONDecodeError:
+            continue
+
+    parsed = {}
+    if isinstance(items, list):
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            try:
+                number = int(item.get("id"))
+            except (TypeError, ValueError):
+                continue
+            verdict = normalize_verdict(item.get("verdict"))
+            if verdict and 1 <= number <= count:
+                sources = item.get("sources") or []
+                parsed[number] = {
+                    "verdict": verdict,
+                    "reason": str(item.get("reason") or "").strip(),
+                    "sources": [s for s in sources if isinstance(s, str) and s.startswith("http")],
+                }
+    if not parsed:
+        for number, verdict in _LINE_VERDICT.findall(text):
+            number = int(number)
+            if 1 <= number <= count and number not in parsed:
+                parsed[number] = {"verdict": verdict, "reason": "", "sources": []}
+    return parsed
+
+
+def claim_cache_key(provider: str, lang: str, claim: str) -> str:
+    return hashlib.sha256(json.dumps([provider, lang, claim], ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def cache_load(key: str) -> dict | None:
+    try:
+        with open(os.path.join(VERIFY_CACHE_DIR, f"{key}.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def cache_store(key: str, entry: dict) -> None:
+    os.makedirs(VERIFY_CACHE_DIR, exist_ok=True)
+    path = os.path.join(VERIFY_CACHE_DIR, f"{key}.json")
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class BulkVerifier:
+    """프로바이더 하나의 묶음 검증. 호출 수/재요청 수를 stats에 기록"""
+
+    def __init__(self, provider: str, lang: str, max_input_tokens: int, max_batch: int, policy: dict | None = None):
+        self.provider = provider
+        self.lang = lang
+        self.max_input_tokens = max_input_tokens
+        self.max_batch = max_batch
+        self.policy = policy
+        self.stats = {"calls": 0, "retried_claims": 0, "failed_calls": 0}
+        self._lock = threading.Lock()
+
+    def call(self, claims: list[str]) -> tuple[dict, str | None]:
+        """묶음 한 번 요청 → ({번호: 판정}, 오류 메시지 | None)"""
+        from multi_search import run_job
+        from source_utils import canonicalize_url, collect_sources
+
+        with self._lock:
+            self.stats["calls"] += 1
+        result = run_job(build_prompt(claims), self.provider, "verify", self.lang, None, None, policy=self.policy)
+        if result["status"] != "success":
+            with self._lock:
+                self.stats["failed_calls"] += 1
+            return {}, result["text"]
+        grounded = {s["canonical_url"] for s in collect_sources([result])}
+        parsed = parse_verdicts(result["text"], len(claims))
+        for entry in parsed.values():
+            entry["grounded_sources"] = [u for u in entry["sources"] if canonicalize_url(u) in grounded]
+        return parsed, None
+
+    def verify(self, claims: list[str], executor: concurrent.futures.Executor) -> list[dict | None]:
+        """
+        주장 목록 검증. 빠진 주장은 묶음 크기를 절반씩 줄여 최대 MAX_SPLIT_ROUNDS회 재요청하고,
+        마지막 라운드는 1개씩 요청합니다. 끝까지 판정을 못 받은 주장은 None.
+        """
+        results = [None] * len(claims)
+        remaining = list(range(len(claims)))
+        max_batch = self.max_batch
+        last_error = None
+        for round_no in range(MAX_SPLIT_ROUNDS + 1):
+            if not remaining:
+                break
+            if round_no == MAX_SPLIT_ROUNDS:
+                max_batch = 1
+            if round_no:
+                with self._lock:
+                    self.stats["retried_claims"] += len(remaining)
+                print(
+                    f"   🔁 {self.provider} 판정 누락 {len(remaining)}건 재요청 (묶음 최대 {max_batch}개)",
+                    file=sys.stderr,
+                )
+            batches = [
+                [remaining[i] for i in batch]
+                for batch in pack_claims([claims[i] for i in remaining], self.provider, self.max_input_tokens, max_batch)
+            ]
+            futures = {executor.submit(self.call, [claims[i] for i in batch]): batch for batch in batches}
+            for future in concurrent.futures.as_completed(futures):
+                batch = futures[future]
+                parsed, error = future.result()
+                last_error = error or last_error
+                for number, entry in parsed.items():
+                    results[batch[number - 1]] = entry
+            remaining = [i for i in remaining if results[i] is None]
+            max_batch = max(1, min(max_batch, max(len(b) for b in batches) // 2))
+        for i in remaining:
+            results[i] = {
+                "verdict": None,
+                "reason": f"판정 누락 ({last_error})" if last_error else "판정 누락",
+                "sources": [],
+                "grounded_sources": [],
+            }
+        return results
+
+
+def consensus(verdicts: list[str]) -> str | None:
+    """프로바이더 판정 다수결 (동률이면 보수적인 판정)"""
+    verdicts = [v for v in verdicts if v]
+    if not verdicts:
+        return None
+    return max(CONSERVATIVE_ORDER, key=lambda v: (verdicts.count(v), -CONSERVATIVE_ORDER.index(v)))
+
+
+def verify_claims(
+    claims: list[str],
+    providers: list[str],
+    lang: str = "both",
+    max_input_tokens: int = DEFAULT_MAX_INPUT_TOKENS,
+    max_batch: int = DEFAULT_MAX_BATCH,
+    workers: int = 4,
+    refresh: bool = False,
+    policy: dict | None = None,
+) -> dict:
+    """
+    여러 주장을 프로바이더별 묶음 요청으로 검증.
+
+    반환: {"claims": [{"claim", "verdict"(합의), "providers": {프로바이더: {"verdict", "reason", "sources",
+    "grounded_sources"}}}], "stats": {프로바이더: {"calls", "retried_claims", "failed_calls", "cached"}}}
+    """
+    claims = list(dict.fromkeys(c.strip() for c in claims if c and c.strip()))
+    per_provider = {p: [None] * len(claims) for p in providers}
+    stats = {}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        def run_provider(provider: str) -> None:
+            keys = [claim_cache_key(provider, lang, c) for c in claims]
+            todo = []
+            for i, key in enumerate(keys):
+                cached = None if refresh else cache_load(key)
+                if cached is not None:
+                    per_provider[provider][i] = cached
+                else:
+                    todo.append(i)
+            verifier = BulkVerifier(provider, lang, max_input_tokens, max_batch, policy)
+            if todo:
+                # 프로바이더 스레드는 아래 풀과 별도로 돌고, 묶음 요청만 공유 풀에 제출
+                for i, entry in zip(todo, verifier.verify([claims[i] for i in todo], executor)):
+                    per_provider[provider][i] = entry
+                    if entry["verdict"]:
+                        cache_store(keys[i], entry)
+            stats[provider] = {**verifier.stats, "cached": len(claims) - len(todo)}
+
+        threads = [threading.Thread(target=run_provider, args=(p,)) for p in providers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    items = []
+    for i, claim in enumerate(claims):
+        by_provider = {p: per_provider[p][i] for p in providers}
+        items.append({
+            "claim": claim,
+            "verdict": consensus([e["verdict"] for e in by_provider.values() if e]),
+            "providers": by_provider,
+        })
+    return {"claims": items, "stats": stats}
+
+
+def format_report(result: dict, providers: list[str]) -> str:
+    """주장별 판정 마크다운 표 + 근거 목록"""
+    from multi_search import PROVIDER_LABELS
+
+    labels = [PROVIDER_LABELS.get(p, p) for p in providers]
+    report = "## 🧪 주장 일괄 검증\n\n"
+    report += "| # | 주장 | 합의 | " + " | ".join(labels) + " |\n"
+    report += "|---|---|---|" + "---|" * len(labels) + "\n"
+    for n, item in enumerate(result["claims"], 1):
+        cells = [(item["providers"][p] or {}).get("verdict") or "—" for p in providers]
+        claim = item["claim"].replace("|", "\\|")
+        report += f"| {n} | {claim} | {item['verdict'] or '—'} | " + " | ".join(cells) + " |\n"
+
+    report += "\n### 근거\n\n"
+    for n, item in enumerate(result["claims"], 1):
+        lines = []
+        for provider, label in zip(providers, labels):
+            entry = item["providers"][provider]
+            if not entry or not (entry["reason"] or entry["sources"]):
+                continue
+            grounded = set(entry.get("grounded_sources", []))
+            links = ", ".join(f"{u}{'' if u in grounded else ' (미확인 URL)'}" for u in entry["sources"])
+            lines.append(f"  - {label}: {entry['reason']}" + (f" — {links}" if links else ""))
+        if lines:
+            report += f"{n}. {item['claim']}\n" + "\n".join(lines) + "\n"
+
+    total_calls = sum(s["calls"] for s in result["stats"].values())
+    report += f"\n_주장 {len(result['claims'])}개 · 프로바이더 {len(providers)}개 · API 호출 {total_calls}회_\n"
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="주장 일괄 검증 (verify 모드 묶음 요청)")
+    parser.add_argument("claims", nargs="*", help="검증할 주장")
+    parser.add_argument("--file", help="주장 목록 파일 (한 줄에 하나)")
+    parser.add_argument("--from-report", help="보고서/답변 마크다운에서 주장을 추출해 검증")
+    parser.add_argument("--max-claims", type=int, default=50, help="--from-report에서 추출할 최대 주장 수 (기본: 50)")
+    parser.add_argument("--providers", default="openai,anthropic,gemini", help="사용할 프로바이더 (콤마 구분)")
+    parser.add_argument("--lang", choices=["ko", "en", "both"], default="both", help="검색 언어")
+    parser.add_argument(
+        "--max-input-tokens",
+        type=int,
+        default=DEFAULT_MAX_INPUT_TOKENS,
+        help=f"묶음당 입력 토큰 추정 한도 (기본: {DEFAULT_MAX_INPUT_TOKENS})",
+    )
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help=f"묶음당 최대 주장 수 (기본: {DEFAULT_MAX_BATCH})")
+    parser.add_argument("--workers", type=int, default=4, help="동시 요청 수 (기본: 4)")
+    parser.add_argument("--refresh", action="store_true", help="캐시된 판정 무시")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    parser.add_argument("--output", help="결과 저장 경로 (미지정 시 stdout)")
+    args = parser.parse_args()
+
+    claims = list(args.claims)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            claims += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if args.from_report:
+        from claims import extract_claims
+
+        with open(args.from_report, encoding="utf-8") as f:
+            claims += [c["text"] for c in extract_claims(f.read(), max_claims=args.max_claims)]
+    if not claims:
+        parser.error("검증할 주장을 지정하세요 (인자, --file, --from-report)")
+
+    providers = [p.strip() for p in args.providers.split(",") if p.strip()]
+    unknown = [p for p in providers if p not in OUTPUT_BUDGET]
+    if unknown:
+        parser.error(f"알 수 없는 프로바이더: {', '.join(unknown)}")
+
+    print(f"🧪 주장 {len(claims)}개 일괄 검증 ({', '.join(providers)})", file=sys.stderr)
+    started = time.monotonic()
+    result = verify_claims(
+        claims,
+        providers,
+        lang=args.lang,
+        max_input_tokens=args.max_input_tokens,
+        max_batch=args.max_batch,
+        workers=args.workers,
+        refresh=args.refresh,
+    )
+    for provider, s in result["stats"].items():
+        print(
+            f"   {provider}: 호출 {s['calls']}회 (실패 {s['failed_calls']}), 재요청 주장 {s['retried_claims']}개, 캐시 {s['cached']}개",
+            file=sys.stderr,
+        )
+    print(f"⏱ {time.monotonic() - started:.1f}s", file=sys.stderr)
+
+    output = json.dumps(result, ensure_ascii=False, indent=2) if args.json else format_report(result, providers)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"✅ 결과 저장: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    if any(item["verdict"] is None for item in result["claims"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
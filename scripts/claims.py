@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+답변 본문에서 검증 가능한 주장(claim)을 추출하고 프로바이더 간에 대조하는 유틸리티
+
+- extract_claims: 인용/소스 목록 섹션을 제외한 본문을 문장 단위로 나누고,
+  수치·연도가 있거나 충분히 긴 서술문을 주장으로 추출
+- match_claims: 토큰 유사도로 여러 프로바이더의 주장을 묶어 교차 확인 수 계산
+"""
+
+import hashlib
+import re
+
+from query_index import tokenize
+
+MIN_CLAIM_CHARS = 15
+MAX_CLAIM_CHARS = 400
+MIN_CLAIM_TOKENS = 4
+DEFAULT_MATCH_THRESHOLD = 0.5
+
+# extract_response가 본문 뒤에 붙이는 인용/소스 목록은 "\n---\n" 또는 "### " 헤더로 시작
+_SECTION_BREAK = re.compile(r"\n-{3,}\n|\n#{2,4} ")
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+|\n+")
+_MARKDOWN_PREFIX = re.compile(r"^\s*(?:[-*+]|\d+[.)]|#{1,6}|>)\s*")
+_MARKDOWN_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_HAS_NUMBER = re.compile(r"\d")
+
+
+def answer_body(text: str) -> str:
+    """extract_response 출력에서 인용/소스 섹션 앞의 답변 본문만 반환"""
+    match = _SECTION_BREAK.search(text)
+    return text[:match.start()] if match else text
+
+
+def split_sentences(text: str) -> list[str]:
+    sentences = []
+    for raw in _SENTENCE_END.split(text):
+        sentence = _MARKDOWN_LINK.sub(r"\1", _MARKDOWN_PREFIX.sub("", raw or ""))
+        sentence = re.sub(r"[*_`]+", "", sentence).strip()
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def claim_similarity(a: set[str], b: set[str]) -> float:
+    """
+    주장 문장 유사도: Jaccard와 포함도(작은 쪽 토큰이 큰 쪽에 포함된 비율)의 평균.
+    같은 사실에 출처나 수식어를 덧붙인 문장끼리 묶이도록 한쪽 포함도를 씁니다 (검색어 재사용과 다름).
+    """
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return (inter / len(a | b) + inter / min(len(a), len(b))) / 2
+
+
+def claim_fingerprint(tokens: set[str]) -> str:
+    """토큰 집합 기반 지문 (어순/조사 차이에 둔감)"""
+    return hashlib.sha1(" ".join(sorted(tokens)).encode("utf-8")).hexdigest()[:16]
+
+
+def extract_claims(text: str, max_claims: int = 50) -> list[dict]:
+    """
+    답변 본문에서 주장 추출.
+
+    반환 항목: {"text", "tokens": [...], "fingerprint", "numeric": bool}
+    수치가 포함된 문장을 우선하고, 같은 지문의 문장은 한 번만 포함합니다.
+    """
+    claims = []
+    seen = set()
+    for sentence in split_sentences(answer_body(text)):
+        if not MIN_CLAIM_CHARS <= len(sentence) <= MAX_CLAIM_CHARS or sentence.endswith(":"):
+            continue
+        tokens = tokenize(sentence)
+        if len(tokens) < MIN_CLAIM_TOKENS:
+            continue
+        fingerprint = claim_fingerprint(tokens)
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        claims.append({
+            "text": sentence,
+            "tokens": sorted(tokens),
+            "fingerprint": fingerprint,
+            "numeric": bool(_HAS_NUMBER.search(sentence)),
+        })
+
+    claims.sort(key=lambda c: not c["numeric"])
+    return claims[:max_claims]
+
+
+def match_claims(claims_by_provider: dict, threshold: float = DEFAULT_MATCH_THRESHOLD) -> list[dict]:
+    """
+    프로바이더별 주장 목록을 유사도로 묶음.
+
+    claims_by_provider: {"OpenAI": [claim, ...], ...}
+    반환 항목: {"claim", "fingerprint", "providers": [...], "support": 프로바이더 수}
+    support 내림차순 정렬 (2 이상이면 교차 확인된 주장)
+    """
+    groups = []
+    for provider, claims in claims_by_provider.items():
+        for claim in claims:
+            tokens = set(claim["tokens"])
+            best, best_score = None, threshold
+            for group in groups:
+                if provider in group["providers"]:
+                    continue
+                score = claim_similarity(tokens, group["_tokens"])
+                if score >= best_score:
+                    best, best_score = group, score
+            if best is None:
+                groups.append({
+                    "claim": claim["text"],
+                    "fingerprint": claim["fingerprint"],
+                    "providers": [provider],
+                    "_tokens": tokens,
+                })
+            else:
+                best["providers"].append(provider)
+
+    for group in groups:
+        del group["_tokens"]
+        group["support"] = len(group["providers"])
+    groups.sort(key=lambda g: -g["support"])
+    return groups
@@ -0,0 +1,715 @@
+#!/usr/bin/env python3
+"""
+검색 결과 → Supabase 테이블 COPY용 파일 내보내기
+research_source, fact_check_result 테이블(src/supabase/migrations/001_create_tables.sql) 스키마에 맞춘
+TSV(COPY text 형식) 또는 CSV 파일을 스트리밍으로 쓰고, 한 번에 적재하는 load.sql을 함께 생성합니다.
+
+- 행마다 결정적 id(UUID v5)를 중복 제거 키로 사용: research_source는 (research_id, 정규화 URL),
+  fact_check_result는 (research_id, phase, 주장). 파일 안의 중복은 쓰지 않고,
+  DB에 이미 있는 행은 load.sql이 임시 테이블 → INSERT ... ON CONFLICT (id) DO NOTHING으로 건너뜀
+- 행은 마이그레이션 SQL에서 읽은 스키마(타입, NOT NULL, CHECK IN/BETWEEN)로 검증 후 기록
+- source_type / reliability_score는 웹 앱(src/lib/ai/source-scorer.ts)과 같은 규칙,
+  fact_check_result의 grade는 fact-checker.ts와 같은 A~F 기준 (판정이 있으면 판정 수로 계산)
+
+사용법:
+    python3 scripts/multi_search.py --batch queries.txt --export-dir export/ --research-id <UUID>
+    python3 scripts/copy_export.py results.ndjson --research-id <UUID> --export-dir export/
+    python3 scripts/copy_export.py --bulk-verify verify.json --research-id <UUID> --phase 4 --export-dir export/
+    python3 scripts/copy_export.py --check export/                # 내보낸 파일을 스키마로 다시 검증
+    psql "$DATABASE_URL" -f export/load.sql
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import uuid
+from datetime import date, datetime
+
+MIGRATIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "supabase", "migrations"
+)
+EXPORT_TABLES = ["research_source", "fact_check_result"]
+# DB 기본값에 맡기는 열 (내보내지 않음)
+DEFAULT_COLUMNS = {"created_at"}
+ID_NAMESPACE = uuid.UUID("6f1c9a52-3b1e-4d8a-9e57-2c0d4b7a8e31")
+
+TEXT_NULL = "\\N"
+_TEXT_ESCAPES = {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"}
+_TEXT_UNESCAPES = {"\\": "\\", "t": "\t", "n": "\n", "r": "\r"}
+
+# src/lib/ai/source-scorer.ts와 같은 도메인 신뢰도
+AUTHORITY_TIERS = {
+    ".gov": 1.0, ".edu": 1.0, ".ac.kr": 1.0, ".go.kr": 1.0, ".or.kr": 0.9,
+    "reuters.com": 0.85, "apnews.com": 0.85, "nature.com": 0.9, "sciencedirect.com": 0.9, "arxiv.org": 0.85,
+    "pubmed.ncbi.nlm.nih.gov": 0.9, "nytimes.com": 0.8, "washingtonpost.com": 0.8, "bbc.com": 0.8,
+    "bbc.co.uk": 0.8, "economist.com": 0.8, "ft.com": 0.8, "bloomberg.com": 0.8, "wsj.com": 0.8,
+    "techcrunch.com": 0.75, "theverge.com": 0.7, "arstechnica.com": 0.75, "wired.com": 0.7,
+    "chosun.com": 0.75, "donga.com": 0.75, "hani.co.kr": 0.75, "khan.co.kr": 0.75, "mk.co.kr": 0.7,
+    "hankyung.com": 0.7, "yna.co.kr": 0.8,
+    "wikipedia.org": 0.6, "namu.wiki": 0.4,
+    "medium.com": 0.4, "tistory.com": 0.35, "velog.io": 0.35, "brunch.co.kr": 0.4,
+    "blog.naver.com": 0.3, "reddit.com": 0.3,
+}
+ACADEMIC_MARKERS = [
+    "arxiv.org", "pubmed", "scholar.google", "sciencedirect", "nature.com", "springer.com", "ieee.org", "acm.org",
+]
+NEWS_DOMAINS = [
+    "reuters.com", "apnews.com", "bbc.com", "bbc.co.uk", "nytimes.com", "washingtonpost.com", "bloomberg.com",
+    "wsj.com", "ft.com", "economist.com", "techcrunch.com", "theverge.com", "arstechnica.com", "wired.com",
+    "cnn.com", "cnbc.com", "chosun.com", "donga.com", "hani.co.kr", "khan.co.kr", "mk.co.kr", "hankyung.com",
+    "yna.co.kr", "yonhapnews.co.kr",
+]
+BLOG_DOMAINS = [
+    "medium.com", "tistory.com", "velog.io", "brunch.co.kr", "blog.naver.com", "wordpress.com", "substack.com",
+    "dev.to", "namu.wiki", "wikipedia.org",
+]
+CONTRADICTION_KEYWORDS = ["아니", "틀린", "잘못", "거짓", "부정확", "반박", "incorrect", "false", "wrong", "inaccurate"]
+CONFIRMATION_KEYWORDS = ["맞", "확인", "사실", "정확", "일치", "근거", "correct", "true", "confirmed", "verified"]
+GRADE_NOTES = {"A": "3사 일치", "B": "2사 확인", "C": "1사 확인", "D": "부분 불일치", "F": "오류/상충"}
+
+
+class SchemaError(ValueError):
+    """행이 테이블 스키마에 맞지 않음"""
+
+
+# ---------------------------------------------------------------------------
+# 스키마 (마이그레이션 SQL에서 읽음)
+# ---------------------------------------------------------------------------
+
+
+def _split_columns(body: str) -> list[str]:
+    """CREATE TABLE 본문을 최상위 콤마로 분리 (CHECK (...) 안의 콤마 무시)"""
+    items, depth, current = [], 0, []
+    for ch in body:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            items.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if "".join(current).strip():
+        items.append("".join(current).strip())
+    return items
+
+
+def _parse_column(definition: str) -> dict:
+    name, col_type = definition.split()[:2]
+    upper = definition.upper()
+    column = {
+        "name": name,
+        "type": col_type.upper(),
+        "not_null": "NOT NULL" in upper or "PRIMARY KEY" in upper,
+        "has_default": "DEFAULT" in upper,
+        "choices": None,
+        "range": None,
+    }
+    check_in = re.search(r"CHECK\s*\(\s*\w+\s+IN\s*\(([^)]*)\)", definition, re.IGNORECASE)
+    if check_in:
+        column["choices"] = re.findall(r"'([^']*)'", check_in.group(1))
+    between = re.search(r"CHECK\s*\(\s*\w+\s+BETWEEN\s+([\d.]+)\s+AND\s+([\d.]+)", definition, re.IGNORECASE)
+    if between:
+        column["range"] = (float(between.group(1)), float(between.group(2)))
+    return column
+
+
+def load_schema(migrations_dir: str = MIGRATIONS_DIR, tables=EXPORT_TABLES) -> dict:
+    """
+    마이그레이션 SQL(파일명 순)의 CREATE TABLE / ALTER TABLE ADD COLUMN에서 열 정의 읽기.
+
+    반환: {테이블: [{"name", "type", "not_null", "has_default", "choices", "range"}]}
+    """
+    schema = {}
+    for filename in sorted(os.listdir(migrations_dir)):
+        if not filename.endswith(".sql"):
+            continue
+        with open(os.path.join(migrations_dir, filename), encoding="utf-8") as f:
+            sql = re.sub(r"--[^\n]*", "", f.read())
+        for match in re.finditer(r"CREATE TABLE (?:IF NOT EXISTS )?(\w+)\s*\((.*?)\);", sql, re.DOTALL | re.IGNORECASE):
+            table, body = match.groups()
+            if table in tables:
+                schema[table] = [
+                    _parse_column(item) for item in _split_columns(body)
+                    if not re.match(r"(PRIMARY|UNIQUE|CONSTRAINT|FOREIGN|CHECK)\b", item, re.IGNORECASE)
+                ]
+        for match in re.finditer(
+            r"ALTER TABLE (\w+) ADD COLUMN (?:IF NOT EXISTS )?([^;]*);", sql, re.IGNORECASE
+        ):
+            table, definition = match.groups()
+            if table in schema and definition.split()[0] not in {c["name"] for c in schema[table]}:
+                schema[table].append(_parse_column(definition))
+    missing = [t for t in tables if t not in schema]
+    if missing:
+        raise SchemaError(f"마이그레이션에 테이블 정의 없음: {', '.join(missing)}")
+    return schema
+
+
+def export_columns(schema: dict, table: str) -> list[str]:
+    return [c["name"] for c in schema[table] if c["name"] not in DEFAULT_COLUMNS]
+
+
+def validate_value(column: dict, value) -> None:
+    """값 하나를 열 정의로 검증 (Postgres가 COPY 시 거부할 값을 미리 찾음)"""
+    name, col_type = column["name"], column["type"]
+    if value is None:
+        if column["not_null"]:
+            raise SchemaError(f"{name}: NOT NULL 열에 NULL")
+        return
+    if col_type == "UUID":
+        uuid.UUID(str(value))
+    elif col_type in ("SMALLINT", "INTEGER", "INT", "BIGINT"):
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise SchemaError(f"{name}: 정수가 아님 ({value!r})")
+        if col_type == "SMALLINT" and not -32768 <= value <= 32767:
+            raise SchemaError(f"{name}: SMALLINT 범위 초과 ({value})")
+    elif col_type in ("REAL", "FLOAT", "DOUBLE"):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise SchemaError(f"{name}: 실수가 아님 ({value!r})")
+    elif col_type == "BOOLEAN":
+        if not isinstance(value, bool):
+            raise SchemaError(f"{name}: boolean이 아님 ({value!r})")
+    elif col_type == "TEXT":
+        if not isinstance(value, str):
+            raise SchemaError(f"{name}: 문자열이 아님 ({value!r})")
+        if "\x00" in value:
+            raise SchemaError(f"{name}: NUL 문자 포함")
+    if column["choices"] is not None and value not in column["choices"]:
+        raise SchemaError(f"{name}: 허용되지 않은 값 {value!r} (허용: {', '.join(column['choices'])})")
+    if column["range"] is not None and not column["range"][0] <= value <= column["range"][1]:
+        raise SchemaError(f"{name}: 범위 밖 값 {value} ({column['range'][0]:g}~{column['range'][1]:g})")
+
+
+def validate_row(schema: dict, table: str, row: dict) -> None:
+    columns = {c["name"]: c for c in schema[table]}
+    unknown = set(row) - set(columns)
+    if unknown:
+        raise SchemaError(f"{table}: 스키마에 없는 열 {', '.join(sorted(unknown))}")
+    for name, column in columns.items():
+        if name in row:
+            validate_value(column, row[name])
+        elif column["not_null"] and not column["has_default"]:
+            raise SchemaError(f"{table}.{name}: 필수 열 누락")
+
+
+# ---------------------------------------------------------------------------
+# COPY 형식 인코딩
+# ---------------------------------------------------------------------------
+
+
+def to_text(value) -> str | None:
+    """파이썬 값 → Postgres 입력 문자열 (None은 NULL)"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_text_row(values: list) -> str:
+    """COPY text 형식 (탭 구분, \\N = NULL, 백슬래시/탭/개행 이스케이프)"""
+    fields = []
+    for value in values:
+        text = to_text(value)
+        if text is None:
+            fields.append(TEXT_NULL)
+        else:
+            fields.append("".join(_TEXT_ESCAPES.get(ch, ch) for ch in text) if re.search(r"[\\\t\n\r]", text) else text)
+    return "\t".join(fields) + "\n"
+
+
+def encode_csv_row(values: list) -> str:
+    """COPY CSV 형식 (따옴표 없는 빈 필드 = NULL, 빈 문자열은 "")"""
+    fields = []
+    for value in values:
+        text = to_text(value)
+        if text is None:
+            fields.append("")
+        elif text == "" or re.search(r'[",\n\r]', text) or text != text.strip():
+            fields.append('"' + text.replace('"', '""') + '"')
+        else:
+            fields.append(text)
+    return ",".join(fields) + "\r\n"
+
+
+def decode_text_row(line: str) -> list:
+    """encode_text_row의 역변환 (--check용)"""
+    fields = []
+    for field in line.rstrip("\n").split("\t"):
+        if field == TEXT_NULL:
+            fields.append(None)
+        else:
+            fields.append(re.sub(r"\\(.)", lambda m: _TEXT_UNESCAPES.get(m.group(1), m.group(1)), field))
+    return fields
+
+
+class CopyWriter:
+    """
+    테이블 하나의 COPY 파일을 스트리밍으로 기록. 행은 쓰기 전에 스키마 검증하고 id로 중복 제거합니다.
+
+    fmt: "tsv" (COPY text 형식) | "csv" (COPY CSV 형식, 헤더 포함)
+    """
+
+    def __init__(self, directory: str, table: str, schema: dict, fmt: str = "tsv"):
+        self.table = table
+        self.schema = schema
+        self.fmt = fmt
+        self.columns = export_columns(schema, table)
+        self.path = os.path.join(directory, f"{table}.{fmt}")
+        self.rows = 0
+        self.duplicates = 0
+        self._seen = set()
+        self._encode = encode_text_row if fmt == "tsv" else encode_csv_row
+        self._file = open(self.path, "w", encoding="utf-8", newline="")
+        if fmt == "csv":
+            self._file.write(",".join(self.columns) + "\r\n")
+
+    def write(self, row: dict) -> bool:
+        """행 기록. 이미 쓴 id면 건너뛰고 False"""
+        if row["id"] in self._seen:
+            self.duplicates += 1
+            return False
+        validate_row(self.schema, self.table, row)
+        self._seen.add(row["id"])
+        self._file.write(self._encode([row.get(c) for c in self.columns]))
+        self.rows += 1
+        return True
+
+    def close(self) -> None:
+        self._file.close()
+
+    def copy_options(self) -> str:
+        return "FORMAT text" if self.fmt == "tsv" else "FORMAT csv, HEADER true"
+
+
+def write_load_sql(directory: str, writers: list[CopyWriter]) -> str:
+    """
+    psql용 적재 스크립트. 임시 테이블에 \\copy로 한 번에 넣은 뒤 id 충돌 행은 건너뛰고 삽입합니다.
+    \\copy는 psql을 실행한 작업 디렉토리 기준으로 경로를 찾으므로 파일은 절대 경로로 적습니다
+    (내보내기 디렉토리를 옮겼으면 다시 내보내거나 load.sql의 경로를 고쳐야 함).
+    """
+    lines = ["-- copy_export.py가 생성한 적재 스크립트", "BEGIN;"]
+    for writer in writers:
+        stage = f"_stage_{writer.table}"
+        columns = ", ".join(writer.columns)
+        source = os.path.abspath(writer.path).replace("'", "''")
+        lines += [
+            f"CREATE TEMP TABLE {stage} (LIKE {writer.table} INCLUDING DEFAULTS) ON COMMIT DROP;",
+            f"\\copy {stage} ({columns}) FROM '{source}' WITH ({writer.copy_options()})",
+            f"INSERT INTO {writer.table} ({columns}) SELECT {columns} FROM {stage} ON CONFLICT (id) DO NOTHING;",
+        ]
+    lines.append("COMMIT;")
+    path = os.path.join(directory, "load.sql")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+# ---------------------------------------------------------------------------
+# 행 생성
+# ---------------------------------------------------------------------------
+
+
+def row_id(*parts) -> str:
+    """중복 제거 키 → 결정적 UUID v5"""
+    return str(uuid.uuid5(ID_NAMESPACE, "\x1f".join(str(p) for p in parts)))
+
+
+def domain_authority(domain: str) -> float:
+    if domain in AUTHORITY_TIERS:
+        return AUTHORITY_TIERS[domain]
+    for suffix, score in AUTHORITY_TIERS.items():
+        if suffix.startswith(".") and domain.endswith(suffix):
+            return score
+    parent = ".".join(domain.split(".")[-2:])
+    return AUTHORITY_TIERS.get(parent, 0.5) if domain.count(".") >= 2 else 0.5
+
+
+def freshness_score(page_age: str | None) -> float:
+    """page_age("3 days ago", "2024-01-15" 등) → 0~1 (source-scorer.ts getFreshnessScore와 같은 구간)"""
+    if not page_age:
+        return 0.5
+    lower = page_age.lower()
+    for unit, steps, fallback in (
+        ("day", [(7, 1.0), (30, 0.8)], 0.6),
+        ("week", [(2, 0.9), (4, 0.7)], 0.5),
+        ("month", [(3, 0.7), (6, 0.5), (12, 0.3)], 0.2),
+        ("year", [(1, 0.3)], 0.1),
+    ):
+        match = re.search(rf"(\d+)\s*{unit}", lower)
+        if match:
+            value = int(match.group(1))
+            return next((score for limit, score in steps if value <= limit), fallback)
+    match = re.search(r"\d{4}-\d{2}-\d{2}", lower)
+    if match:
+        try:
+            days = (datetime.now() - datetime.fromisoformat(match.group())).days
+        except ValueError:
+            return 0.5
+        return next((score for limit, score in [(7, 1.0), (30, 0.8), (90, 0.7), (365, 0.4)] if days <= limit), 0.2)
+    return 0.5
+
+
+def classify_source_type(domain: str) -> str:
+    if domain.endswith((".edu", ".ac.kr")) or any(m in domain for m in ACADEMIC_MARKERS):
+        return "academic"
+    if domain.endswith((".gov", ".go.kr", ".or.kr", ".org")):
+        return "official"
+    if any(domain == d or domain.endswith("." + d) for d in NEWS_DOMAINS):
+        return "news"
+    if any(d in domain for d in BLOG_DOMAINS):
+        return "blog"
+    return "other"
+
+
+def reliability_score(domain: str, page_age: str | None, cross_validated: bool) -> int:
+    """source-scorer.ts scoreSource(0~1)를 orchestrator.ts처럼 1~5로 반올림"""
+    score = min(1.0, domain_authority(domain) * 0.5 + freshness_score(page_age) * 0.3 + (0.15 if cross_validated else 0) + 0.05)
+    return max(1, min(5, int(score * 5 + 0.5)))
+
+
+def source_rows(research_id: str, query: str, results: list):
+    """
+    검색어 하나의 결과 목록 → research_source 행 (정규화 URL당 한 행).
+    provider는 처음 발견한 프로바이더, cross_validated는 2개 이상 프로바이더에서 나온 경우.
+    """
+    from source_utils import canonicalize_url, extract_result_sources, url_domain
+
+    merged = {}
+    for result in results:
+        if result.get("status") != "success":
+            continue
+        refs = extract_result_sources(result)
+        for kind in ("citations", "sources"):
+            for ref in refs[kind]:
+                key = canonicalize_url(ref.get("url", ""))
+                if not key:
+                    continue
+                entry = merged.setdefault(key, {
+                    "url": ref["url"], "title": "", "snippet": "", "page_age": "", "providers": [], "cited": False,
+                    "regions": [],
+                })
+                entry["title"] = entry["title"] or ref.get("title", "")
+                entry["snippet"] = entry["snippet"] or ref.get("cited_text", "")
+                entry["page_age"] = entry["page_age"] or ref.get("page_age", "")
+                provider = result["provider"].lower()
+                if provider not in entry["providers"]:
+                    entry["providers"].append(provider)
+                if result.get("region") and result["region"] not in entry["regions"]:
+                    entry["regions"].append(result["region"])
+                entry["cited"] = entry["cited"] or kind == "citations"
+
+    for key, entry in merged.items():
+        domain = url_domain(entry["url"])
+        cross_validated = len(entry["providers"]) >= 2
+        raw_data = {"query": query, "canonical_url": key, "providers": entry["providers"], "cited": entry["cited"]}
+        if entry["regions"]:
+            raw_data["regions"] = entry["regions"]
+        yield {
+            "id": row_id("research_source", research_id, key),
+            "research_id": research_id,
+            "provider": entry["providers"][0],
+            "title": entry["title"] or None,
+            "url": entry["url"],
+            "snippet": entry["snippet"] or None,
+            "source_type": classify_source_type(domain),
+            "reliability_score": reliability_score(domain, entry["page_age"], cross_validated),
+            "cross_validated": cross_validated,
+            "page_age": entry["page_age"] or None,
+            "raw_data": raw_data,
+        }
+
+
+def grade_from_texts(texts: list[str | None]) -> str:
+    """fact-checker.ts determineGrade와 같은 키워드 기반 등급"""
+    available = [t for t in texts if t]
+    if not available:
+        return "F"
+    if len(available) == 1:
+        return "C"
+    confirm = contradict = 0
+    for text in available:
+        lower = text.lower()
+        contradiction = any(k in lower for k in CONTRADICTION_KEYWORDS)
+        if contradiction:
+            contradict += 1
+        elif any(k in lower for k in CONFIRMATION_KEYWORDS):
+            confirm += 1
+    if contradict >= 2:
+        return "F"
+    if contradict and confirm:
+        return "D"
+    return {3: "A", 2: "B", 1: "C"}.get(min(confirm, 3), "D")
+
+
+def grade_from_verdicts(verdicts: list[str | None]) -> str:
+    """bulk_verify 판정 → 등급 (확인됨 수로 A/B/C, 확인 없음·오류 섞임은 D, 오류 2개 이상이면 F)"""
+    confirmed = sum(1 for v in verdicts if v == "확인됨")
+    refuted = sum(1 for v in verdicts if v == "오류")
+    if not any(verdicts) or refuted >= 2:
+        return "F"
+    if refuted:
+        return "D"
+    return {3: "A", 2: "B", 1: "C"}.get(min(confirmed, 3), "D")
+
+
+def gemini_confidence(results: list) -> float | None:
+    """Gemini groundingSupports confidenceScores 평균 (fact-checker.ts와 같은 방식)"""
+    scores = []
+    for result in results:
+        if result.get("provider") != "Gemini" or not isinstance(result.get("raw"), dict):
+            continue
+        for candidate in result["raw"].get("candidates", []):
+            for support in candidate.get("groundingMetadata", {}).get("groundingSupports", []):
+                scores += support.get("confidenceScores", [])
+    return round(sum(scores) / len(scores), 4) if scores else None
+
+
+def fact_check_row(research_id: str, phase: int, claim: str, texts: dict, grade: str, confidence, notes: str) -> dict:
+    return {
+        "id": row_id("fact_check_result", research_id, phase, claim),
+        "research_id": research_id,
+        "phase": phase,
+        "claim": claim,
+        "grade": grade,
+        "openai_result": texts.get("openai"),
+        "anthropic_result": texts.get("anthropic"),
+        "gemini_result": texts.get("gemini"),
+        "confidence_score": confidence,
+        "notes": notes,
+    }
+
+
+def fact_check_rows_from_results(research_id: str, phase: int, claim: str, results: list):
+    """verify 모드 검색(검색어 = 주장) 결과 → fact_check_result 행 하나"""
+    texts = {r["provider"].lower(): r["text"] for r in results if r.get("status") == "success"}
+    grade = grade_from_texts([texts.get(p) for p in ("openai", "anthropic", "gemini")])
+    yield fact_check_row(research_id, phase, claim, texts, grade, gemini_confidence(results), f"검증 결과: {GRADE_NOTES[grade]}")
+
+
+def fact_check_rows_from_bulk(research_id: str, phase: int, bulk: dict):
+    """bulk_verify.verify_claims 결과 → fact_check_result 행 (주장당 하나)"""
+    for item in bulk["claims"]:
+        texts, verdicts = {}, []
+        for provider, entry in item["providers"].items():
+            if not entry or not entry.get("verdict"):
+                continue
+            verdicts.append(entry["verdict"])
+            sources = " ".join(entry.get("sources", []))
+            texts[provider] = f"{entry['verdict']}: {entry.get('reason', '')}" + (f" ({sources})" if sources else "")
+        grade = grade_from_verdicts(verdicts)
+        notes = f"검증 결과: {GRADE_NOTES[grade]} (판정: {', '.join(verdicts) or '없음'})"
+        yield fact_check_row(research_id, phase, item["claim"], texts, grade, None, notes)
+
+
+# ---------------------------------------------------------------------------
+# 내보내기
+# ---------------------------------------------------------------------------
+
+
+class Exporter:
+    """
+    COPY 파일 묶음 (research_source + 선택적으로 fact_check_result).
+    research_ids: {검색어: research_id} 또는 모든 검색어에 쓸 research_id 문자열
+    """
+
+    def __init__(self, directory: str, research_ids, fmt: str = "tsv", fact_checks: bool = False, phase: int = 1):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.research_ids = research_ids
+        self.phase = phase
+        self.schema = load_schema()
+        self.sources = CopyWriter(directory, "research_source", self.schema, fmt)
+        self.fact_checks = CopyWriter(directory, "fact_check_result", self.schema, fmt) if fact_checks else None
+
+    def research_id(self, query: str) -> str:
+        if isinstance(self.research_ids, str):
+            return self.research_ids
+        if query not in self.research_ids:
+            raise SchemaError(f"research_id가 지정되지 않은 검색어: {query}")
+        return self.research_ids[query]
+
+    def add_query(self, query: str, results: list) -> None:
+        research_id = self.research_id(query)
+        for row in source_rows(research_id, query, results):
+            self.sources.write(row)
+        if self.fact_checks is not None:
+            for row in fact_check_rows_from_results(research_id, self.phase, query, results):
+                self.fact_checks.write(row)
+
+    def add_bulk_verify(self, bulk: dict, research_id: str) -> None:
+        if self.fact_checks is None:
+            self.fact_checks = CopyWriter(self.directory, "fact_check_result", self.schema, self.sources.fmt)
+        for row in fact_check_rows_from_bulk(research_id, self.phase, bulk):
+            self.fact_checks.write(row)
+
+    def close(self) -> str:
+        writers = [w for w in (self.sources, self.fact_checks) if w is not None]
+        for writer in writers:
+            writer.close()
+        return write_load_sql(self.directory, writers)
+
+    def summary(self) -> str:
+        parts = []
+        for writer in (self.sources, self.fact_checks):
+            if writer is not None:
+                parts.append(f"{writer.table} {writer.rows}행 (중복 {writer.duplicates})")
+        return ", ".join(parts)
+
+
+def export_results(results_iter, exporter: Exporter, jobs_per_query: int):
+    """
+    multi_search 결과를 그대로 흘려보내면서 검색어별로 모아 COPY 행 기록.
+    검색어의 모든 작업(jobs_per_query)이 끝나는 즉시 내보내므로 배치 전체를 메모리에 두지 않습니다.
+    결과를 모두 흘려보낸 뒤 파일을 닫고 load.sql을 생성합니다.
+    """
+    pending = {}
+    try:
+        for query, result in results_iter:
+            pending.setdefault(query, []).append(result)
+            if len(pending[query]) >= jobs_per_query:
+                exporter.add_query(query, pending.pop(query))
+            yield query, result
+        for query, results in pending.items():
+            exporter.add_query(query, results)
+    finally:
+        load_path = exporter.close()
+    print(f"🗃 COPY 파일: {exporter.summary()} → {exporter.directory} (적재: psql -f {load_path})", file=sys.stderr)
+
+
+def load_research_ids(value: str | None, path: str | None):
+    """--research-id(단일 UUID) 또는 --research-ids 파일("검색어<TAB>UUID" 한 줄씩)"""
+    if path:
+        mapping = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip() and not line.startswith("#"):
+                    query, _, research_id = line.rstrip("\n").rpartition("\t")
+                    mapping[query.strip()] = str(uuid.UUID(research_id.strip()))
+        return mapping
+    return str(uuid.UUID(value)) if value else None
+
+
+def check_directory(directory: str) -> int:
+    """내보낸 TSV/CSV 파일을 스키마로 다시 읽어 검증. 오류 수 반환"""
+    import csv
+
+    schema = load_schema()
+    errors = 0
+    for table in EXPORT_TABLES:
+        columns = {c["name"]: c for c in schema[table]}
+        names = export_columns(schema, table)
+        for fmt in ("tsv", "csv"):
+            path = os.path.join(directory, f"{table}.{fmt}")
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding="utf-8", newline="") as f:
+                if fmt == "tsv":
+                    rows = (decode_text_row(line) for line in f)
+                else:
+                    reader = csv.reader(f)
+                    header = next(reader)
+                    if header != names:
+                        print(f"❌ {path}: 헤더가 스키마와 다름", file=sys.stderr)
+                        errors += 1
+                    rows = ([v if v != "" else None for v in row] for row in reader)
+                count, seen = 0, set()
+                for line_no, values in enumerate(rows, 1):
+                    count += 1
+                    try:
+                        if len(values) != len(names):
+                            raise SchemaError(f"열 수 {len(values)} (기대 {len(names)})")
+                        row = {n: _parse_text(columns[n], v) for n, v in zip(names, values)}
+                        validate_row(schema, table, row)
+                        if row["id"] in seen:
+                            raise SchemaError(f"id 중복 {row['id']}")
+                        seen.add(row["id"])
+                    except (SchemaError, ValueError) as e:
+                        errors += 1
+                        if errors <= 20:
+                            print(f"❌ {path}:{line_no}: {e}", file=sys.stderr)
+                print(f"{'✅' if not errors else '⚠️'} {path}: {count}행", file=sys.stderr)
+    return errors
+
+
+def _parse_text(column: dict, value: str | None):
+    """COPY 입력 문자열 → 검증용 파이썬 값 (Postgres 입력 변환과 같은 규칙)"""
+    if value is None:
+        return None
+    col_type = column["type"]
+    if col_type in ("SMALLINT", "INTEGER", "INT", "BIGINT"):
+        return int(value)
+    if col_type in ("REAL", "FLOAT", "DOUBLE"):
+        return float(value)
+    if col_type == "BOOLEAN":
+        if value not in ("t", "f", "true", "false"):
+            raise SchemaError(f"{column['name']}: boolean 형식 아님 ({value!r})")
+        return value in ("t", "true")
+    if col_type == "JSONB":
+        return json.loads(value)
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 결과 → Supabase 테이블 COPY용 파일 내보내기")
+    parser.add_argument("inputs", nargs="*", help="multi_search --ndjson 출력 파일 (raw 포함)")
+    parser.add_argument("--bulk-verify", action="append", default=[], help="bulk_verify --json 출력 (fact_check_result)")
+    parser.add_argument("--research-id", help="모든 행에 쓸 research.id (UUID)")
+    parser.add_argument("--research-ids", help="검색어별 research.id 파일 (\"검색어<TAB>UUID\")")
+    parser.add_argument("--export-dir", help="내보낼 디렉토리")
+    parser.add_argument("--format", choices=["tsv", "csv"], default="tsv", help="파일 형식 (기본: tsv, COPY text 형식)")
+    parser.add_argument("--fact-checks", action="store_true", help="검색어를 주장으로 보고 fact_check_result 행도 생성 (verify 모드 결과)")
+    parser.add_argument("--phase", type=int, default=1, help="fact_check_result.phase (기본: 1)")
+    parser.add_argument("--check", metavar="DIR", help="내보낸 파일을 스키마로 검증만 수행")
+    args = parser.parse_args()
+
+    if args.check:
+        errors = check_directory(args.check)
+        if errors:
+            print(f"ERROR: 스키마 검증 오류 {errors}건", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    try:
+        research_ids = load_research_ids(args.research_id, args.research_ids)
+    except (OSError, ValueError) as e:
+        parser.error(f"research id 읽기 실패: {e}")
+    if not research_ids:
+        parser.error("--research-id 또는 --research-ids를 지정하세요")
+    if not args.export_dir:
+        parser.error("--export-dir를 지정하세요")
+    if args.bulk_verify and not isinstance(research_ids, str):
+        parser.error("--bulk-verify는 --research-id와 함께 사용하세요")
+
+    exporter = Exporter(args.export_dir, research_ids, args.format, fact_checks=args.fact_checks, phase=args.phase)
+    try:
+        for path in args.inputs:
+            # NDJSON은 검색어별로 연속해 있지 않을 수 있으므로 검색어별로 모은 뒤 내보냄
+            by_query = {}
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        by_query.setdefault(record["query"], []).append(record)
+            for query, results in by_query.items():
+                exporter.add_query(query, results)
+        for path in args.bulk_verify:
+            with open(path, encoding="utf-8") as f:
+                exporter.add_bulk_verify(json.load(f), research_ids)
+    except SchemaError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        load_path = exporter.close()
+    print(f"✅ COPY 파일: {exporter.summary()} → {args.export_dir} (적재: psql -f {load_path})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
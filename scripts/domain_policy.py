@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+도메인 허용/차단 정책 (3사 공통 로컬 후처리 필터)
+OpenAI/Anthropic의 API 도메인 필터와 별개로, 모든 프로바이더 응답의 소스와 인용을
+같은 규칙으로 걸러 multi_search 보고서에 필터된/필터되지 않은 소스가 섞이지 않게 합니다.
+
+패턴 문법:
+- example.com      → example.com과 모든 하위 도메인
+- *.example.com    → 하위 도메인만 (example.com 자체는 제외)
+- 차단 목록 파일: 한 줄에 하나, # 주석 허용, hosts 파일 형식("0.0.0.0 example.com")도 허용
+
+패턴은 라벨을 뒤집은 접미사 트라이(com → example → ...)로 컴파일하므로
+목록 크기와 무관하게 URL당 라벨 수만큼만 비교합니다. 차단이 허용보다 우선합니다.
+
+사용법:
+    python3 scripts/domain_policy.py --block-domains "pinterest.com,*.blogspot.com" https://x.blogspot.com/a
+    python3 scripts/domain_policy.py --blocklist-file blocklist.txt --check-file urls.txt
+"""
+
+import argparse
+import copy
+import sys
+
+from source_utils import url_domain
+
+_DOMAIN = ""  # 노드 표식: 이 도메인과 모든 하위 도메인
+_WILDCARD = "*"  # 자식 노드: 하위 도메인만
+
+# 프로바이더 API에 그대로 넘길 수 있는 최대 허용 도메인 수 (OpenAI filters.allowed_domains 제한)
+NATIVE_ALLOWED_LIMIT = 100
+# Gemini 그라운딩 청크의 uri는 리다이렉트 URL이므로 title/domain 필드의 도메인을 사용
+REDIRECT_HOSTS = {"vertexaisearch.cloud.google.com"}
+
+
+def normalize_pattern(pattern: str) -> str:
+    """패턴 정규화: 소문자, scheme/경로/www. 제거"""
+    pattern = pattern.strip().lower()
+    if "://" in pattern:
+        pattern = pattern.split("://", 1)[1]
+    pattern = pattern.split("/", 1)[0].split(":", 1)[0].strip(".")
+    if pattern.startswith("www."):
+        pattern = pattern[4:]
+    return pattern
+
+
+def compile_trie(patterns) -> dict:
+    """도메인 패턴 목록 → 뒤집은 라벨 중첩 dict 트라이 (표식 값은 원래 패턴)"""
+    trie = {}
+    for raw in patterns:
+        pattern = normalize_pattern(raw)
+        if not pattern:
+            continue
+        labels = pattern.split(".")
+        wildcard = labels[0] == _WILDCARD
+        if wildcard:
+            labels = labels[1:]
+        node = trie
+        for label in reversed(labels):
+            node = node.setdefault(label, {})
+        if wildcard:
+            node = node.setdefault(_WILDCARD, {})
+        node.setdefault(_DOMAIN, pattern)
+    return trie
+
+
+def match_host(trie: dict, host: str) -> str | None:
+    """호스트와 일치하는 첫 패턴 (최상위 라벨부터 탐색), 없으면 None"""
+    if not trie or not host:
+        return None
+    labels = host.lower().strip(".").split(".")
+    node = trie
+    for i in range(len(labels) - 1, -1, -1):
+        if _WILDCARD in node:
+            return node[_WILDCARD][_DOMAIN]
+        node = node.get(labels[i])
+        if node is None:
+            return None
+        if _DOMAIN in node:
+            return node[_DOMAIN]
+    return None
+
+
+def load_domain_file(path: str) -> list[str]:
+    """차단/허용 목록 파일 읽기 (한 줄에 하나, # 주석, hosts 형식 허용)"""
+    domains = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                domains.append(line.split()[-1])
+    return domains
+
+
+def compile_policy(
+    allowed_domains: list[str] | None = None,
+    blocked_domains: list[str] | None = None,
+    blocklist_files: list[str] | None = None,
+) -> dict | None:
+    """
+    허용/차단 목록을 정책으로 컴파일. 규칙이 하나도 없으면 None.
+
+    반환: {"allow": 트라이 | None, "block": 트라이, "allowed_domains": [...], "blocked_count": int}
+    """
+    blocked = list(blocked_domains or [])
+    for path in blocklist_files or []:
+        blocked += load_domain_file(path)
+    allowed = [normalize_pattern(d) for d in allowed_domains or [] if normalize_pattern(d)]
+    if not allowed and not blocked:
+        return None
+    return {
+        "allow": compile_trie(allowed) if allowed else None,
+        "block": compile_trie(blocked),
+        "allowed_domains": allowed,
+        "blocked_count": len(blocked),
+    }
+
+
+def native_allowed_domains(policy: dict | None) -> list[str] | None:
+    """API의 allowed_domains로 그대로 넘길 수 있는 허용 목록 (하위 도메인은 API가 자동 포함)"""
+    if not policy or not policy["allowed_domains"] or len(policy["allowed_domains"]) > NATIVE_ALLOWED_LIMIT:
+        return None
+    return sorted({d.removeprefix("*.") for d in policy["allowed_domains"]})
+
+
+def check_host(policy: dict, host: str) -> str | None:
+    """제외 사유 ("blocked:패턴" | "not-allowed"), 통과하면 None"""
+    if not host:
+        return None
+    blocked = match_host(policy["block"], host)
+    if blocked:
+        return f"blocked:{blocked}"
+    if policy["allow"] is not None and match_host(policy["allow"], host) is None:
+        return "not-allowed"
+    return None
+
+
+def _drop(dropped: list, kind: str, url: str, host: str, reason: str) -> None:
+    dropped.append({"kind": kind, "url": url, "domain": host, "reason": reason})
+
+
+def filter_openai(raw: dict, policy: dict) -> tuple[dict, list]:
+    """Responses API 응답의 web_search_call 소스와 url_citation 필터링"""
+    raw = copy.deepcopy(raw)
+    dropped = []
+    for item in raw.get("output", []):
+        if item.get("type") == "web_search_call":
+            action = item.get("action") or {}
+            kept = []
+            for source in action.get("sources") or []:
+                host = url_domain(source.get("url", ""))
+                reason = check_host(policy, host)
+                if reason:
+                    _drop(dropped, "source", source.get("url", ""), host, reason)
+                else:
+                    kept.append(source)
+            if "sources" in action:
+                action["sources"] = kept
+        elif item.get("type") == "message":
+            for content in item.get("content", []):
+                kept = []
+                for annotation in content.get("annotations") or []:
+                    host = url_domain(annotation.get("url", ""))
+                    reason = annotation.get("type") == "url_citation" and check_host(policy, host)
+                    if reason:
+                        _drop(dropped, "citation", annotation.get("url", ""), host, reason)
+                    else:
+                        kept.append(annotation)
+                if "annotations" in content:
+                    content["annotations"] = kept
+    return raw, dropped
+
+
+def filter_anthropic(raw: dict, policy: dict) -> tuple[dict, list]:
+    """Messages API 응답의 web_search_result와 본문 인용 필터링"""
+    raw = copy.deepcopy(raw)
+    dropped = []
+    for block in raw.get("content", []):
+        if block.get("type") == "web_search_tool_result" and isinstance(block.get("content"), list):
+            kept = []
+            for item in block["content"]:
+                host = url_domain(item.get("url", "")) if isinstance(item, dict) else ""
+                reason = check_host(policy, host)
+                if reason:
+                    _drop(dropped, "source", item.get("url", ""), host, reason)
+                else:
+                    kept.append(item)
+            block["content"] = kept
+        elif block.get("type") == "text" and block.get("citations"):
+            kept = []
+            for citation in block["citations"]:
+                host = url_domain(citation.get("url", ""))
+                reason = check_host(policy, host)
+                if reason:
+                    _drop(dropped, "citation", citation.get("url", ""), host, reason)
+                else:
+                    kept.append(citation)
+            block["citations"] = kept
+    return raw, dropped
+
+
+def gemini_chunk_host(web: dict) -> str:
+    """그라운딩 청크의 실제 도메인 (리다이렉트 URI면 domain/title 필드 사용)"""
+    host = url_domain(web.get("uri", ""))
+    if host in REDIRECT_HOSTS or not host:
+        return normalize_pattern(web.get("domain") or web.get("title") or "")
+    return host
+
+
+def filter_gemini(raw: dict, policy: dict) -> tuple[dict, list]:
+    """
+    groundingChunks 필터링 후 groundingSupports의 청크 인덱스(와 confidenceScores)를 재매핑.
+    참조하던 청크가 모두 제외된 서포트는 삭제합니다.
+    """
+    raw = copy.deepcopy(raw)
+    dropped = []
+    for candidate in raw.get("candidates", []):
+        grounding = candidate.get("groundingMetadata")
+        if not grounding:
+            continue
+        remap = {}
+        kept_chunks = []
+        for i, chunk in enumerate(grounding.get("groundingChunks", [])):
+            web = chunk.get("web", {})
+            host = gemini_chunk_host(web)
+            reason = check_host(policy, host)
+            if reason:
+                _drop(dropped, "source", web.get("uri", ""), host, reason)
+            else:
+                remap[i] = len(kept_chunks)
+                kept_chunks.append(chunk)
+        if "groundingChunks" in grounding:
+            grounding["groundingChunks"] = kept_chunks
+
+        kept_supports = []
+        for support in grounding.get("groundingSupports", []):
+            indices = support.get("groundingChunkIndices", [])
+            scores = support.get("confidenceScores", [])
+            new_indices, new_scores = [], []
+            for j, idx in enumerate(indices):
+                if idx in remap:
+                    new_indices.append(remap[idx])
+                    if j < len(scores):
+                        new_scores.append(scores[j])
+            if indices and not new_indices:
+                continue
+            support["groundingChunkIndices"] = new_indices
+            if "confidenceScores" in support:
+                support["confidenceScores"] = new_scores
+            kept_supports.append(support)
+        if "groundingSupports" in grounding:
+            grounding["groundingSupports"] = kept_supports
+    return raw, dropped
+
+
+FILTERS = {
+    "openai": filter_openai,
+    "anthropic": filter_anthropic,
+    "gemini": filter_gemini,
+}
+
+
+def apply_policy(provider: str, raw: dict, policy: dict | None) -> tuple[dict, list]:
+    """
+    프로바이더 응답에 정책 적용. (필터된 응답 사본, 제외 목록) 반환.
+
+    제외 항목: {"kind": "source" | "citation", "url", "domain", "reason"}
+    """
+    if policy is None or not isinstance(raw, dict):
+        return raw, []
+    return FILTERS[provider.lower()](raw, policy)
+
+
+def summarize_dropped(dropped: list, limit: int = 5) -> str:
+    """제외 내역 한 줄 요약 (예: "소스 3개, 인용 1개 — pinterest.com, x.blogspot.com 외 2개")"""
+    sources = sum(1 for d in dropped if d["kind"] == "source")
+    citations = len(dropped) - sources
+    domains = list(dict.fromkeys(d["domain"] or d["url"] for d in dropped))
+    more = f" 외 {len(domains) - limit}개" if len(domains) > limit else ""
+    return f"소스 {sources}개, 인용 {citations}개 — {', '.join(domains[:limit])}{more}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="도메인 허용/차단 정책 확인")
+    parser.add_argument("urls", nargs="*", help="확인할 URL 또는 도메인")
+    parser.add_argument("--domains", default=None, help="허용 도메인 (콤마 구분, *.example.com은 하위 도메인만)")
+    parser.add_argument("--block-domains", default=None, help="차단 도메인 (콤마 구분)")
+    parser.add_argument("--blocklist-file", action="append", default=[], help="차단 목록 파일 (여러 번 지정 가능)")
+    parser.add_argument("--check-file", help="확인할 URL 목록 파일 (한 줄에 하나)")
+    args = parser.parse_args()
+
+    policy = compile_policy(
+        args.domains.split(",") if args.domains else None,
+        args.block_domains.split(",") if args.block_domains else None,
+        args.blocklist_file,
+    )
+    if policy is None:
+        parser.error("--domains, --block-domains, --blocklist-file 중 하나 이상 지정하세요")
+
+    urls = list(args.urls)
+    if args.check_file:
+        with open(args.check_file, encoding="utf-8") as f:
+            urls += [line.strip() for line in f if line.strip()]
+
+    print(
+        f"🛡 정책: 허용 {len(policy['allowed_domains'])}개, 차단 {policy['blocked_count']}개",
+        file=sys.stderr,
+    )
+    dropped = 0
+    for url in urls:
+        host = url_domain(url) if "://" in url else normalize_pattern(url)
+        reason = check_host(policy, host)
+        dropped += bool(reason)
+        print(f"{'🚫' if reason else '✅'} {url}" + (f"  ({reason})" if reason else ""))
+    print(f"제외 {dropped}/{len(urls)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
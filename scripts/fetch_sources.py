@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+인용 URL 로컬 페치 유틸리티
+프로바이더가 반환한 소스 URL을 직접 병렬로 내려받아 본문 텍스트를 추출하고 캐시합니다.
+프로바이더의 web_fetch 도구(anthropic_search --fetch)보다 빠르고 비용이 들지 않습니다.
+
+- asyncio로 스케줄링하고, 실제 HTTP 요청은 호스트별 keep-alive 커넥션 풀을 쓰는 스레드에서 실행
+- 전체 동시성 + 도메인별 동시성(politeness) 제한, 도메인별 요청 간격
+- 응답 크기/시간 상한, Content-Type 스니핑, HTML → 텍스트 변환
+- 본문은 정규화 URL 기준으로 로컬 캐시에 저장 (TTL 내 재요청 시 네트워크 생략)
+
+사용법:
+    python3 scripts/fetch_sources.py https://example.com/a https://example.com/b
+    python3 scripts/fetch_sources.py --from-ndjson results.ndjson --concurrency 32
+    python3 scripts/multi_search.py "검색어" --fetch-sources
+"""
+
+import argparse
+import asyncio
+import codecs
+import collections
+import concurrent.futures
+import hashlib
+import http.client
+import json
+import os
+import re
+import ssl
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+from source_utils import canonicalize_url, url_domain
+
+CACHE_DIR = os.environ.get("REAL_RESEARCH_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "real-research")
+FETCH_CACHE_DIR = os.path.join(CACHE_DIR, "fetch")
+
+USER_AGENT = "RealResearch-SourceFetcher/1.0"
+MAX_REDIRECTS = 5
+READ_CHUNK = 64 * 1024
+
+TEXT_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "application/json", "application/xml", "text/xml")
+
+
+# ---------------------------------------------------------------------------
+# HTTP: 호스트별 커넥션 풀
+# ---------------------------------------------------------------------------
+
+class ConnectionPool:
+    """(scheme, host, port)별 유휴 http.client 커넥션을 재사용하는 스레드 안전 풀"""
+
+    def __init__(self, timeout: float, max_idle_per_host: int = 4, verify_tls: bool = True):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self.ssl_context = ssl.create_default_context() if verify_tls else ssl._create_unverified_context()
+        self._idle = collections.defaultdict(list)
+        self._lock = threading.Lock()
+
+    def get(self, scheme: str, host: str, port: int | None):
+        """(connection, reused) 반환"""
+        key = (scheme, host, port)
+        with self._lock:
+            if self._idle[key]:
+                return self._idle[key].pop(), True
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(host, port, timeout=self.timeout, context=self.ssl_context)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+        return conn, False
+
+    def put(self, scheme: str, host: str, port: int | None, conn) -> None:
+        key = (scheme, host, port)
+        with self._lock:
+            if len(self._idle[key]) < self.max_idle_per_host:
+                self._idle[key].append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
+
+
+def _remaining(deadline: float) -> float:
+    """deadline(time.monotonic 기준)까지 남은 시간. 지났으면 TimeoutError"""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("deadline exceeded")
+    return remaining
+
+
+def _read_body(resp, max_bytes: int, sock, deadline: float) -> tuple[bytes, bool]:
+    """응답 본문을 max_bytes(압축 해제 후 기준)까지 읽음. (body, truncated) 반환
+
+    recv 한 번 단위(read1)로 읽으면서 매번 소켓 타임아웃을 남은 시간으로 줄여,
+    조금씩 흘려보내는 서버도 deadline을 넘기지 못하게 함.
+    """
+    encoding = (resp.getheader("Content-Encoding") or "").lower()
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS) if encoding in ("gzip", "x-gzip") else (
+        zlib.decompressobj() if encoding == "deflate" else None
+    )
+    chunks = []
+    size = 0
+    while size < max_bytes:
+        if sock is not None:
+            sock.settimeout(_remaining(deadline))
+        chunk = resp.read1(READ_CHUNK)
+        if not chunk:
+            # read1은 Content-Length를 다 읽어도 응답을 닫지 않아 keep-alive 재사용이 막히므로 마무리
+            resp.read()
+            return b"".join(chunks), False
+        if decoder:
+            chunk = decoder.decompress(chunk, max_bytes - size)
+        chunks.append(chunk)
+        size += len(chunk)
+    return b"".join(chunks)[:max_bytes], True
+
+
+def _send(conn, path: str, headers: dict, deadline: float):
+    """남은 시간을 소켓 타임아웃으로 걸고 요청을 보낸 뒤 (response, socket) 반환"""
+    conn.timeout = _remaining(deadline)
+    if conn.sock is not None:
+        conn.sock.settimeout(conn.timeout)
+    conn.request("GET", path, headers=headers)
+    # getresponse()가 will_close 응답에서 conn.sock을 비우므로 먼저 잡아 둠
+    sock = conn.sock
+    return conn.getresponse(), sock
+
+
+def http_get(pool: ConnectionPool, url: str, max_bytes: int, deadline: float) -> dict:
+    """리다이렉트를 따라가며 GET. {status, final_url, headers, body, truncated} 반환
+
+    deadline(time.monotonic 기준)을 넘기면 리다이렉트 도중이라도 TimeoutError.
+    """
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"지원하지 않는 URL: {url}")
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        headers = {
+            "Host": parts.netloc,
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,text/plain;q=0.9,*/*;q=0.5",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        }
+
+        conn, reused = pool.get(parts.scheme, parts.hostname, parts.port)
+        try:
+            resp, sock = _send(conn, path, headers, deadline)
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            conn.close()
+            if not reused:
+                raise
+            # 서버가 닫은 keep-alive 커넥션 → 새 커넥션으로 한 번 재시도
+            conn, _ = pool.get(parts.scheme, parts.hostname, parts.port)
+            try:
+                resp, sock = _send(conn, path, headers, deadline)
+            except Exception:
+                conn.close()
+                raise
+        except Exception:
+            conn.close()
+            raise
+
+        if resp.status in (301, 302, 303, 307, 308) and resp.getheader("Location"):
+            try:
+                _, truncated = _read_body(resp, max_bytes, sock, deadline)
+            except Exception:
+                conn.close()
+                raise
+            if truncated or resp.will_close:
+                conn.close()
+            else:
+                pool.put(parts.scheme, parts.hostname, parts.port, conn)
+            url = urljoin(url, resp.getheader("Location"))
+            continue
+
+        try:
+            body, truncated = _read_body(resp, max_bytes, sock, deadline)
+        except Exception:
+            conn.close()
+            raise
+        if truncated or resp.will_close:
+            conn.close()
+        else:
+            pool.put(parts.scheme, parts.hostname, parts.port, conn)
+
+        return {
+            "status": resp.status,
+            "final_url": url,
+            "headers": {k.lower(): v for k, v in resp.getheaders()},
+            "body": body,
+            "truncated": truncated,
+        }
+
+    raise RuntimeError(f"리다이렉트가 {MAX_REDIRECTS}회를 초과했습니다")
+
+
+# ---------------------------------------------------------------------------
+# 콘텐츠 판별 및 텍스트 추출
+# ---------------------------------------------------------------------------
+
+def sniff_content_type(header_value: str, body: bytes) -> str:
+    """Content-Type 헤더가 없거나 불명확하면 본문 앞부분으로 판별"""
+    ctype = (header_value or "").split(";")[0].strip().lower()
+    if ctype and ctype not in ("application/octet-stream", "binary/octet-stream"):
+        return ctype
+
+    head = body[:512].lstrip().lower()
+    if head.startswith(b"%pdf"):
+        return "application/pdf"
+    if head.startswith((b"\x89png", b"\xff\xd8\xff", b"gif8", b"riff")):
+        return "image/unknown"
+    if head.startswith((b"<!doctype html", b"<html")) or b"<head" in head or b"<body" in head:
+        return "text/html"
+    if head.startswith(b"<?xml"):
+        return "application/xml"
+    if head.startswith((b"{", b"[")):
+        return "application/json"
+    if b"\x00" not in head:
+        return "text/plain"
+    return "application/octet-stream"
+
+
+def detect_charset(header_value: str, body: bytes) -> str:
+    match = re.search(r"charset=([\w-]+)", header_value or "", re.I)
+    if not match:
+        match = re.search(rb"<meta[^>]+charset=[\"']?([\w-]+)", body[:4096], re.I)
+    if match:
+        charset = match.group(1)
+        charset = charset.decode("ascii", "ignore") if isinstance(charset, bytes) else charset
+        try:
+            codecs.lookup(charset)
+            return charset
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+class _TextExtractor(HTMLParser):
+    """HTML에서 본문 텍스트와 제목만 추출 (스크립트/스타일/내비게이션 제외)"""
+
+    SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "footer", "header", "aside", "form"}
+    BLOCK_TAGS = {
+        "p", "div", "section", "article", "main", "br", "li", "ul", "ol", "table", "tr",
+        "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "hr", "dd", "dt",
+    }
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.title = ""
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "title":
+            self._in_title = False
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> tuple[str, str]:
+    """(title, text) 반환. 공백을 정리하고 빈 줄은 하나로 합침"""
+    parser = _TextExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        pass
+    lines = (re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(parser.parts).split("\n"))
+    text = "\n".join(line for line in lines if line)
+    return parser.title.strip(), text
+
+
+def extract_text(content_type: str, headers: dict, body: bytes) -> tuple[str, str]:
+    """콘텐츠 종류별 (title, text). 텍스트가 아닌 콘텐츠는 빈 문자열"""
+    if not content_type.startswith(TEXT_TYPES):
+        return "", ""
+    decoded = body.decode(detect_charset(headers.get("content-type", ""), body), errors="replace")
+    if content_type in ("text/html", "application/xhtml+xml"):
+        return html_to_text(decoded)
+    return "", decoded.strip()
+
+
+# ---------------------------------------------------------------------------
+# 캐시
+# ---------------------------------------------------------------------------
+
+def cache_path(url: str, cache_dir: str = FETCH_CACHE_DIR) -> str:
+    digest = hashlib.sha256(canonicalize_url(url).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, digest[:2], digest + ".json")
+
+
+def cache_get(url: str, ttl: float, cache_dir: str = FETCH_CACHE_DIR) -> dict | None:
+    path = cache_path(url, cache_dir)
+    try:
+        if ttl >= 0 and time.time() - os.path.getmtime(path) > ttl:
+            return None
+        with open(path, encoding="utf-8") as f:
+            record = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    record["cached"] = True
+    return record
+
+
+def cache_put(record: dict, cache_dir: str = FETCH_CACHE_DIR) -> None:
+    path = cache_path(record["url"], cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+# ---------------------------------------------------------------------------
+# 페치 파이프라인
+# ---------------------------------------------------------------------------
+
+def empty_record(url: str) -> dict:
+    return {
+        "url": url,
+        "final_url": url,
+        "status": None,
+        "content_type": "",
+        "title": "",
+        "text": "",
+        "bytes": 0,
+        "truncated": False,
+        "error": None,
+        "fetched_at": datetime.now().isoformat(timespec="seconds"),
+        "elapsed": 0.0,
+        "cached": False,
+    }
+
+
+def fetch_url(pool: ConnectionPool, url: str, max_bytes: int, timeout: float) -> dict:
+    """URL 하나를 페치하고 텍스트까지 추출한 레코드 반환 (스레드에서 실행)
+
+    timeout은 리다이렉트와 본문 읽기를 포함한 전체 상한. 스레드 안에서 소켓
+    타임아웃으로 끊으므로, 호출자가 기다리는 동안 요청이 실제로 끝남.
+    """
+    started = time.monotonic()
+    record = empty_record(url)
+    try:
+        resp = http_get(pool, url, max_bytes, started + timeout)
+        content_type = sniff_content_type(resp["headers"].get("content-type", ""), resp["body"])
+        title, text = extract_text(content_type, resp["headers"], resp["body"])
+        record.update({
+            "final_url": resp["final_url"],
+            "status": resp["status"],
+            "content_type": content_type,
+            "title": title,
+            "text": text,
+            "bytes": len(resp["body"]),
+            "truncated": resp["truncated"],
+        })
+    except TimeoutError:
+        record["error"] = f"시간 초과 ({timeout}초)"
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["elapsed"] = round(time.monotonic() - started, 3)
+    return record
+
+
+async def fetch_all_async(
+    urls: list[str],
+    concurrency: int = 16,
+    per_domain: int = 2,
+    domain_delay: float = 0.0,
+    max_bytes: int = 2 * 1024 * 1024,
+    timeout: float = 15.0,
+    cache_ttl: float = 7 * 24 * 3600,
+    cache_dir: str | None = FETCH_CACHE_DIR,
+    verify_tls: bool = True,
+) -> list[dict]:
+    """
+    URL 목록을 병렬 페치. 입력 순서대로 레코드 반환.
+
+    - concurrency: 전체 동시 요청 수
+    - per_domain / domain_delay: 도메인별 동시 요청 수와 요청 간 최소 간격(초)
+    - timeout: 소켓 타임아웃이자 URL 하나(리다이렉트 포함)에 대한 전체 시간 상한
+    - cache_dir=None 이면 캐시를 사용하지 않음
+    """
+    loop = asyncio.get_running_loop()
+    pool = ConnectionPool(timeout=timeout, max_idle_per_host=per_domain, verify_tls=verify_tls)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=concurrency)
+    global_sem = asyncio.Semaphore(concurrency)
+    domain_sems = collections.defaultdict(lambda: asyncio.Semaphore(per_domain))
+    domain_last = {}
+
+    async def fetch_one(url: str) -> dict:
+        if cache_dir:
+            cached = cache_get(url, cache_ttl, cache_dir)
+            if cached:
+                return cached
+
+        domain = url_domain(url)
+        async with domain_sems[domain]:
+            if domain_delay:
+                wait = domain_last.get(domain, 0) + domain_delay - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                domain_last[domain] = loop.time()
+            # wait_for로 끊으면 스레드는 계속 요청 중인데 슬롯만 풀리므로,
+            # 시간 상한은 fetch_url 안에서 걸고 스레드가 끝날 때까지 슬롯을 쥠
+            async with global_sem:
+                record = await loop.run_in_executor(executor, fetch_url, pool, url, max_bytes, timeout)
+
+        # 네트워크 오류가 아닌 응답만 캐시 (4xx/5xx도 상태 기록용으로 저장)
+        if cache_dir and record["status"] is not None:
+            cache_put(record, cache_dir)
+        return record
+
+    try:
+        return await asyncio.gather(*(fetch_one(url) for url in urls))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        pool.close()
+
+
+def fetch_sources(urls: list[str], **kwargs) -> list[dict]:
+    """fetch_all_async의 동기 래퍼. 정규화 URL 기준으로 중복을 제거한 뒤 페치"""
+    unique = []
+    seen = set()
+    for url in urls:
+        key = canonicalize_url(url)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(url)
+    return asyncio.run(fetch_all_async(unique, **kwargs))
+
+
+def format_fetch_summary(records: list[dict]) -> str:
+    """multi_search 보고서용 페치 결과 섹션"""
+    ok = [r for r in records if r.get("status") and 200 <= r["status"] < 400]
+    report = "## 🌐 인용 URL 확인 (로컬 페치)\n\n"
+    report += f"- 확인 {len(ok)}/{len(records)}개 URL 응답 정상\n\n"
+    for r in records:
+        if r in ok:
+            icon = "✅"
+            detail = f"{r['status']}, {r.get('bytes', 0) / 1024:.0f} KiB" + (", 캐시" if r.get("cached") else "")
+        else:
+            icon = "❌"
+            detail = f"HTTP {r['status']}" if r.get("status") else (r.get("error") or "오류")
+        title = r.get("title") or r["url"]
+        report += f"- {icon} [{title}]({r['url']}) ({detail})\n"
+    return report + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="인용 URL 로컬 병렬 페치")
+    parser.add_argument("urls", nargs="*", help="페치할 URL")
+    parser.add_argument("--from-ndjson", help="multi_search --ndjson 출력 파일 (raw 포함)에서 소스 URL 수집")
+    parser.add_argument("--concurrency", type=int, default=16, help="전체 동시 요청 수 (기본: 16)")
+    parser.add_argument("--per-domain", type=int, default=2, help="도메인별 동시 요청 수 (기본: 2)")
+    parser.add_argument("--domain-delay", type=float, default=0.0, help="같은 도메인 요청 간 최소 간격(초)")
+    parser.add_argument("--max-bytes", type=int, default=2 * 1024 * 1024, help="응답 크기 상한 (기본: 2MiB)")
+    parser.add_argument("--timeout", type=float, default=15.0, help="URL당 시간 상한(초)")
+    parser.add_argument("--no-cache", action="store_true", help="캐시를 사용하지 않음")
+    parser.add_argument("--text", action="store_true", help="추출한 본문 텍스트까지 출력")
+
+    args = parser.parse_args()
+
+    urls = list(args.urls)
+    if args.from_ndjson:
+        from source_utils import collect_sources
+
+        results = []
+        with open(args.from_ndjson, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    results.append(json.loads(line))
+        urls += [s["url"] for s in collect_sources(results)]
+    if not urls:
+        parser.error("URL 또는 --from-ndjson 을 지정하세요")
+
+    print(f"🌐 소스 페치: {len(urls)}개 URL (동시 {args.concurrency}, 도메인별 {args.per_domain})", file=sys.stderr)
+    started = time.monotonic()
+    records = fetch_sources(
+        urls,
+        concurrency=args.concurrency,
+        per_domain=args.per_domain,
+        domain_delay=args.domain_delay,
+        max_bytes=args.max_bytes,
+        timeout=args.timeout,
+        cache_dir=None if args.no_cache else FETCH_CACHE_DIR,
+    )
+    for record in records:
+        if not args.text:
+            record = {**record, "text": record.get("text", "")[:200]}
+        print(json.dumps(record, ensure_ascii=False))
+    print(f"🏁 페치 완료 ({time.monotonic() - started:.1f}초)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
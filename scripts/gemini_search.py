@@ -9,24 +9,27 @@ Gemini API의 Google Search 그라운딩 기능을 활용한 웹 검색 스크
     python3 scripts/gemini_search.py "검색어"
     python3 scripts/gemini_search.py "검색어" --mode grounding|verify|deep
     python3 scripts/gemini_search.py "검색어" --lang ko|en|both
+    python3 scripts/gemini_search.py "검색어" --block-domains "pinterest.com" --blocklist-file blocklist.txt
 """
 
 import argparse
 import json
-import os
 import sys
 from datetime import datetime
 
 
-def get_api_key():
-    key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
-    if not key:
+def get_key_pool():
+    """GEMINI_API_KEY / GOOGLE_API_KEY (및 *_KEYS, *_KEY_FILE)로 구성한 키 풀 (key_pool 참고)"""
+    from key_pool import get_pool
+
+    pool = get_pool("gemini")
+    if pool is None:
         print(
             "ERROR: GEMINI_API_KEY 또는 GOOGLE_API_KEY 환경 변수가 설정되지 않았습니다.",
             file=sys.stderr,
         )
         sys.exit(1)
-    return key
+    return pool
 
 
 def search(
@@ -34,7 +37,9 @@ def search(
     mode: str = "grounding",
     lang: str = "both",
     model: str = "gemini-2.5-flash",
-) -> dict:
+    on_event=None,
+    raw_bytes: bool = False,
+) -> dict | bytes:
     """
     Gemini API + google_search 도구를 사용한 그라운딩 검색.
 
@@ -43,11 +48,17 @@ def search(
     - webSearchQueries: 모델이 사용한 검색어
     - groundingChunks: 웹 소스의 URI와 제목
     - groundingSupports: 응답 텍스트를 소스에 매핑 (startIndex, endIndex, groundingChunkIndices)
+
+    on_event(name, **fields): 진행 이벤트 콜백 (선택)
+    - "first_token": 응답 첫 바이트 수신 (비스트리밍 호출이므로 헤더 도착 시점)
+    - "response": 응답 본문 수신 완료 (bytes)
+
+    raw_bytes=True이면 JSON 파싱 없이 응답 본문(bytes)을 그대로 반환합니다 (postprocess 파이프라인용).
     """
     import urllib.request
     import urllib.error
 
-    api_key = get_api_key()
+    key_pool = get_key_pool()
 
     # 모드별 시스템 프롬프트
     system_prompts = {
@@ -86,18 +97,27 @@ def search(
         "tools": [{"google_search": {}}],
     }
 
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
     data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url,
-        data=data,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
+
+    def make_request(api_key: str) -> urllib.request.Request:
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
+        return urllib.request.Request(
+            url,
+            data=data,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
 
     try:
-        with urllib.request.urlopen(req, timeout=120) as resp:
-            result = json.loads(resp.read().decode("utf-8"))
+        with key_pool.urlopen(make_request, timeout=120) as resp:
+            if on_event:
+                on_event("first_token")
+            body = resp.read()
+        if on_event:
+            on_event("response", bytes=len(body))
+        if raw_bytes:
+            return body
+        result = json.loads(body.decode("utf-8"))
     except urllib.error.HTTPError as e:
         error_body = e.read().decode("utf-8") if e.fp else ""
         print(f"ERROR: Gemini API 호출 실패 (HTTP {e.code}): {error_body}", file=sys.stderr)
@@ -109,6 +129,104 @@ def search(
     return result
 
 
+def extract_sources(result: dict) -> dict:
+    """
+    Gemini 응답의 groundingMetadata에서 소스를 구조화하여 추출.
+
+    반환: {"citations": [{title, url}], "sources": [{title, url}]}
+    - sources: groundingChunks 전체 (응답 순서 유지)
+    - citations: groundingSupports가 실제로 참조한 청크
+    """
+    citations = []
+    sources = []
+
+    for candidate in result.get("candidates", []):
+        grounding = candidate.get("groundingMetadata", {})
+        chunks = [chunk.get("web", {}) for chunk in grounding.get("groundingChunks", [])]
+
+        for web in chunks:
+            if web.get("uri"):
+                sources.append({"title": web.get("title", ""), "url": web["uri"]})
+
+        cited = []
+        for support in grounding.get("groundingSupports", []):
+            for idx in support.get("groundingChunkIndices", []):
+                if idx < len(chunks) and chunks[idx].get("uri") and idx not in cited:
+                    cited.append(idx)
+        for idx in cited:
+            citations.append({"title": chunks[idx].get("title", ""), "url": chunks[idx]["uri"]})
+
+    return {"citations": citations, "sources": sources}
+
+
+def byte_to_char_offsets(text: str, offsets) -> dict:
+    """
+    UTF-8 바이트 오프셋 목록 → {바이트 오프셋: 문자 오프셋}.
+    오프셋을 정렬해 앞에서부터 구간별로 디코딩하므로 본문 길이에 한 번 비례합니다.
+    """
+    if text.isascii():
+        return {offset: min(offset, len(text)) for offset in offsets}
+    data = text.encode("utf-8")
+    mapping, previous, position = {}, 0, 0
+    for offset in sorted(set(offsets)):
+        position += len(data[previous:offset].decode("utf-8", errors="ignore"))
+        mapping[offset] = position
+        previous = offset
+    return mapping
+
+
+def extract_spans(result: dict) -> dict:
+    """
+    답변 본문과 groundingSupports 구간 추출 (span_index용).
+
+    segment.startIndex/endIndex는 해당 part(partIndex) 안의 UTF-8 바이트 오프셋이므로
+    문자 오프셋으로 바꾼 뒤 본문(extract_response와 같은 결합) 내 위치로 옮깁니다.
+    소스 번호는 groundingChunks 순서 그대로입니다 (후보가 여럿이면 이어서 번호 매김).
+    반환 형식은 openai_search.extract_spans와 같습니다.
+    """
+    parts, spans, sources = [], [], []
+    offset = 0  # 다음 part의 본문 내 시작 위치
+    for candidate in result.get("candidates", []):
+        part_texts, part_bases = [], []
+        for part in candidate.get("content", {}).get("parts", []):
+            if "text" in part:
+                part_texts.append(part["text"])
+                part_bases.append(offset)
+                parts.append(part["text"])
+                offset += len(part["text"]) + 1
+
+        grounding = candidate.get("groundingMetadata", {})
+        chunk_base = len(sources)
+        for chunk in grounding.get("groundingChunks", []):
+            web = chunk.get("web", {})
+            sources.append({"title": web.get("title", ""), "url": web.get("uri", "")})
+
+        segments = [
+            (support, support.get("segment", {}))
+            for support in grounding.get("groundingSupports", [])
+            if support.get("segment", {}).get("partIndex", 0) < len(part_texts)
+        ]
+        byte_offsets = {i: [] for i in range(len(part_texts))}
+        for _, segment in segments:
+            byte_offsets[segment.get("partIndex", 0)] += [segment.get("startIndex", 0), segment.get("endIndex", 0)]
+        char_offsets = {i: byte_to_char_offsets(part_texts[i], byte_offsets[i]) for i in byte_offsets}
+
+        for support, segment in segments:
+            part_index = segment.get("partIndex", 0)
+            to_char = char_offsets[part_index]
+            start = part_bases[part_index] + to_char[segment.get("startIndex", 0)]
+            end = part_bases[part_index] + to_char[segment.get("endIndex", 0)]
+            ids = [chunk_base + i for i in support.get("groundingChunkIndices", []) if chunk_base + i < len(sources)]
+            if end > start and ids:
+                spans.append({
+                    "start": start,
+                    "end": end,
+                    "sources": ids,
+                    "confidence": support.get("confidenceScores", []),
+                })
+    return {"text": "\n".join(parts), "sources": sources, "spans": spans}
+
+
 def extract_response(result: dict) -> str:
     """
     Gemini API 응답에서 텍스트와 그라운딩 정보 추출.
@@ -217,13 +335,69 @@ def main():
         default="gemini-2.5-flash",
         help="사용할 Gemini 모델 (기본: gemini-2.5-flash)",
     )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="유사 검색어의 최근 결과를 재사용하지 않고 항상 새로 검색",
+    )
+    parser.add_argument(
+        "--reuse-hours",
+        type=float,
+        default=6.0,
+        help="유사 검색어 결과 재사용 기간(시간, 0이면 재사용 안 함, 기본: 6)",
+    )
+    parser.add_argument(
+        "--similarity",
+        type=float,
+        default=0.6,
+        help="재사용할 최소 검색어 유사도 0~1 (기본: 0.6)",
+    )
+    parser.add_argument(
+        "--domains",
+        default=None,
+        help="허용 도메인 (콤마 구분). API 필터가 없으므로 결과 소스를 로컬에서 필터링",
+    )
+    parser.add_argument(
+        "--block-domains",
+        default=None,
+        help="차단 도메인 (콤마 구분, *.example.com은 하위 도메인만)",
+    )
+    parser.add_argument(
+        "--blocklist-file",
+        action="append",
+        default=[],
+        help="차단 도메인 목록 파일 (한 줄에 하나, 여러 번 지정 가능)",
+    )
     parser.add_argument("--raw", action="store_true", help="원본 JSON 출력")
 
     args = parser.parse_args()
 
+    from domain_policy import apply_policy, compile_policy, summarize_dropped
+
+    policy = compile_policy(
+        args.domains.split(",") if args.domains else None,
+        args.block_domains.split(",") if args.block_domains else None,
+        args.blocklist_file,
+    )
+
     print(f"🔍 Gemini Grounding Search: '{args.query}' (mode={args.mode}, lang={args.lang})", file=sys.stderr)
 
-    result = search(args.query, mode=args.mode, lang=args.lang, model=args.model)
+    from query_index import search_with_reuse
+
+    result, _ = search_with_reuse(
+        "gemini",
+        search,
+        args.query,
+        fresh=args.fresh,
+        threshold=args.similarity,
+        max_age_hours=args.reuse_hours,
+        mode=args.mode,
+        lang=args.lang,
+        model=args.model,
+    )
+    result, dropped = apply_policy("gemini", result, policy)
+    if dropped:
+        print(f"🚫 도메인 정책으로 제외: {summarize_dropped(dropped)}", file=sys.stderr)
 
     if args.raw:
         print(json.dumps(result, ensure_ascii=False, indent=2))
@@ -1,15 +1,25 @@
 #!/usr/bin/env python3
 """Generate all site images for Real Research using Gemini 3 Pro Image Preview."""
 
+import argparse
+import concurrent.futures
+import hashlib
+import json
 import os
 import sys
-from google import genai
-from google.genai import types
+import threading
+import time
 
-client = genai.Client()
 MODEL = "gemini-3-pro-image-preview"
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "public", "images")
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+MANIFEST_PATH = os.path.join(OUTPUT_DIR, ".generated-manifest.json")
+MAX_WORKERS = 4
+MAX_ATTEMPTS = 3
+
+_client = None
+_client_lock = threading.Lock()
+_manifest_lock = threading.Lock()
+_print_lock = threading.Lock()
 
 IMAGES = [
     {
@@ -105,67 +115,153 @@ IMAGES = [
 ]
 
 
-def generate_image(image_config):
-    """Generate a single image."""
-    name = image_config["name"]
-    output_path = os.path.join(OUTPUT_DIR, name)
+def get_client():
+    """Create the genai client on first use so importing this module has no side effects."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from google import genai
 
-    if os.path.exists(output_path):
-        print(f"  ⏭ {name} already exists, skipping")
-        return True
+            _client = genai.Client()
+        return _client
+
+
+def log(message):
+    with _print_lock:
+        print(message, flush=True)
+
+
+def image_hash(image_config):
+    """Content hash of everything that determines the generated pixels."""
+    key = json.dumps(
+        [image_config["prompt"], image_config["ratio"], image_config["size"], MODEL],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
 
-    print(f"  🎨 Generating {name} ({image_config['ratio']}, {image_config['size']})...")
 
+def load_manifest():
     try:
-        response = client.models.generate_content(
-            model=MODEL,
-            contents=image_config["prompt"],
-            config=types.GenerateContentConfig(
-                response_modalities=["TEXT", "IMAGE"],
-                image_config=types.ImageConfig(
-                    aspect_ratio=image_config["ratio"],
-                    image_size=image_config["size"],
-                ),
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(manifest):
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def is_up_to_date(image_config, manifest):
+    output_path = os.path.join(OUTPUT_DIR, image_config["name"])
+    entry = manifest.get(image_config["name"])
+    return os.path.exists(output_path) and entry is not None and entry.get("hash") == image_hash(image_config)
+
+
+def request_image(image_config, output_path):
+    """Call the model once. Returns True if an image was saved."""
+    from google.genai import types
+
+    response = get_client().models.generate_content(
+        model=MODEL,
+        contents=image_config["prompt"],
+        config=types.GenerateContentConfig(
+            response_modalities=["TEXT", "IMAGE"],
+            image_config=types.ImageConfig(
+                aspect_ratio=image_config["ratio"],
+                image_size=image_config["size"],
             ),
-        )
+        ),
+    )
 
-        for part in response.parts:
-            if image := part.as_image():
-                image.save(output_path)
-                print(f"  ✅ Saved {name}")
-                return True
-            elif part.text:
-                print(f"  ℹ️  {part.text[:100]}")
+    for part in response.parts:
+        if image := part.as_image():
+            # Write to a temp file first so an interrupted run never leaves a truncated image behind.
+            tmp_path = output_path + ".tmp"
+            image.save(tmp_path)
+            os.replace(tmp_path, output_path)
+            return True
+        elif part.text:
+            log(f"  ℹ️  {image_config['name']}: {part.text[:100]}")
+    return False
+
+
+def generate_image(image_config, manifest, force=False):
+    """Generate a single image, retrying transient failures with exponential backoff."""
+    name = image_config["name"]
+    output_path = os.path.join(OUTPUT_DIR, name)
+
+    if not force and is_up_to_date(image_config, manifest):
+        log(f"  ⏭ {name} is up to date, skipping")
+        return True
 
-        print(f"  ❌ No image returned for {name}")
-        return False
+    log(f"  🎨 Generating {name} ({image_config['ratio']}, {image_config['size']})...")
 
-    except Exception as e:
-        print(f"  ❌ Error generating {name}: {e}")
-        return False
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            if request_image(image_config, output_path):
+                with _manifest_lock:
+                    manifest[name] = {"hash": image_hash(image_config), "model": MODEL}
+                    save_manifest(manifest)
+                log(f"  ✅ Saved {name}")
+                return True
+            log(f"  ❌ No image returned for {name} (attempt {attempt}/{MAX_ATTEMPTS})")
+        except Exception as e:
+            log(f"  ❌ Error generating {name} (attempt {attempt}/{MAX_ATTEMPTS}): {e}")
+        if attempt < MAX_ATTEMPTS:
+            time.sleep(2 ** attempt)
+
+    return False
 
 
 def main():
-    print(f"🚀 Generating {len(IMAGES)} site images for Real Research\n")
+    parser = argparse.ArgumentParser(description="Generate site images for Real Research")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help=f"Concurrent generations (default: {MAX_WORKERS})")
+    parser.add_argument("--force", action="store_true", help="Regenerate every image even if its manifest hash matches")
+    parser.add_argument("--only", default=None, help="Comma-separated image names to generate")
+    parser.add_argument("--no-variants", action="store_true", help="Skip building responsive WebP/AVIF variants")
+    args = parser.parse_args()
+
+    images = IMAGES
+    if args.only:
+        wanted = {n.strip() for n in args.only.split(",")}
+        images = [img for img in IMAGES if img["name"] in wanted]
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    manifest = load_manifest()
+
+    print(f"🚀 Generating {len(images)} site images for Real Research\n")
     print(f"Output directory: {OUTPUT_DIR}\n")
 
     success = 0
     failed = 0
 
-    for i, img in enumerate(IMAGES, 1):
-        print(f"[{i}/{len(IMAGES)}] {img['name']}")
-        if generate_image(img):
-            success += 1
-        else:
-            failed += 1
-        print()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {executor.submit(generate_image, img, manifest, args.force): img for img in images}
+        for future in concurrent.futures.as_completed(futures):
+            if future.result():
+                success += 1
+            else:
+                failed += 1
 
-    print(f"{'='*40}")
-    print(f"✅ Success: {success}/{len(IMAGES)}")
+    print(f"\n{'='*40}")
+    print(f"✅ Success: {success}/{len(images)}")
     if failed:
-        print(f"❌ Failed: {failed}/{len(IMAGES)}")
+        print(f"❌ Failed: {failed}/{len(images)}")
     print(f"📁 Output: {OUTPUT_DIR}")
 
+    if not args.no_variants:
+        from optimize_site_images import optimize
+
+        print("\n🖼  Building responsive variants")
+        failed += optimize([img["name"] for img in images if os.path.exists(os.path.join(OUTPUT_DIR, img["name"]))])
+
+    return 1 if failed else 0
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
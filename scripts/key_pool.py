@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+프로바이더별 API 키 풀
+키 하나의 rate limit에 모든 요청이 몰리지 않도록 여러 키에 요청을 나눕니다.
+
+키 설정 (프로바이더별, 중복은 한 번만 사용):
+- OPENAI_API_KEYS="sk-a,sk-b"         콤마 구분 목록
+- OPENAI_API_KEY_FILE=~/.keys/openai  한 줄에 키 하나 (# 주석 허용)
+- OPENAI_API_KEY                      기존 단일 키
+  (Anthropic: ANTHROPIC_API_KEY*, Gemini: GEMINI_API_KEY* / GOOGLE_API_KEY)
+
+키 선택:
+- 응답의 rate limit 헤더(OpenAI x-ratelimit-*, Anthropic anthropic-ratelimit-*)로
+  요청/토큰 잔여 비율을 추적하고, 잔여 비율이 가장 큰 키를 사용 (헤더가 없으면 1.0으로 간주)
+- 같은 비율이면 진행 중 요청이 적고 오래 쉰 키 우선
+- 429는 retry-after(없으면 30초), 401/403은 10분 동안 해당 키를 쉬게 하고 다른 키로 재시도
+
+사용법:
+    python3 scripts/key_pool.py          # 프로바이더별 설정된 키 수 확인 (키 값은 출력하지 않음)
+"""
+
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+PROVIDER_ENV = {
+    "openai": ["OPENAI_API_KEY"],
+    "anthropic": ["ANTHROPIC_API_KEY"],
+    "gemini": ["GEMINI_API_KEY", "GOOGLE_API_KEY"],
+}
+
+# (잔여, 한도, 리셋) 헤더 이름
+RATE_LIMIT_HEADERS = [
+    ("x-ratelimit-remaining-requests", "x-ratelimit-limit-requests", "x-ratelimit-reset-requests"),
+    ("x-ratelimit-remaining-tokens", "x-ratelimit-limit-tokens", "x-ratelimit-reset-tokens"),
+    ("anthropic-ratelimit-requests-remaining", "anthropic-ratelimit-requests-limit", "anthropic-ratelimit-requests-reset"),
+    ("anthropic-ratelimit-tokens-remaining", "anthropic-ratelimit-tokens-limit", "anthropic-ratelimit-tokens-reset"),
+]
+
+RETRY_STATUSES = {401, 403, 429}
+COOLDOWN_RATE_LIMITED = 30.0
+COOLDOWN_UNAUTHORIZED = 600.0
+MAX_COOLDOWN_WAIT = 60.0
+IN_FLIGHT_PENALTY = 0.05
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_FULL = re.compile(r"(?:\d+(?:\.\d+)?(?:ms|h|m|s))+")
+_DURATION_UNITS = {"ms": 0.001, "h": 3600, "m": 60, "s": 1}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def load_keys(env_names: list[str]) -> list[str]:
+    """환경 변수(NAME, NAMES, NAME_FILE)에서 키 목록 읽기 (순서 유지, 중복 제거)"""
+    keys = []
+    for name in env_names:
+        keys += os.environ.get(f"{name}S", "").split(",")
+        path = os.environ.get(f"{name}_FILE")
+        if path:
+            with open(os.path.expanduser(path), encoding="utf-8") as f:
+                keys += [line.split("#", 1)[0] for line in f]
+        keys.append(os.environ.get(name, ""))
+    return list(dict.fromkeys(k.strip() for k in keys if k and k.strip()))
+
+
+def fingerprint(key: str) -> str:
+    """키 식별용 지문 (sha256 앞 16자리). 키 값 대신 파일에 저장할 때 사용"""
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+def parse_reset(value: str) -> float | None:
+    """리셋 헤더 → epoch 초. OpenAI 기간 형식("6m0s", "20ms")과 Anthropic RFC 3339 형식 지원"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    if _DURATION_FULL.fullmatch(value):
+        seconds = sum(float(n) * _DURATION_UNITS[u] for n, u in _DURATION.findall(value))
+        return time.time() + seconds
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def parse_retry_after(headers) -> float | None:
+    value = headers.get("retry-after") if headers else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class KeyPool:
+    """
+    스레드 안전한 키 풀. acquire()로 키를 받고 응답 후 release()로 헤더/상태를 알려줍니다.
+
+    키 상태: headroom(0~1, 잔여 비율), reset_at, cooldown_until, in_flight, last_used
+    """
+
+    def __init__(self, provider: str, keys: list[str]):
+        self.provider = provider
+        self._lock = threading.Lock()
+        self._state = {
+            key: {"headroom": 1.0, "reset_at": None, "cooldown_until": 0.0, "in_flight": 0, "last_used": 0.0}
+            for key in keys
+        }
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def _score(self, state: dict, now: float) -> tuple:
+        headroom = state["headroom"]
+        if state["reset_at"] is not None and now >= state["reset_at"]:
+            headroom = 1.0
+        return (headroom - IN_FLIGHT_PENALTY * state["in_flight"], -state["last_used"])
+
+    def available(self, exclude: set | None = None) -> bool:
+        """쉬고 있지 않은 키가 남아 있는지"""
+        now = time.time()
+        with self._lock:
+            return any(
+                s["cooldown_until"] <= now for k, s in self._state.items() if k not in (exclude or set())
+            )
+
+    def acquire(self, exclude: set | None = None) -> str:
+        """
+        여유가 가장 큰 키 반환 (exclude 제외).
+
+        모든 키가 쉬는 중이면 가장 먼저 풀리는 키를 기다린 뒤 반환합니다 (최대 MAX_COOLDOWN_WAIT초).
+        """
+        exclude = exclude or set()
+        while True:
+            now = time.time()
+            with self._lock:
+                candidates = {k: s for k, s in self._state.items() if k not in exclude} or self._state
+                ready = [k for k, s in candidates.items() if s["cooldown_until"] <= now]
+                if ready:
+                    key = max(ready, key=lambda k: self._score(candidates[k], now))
+                    self._hold(key)
+                    return key
+                key = min(candidates, key=lambda k: candidates[k]["cooldown_until"])
+                wait = candidates[key]["cooldown_until"] - now
+            if wait > MAX_COOLDOWN_WAIT:
+                with self._lock:
+                    self._hold(key)
+                return key
+            print(f"   ⏳ {self.provider} 키가 모두 대기 중, {wait:.0f}초 후 재시도", file=sys.stderr)
+            time.sleep(wait)
+
+    def acquire_fingerprint(self, key_fingerprint: str) -> str | None:
+        """
+        지문이 일치하는 키 반환 (쉬는 중이어도 기다리지 않음). 풀에 없으면 None.
+        백그라운드 응답 폴링처럼 제출한 키로만 이어갈 수 있는 작업에 사용합니다.
+        """
+        with self._lock:
+            for key in self._state:
+                if fingerprint(key) == key_fingerprint:
+                    self._hold(key)
+                    return key
+        return None
+
+    def _hold(self, key: str) -> None:
+        """키를 사용 중으로 표시 (self._lock 안에서 호출)"""
+        self._state[key]["in_flight"] += 1
+        self._state[key]["last_used"] = time.time()
+
+    def release(self, key: str, headers=None, status: int | None = None) -> None:
+        """응답 헤더의 rate limit 정보와 상태 코드로 키 상태 갱신"""
+        now = time.time()
+        with self._lock:
+            state = self._state[key]
+            state["in_flight"] = max(0, state["in_flight"] - 1)
+            if headers is not None:
+                fractions, resets = [], []
+                for remaining_name, limit_name, reset_name in RATE_LIMIT_HEADERS:
+                    remaining, limit = headers.get(remaining_name), headers.get(limit_name)
+                    try:
+                        if remaining is not None and limit and float(limit) > 0:
+                            fractions.append(float(remaining) / float(limit))
+                    except ValueError:
+                        continue
+                    reset_at = parse_reset(headers.get(reset_name) or "")
+                    if reset_at:
+                        resets.append(reset_at)
+                if fractions:
+                    state["headroom"] = min(fractions)
+                    state["reset_at"] = max(resets) if resets else None
+            if status == 429:
+                state["headroom"] = 0.0
+                state["cooldown_until"] = now + (parse_retry_after(headers) or COOLDOWN_RATE_LIMITED)
+            elif status in (401, 403):
+                state["cooldown_until"] = now + COOLDOWN_UNAUTHORIZED
+
+    def urlopen(self, make_request, timeout: float, key: str | None = None):
+        """
+        make_request(api_key) → urllib Request를 키 풀로 실행하고 열린 응답 반환 (with 문으로 사용).
+
+        401/403/429이면 해당 키를 쉬게 하고 아직 시도하지 않은 다른 키로 재시도합니다.
+        재시도할 키가 없으면 마지막 HTTPError를 그대로 발생시킵니다.
+        key를 주면 그 키로만 요청하고 (재시도 없음) 응답 헤더/상태는 똑같이 키 상태에 반영합니다.
+        """
+        tried = set()
+        while True:
+            if key is None:
+                api_key = self.acquire(exclude=tried)
+            else:
+                api_key = key
+                with self._lock:
+                    self._hold(api_key)
+            try:
+                resp = urllib.request.urlopen(make_request(api_key), timeout=timeout)
+            except urllib.error.HTTPError as e:
+                self.release(api_key, e.headers, e.code)
+                tried.add(api_key)
+                if key is None and e.code in RETRY_STATUSES and self.available(exclude=tried):
+                    print(f"   🔑 {self.provider} 키 #{self.index(api_key)} HTTP {e.code}, 다른 키로 재시도", file=sys.stderr)
+                    continue
+                raise
+            except BaseException:
+                self.release(api_key)
+                raise
+            self.release(api_key, resp.headers, resp.status)
+            return resp
+
+    def index(self, key: str) -> int:
+        """로그용 키 번호 (키 값 대신 표시)"""
+        return list(self._state).index(key) + 1
+
+
+def get_pool(provider: str) -> KeyPool | None:
+    """프로바이더 키 풀 (프로세스 내 공유). 설정된 키가 없으면 None"""
+    with _pools_lock:
+        if provider not in _pools:
+            keys = load_keys(PROVIDER_ENV[provider])
+            _pools[provider] = KeyPool(provider, keys) if keys else None
+        return _pools[provider]
+
+
+def main():
+    for provider, env_names in PROVIDER_ENV.items():
+        keys = load_keys(env_names)
+        sources = ", ".join(f"{n}, {n}S, {n}_FILE" for n in env_names)
+        print(f"{provider:10s} 키 {len(keys)}개  ({sources})")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,58 +8,136 @@ OpenAI + Anthropic + Gemini 3사를 동시에 검색하고 결과를 통합합
     python3 scripts/multi_search.py "검색어" --mode search|verify|deep
     python3 scripts/multi_search.py "검색어" --providers openai,anthropic,gemini
     python3 scripts/multi_search.py "검색어" --output research-output/sources/search-result.md
+    python3 scripts/multi_search.py "검색어" --ndjson --no-raw-payload
+    python3 scripts/multi_search.py --batch queries.txt --ndjson --output results.ndjson
+    python3 scripts/multi_search.py "검색어" --local-first
+    python3 scripts/multi_search.py search-history "검색어"
+    python3 scripts/multi_search.py similar "검색어"
+    python3 scripts/multi_search.py watch add "검색어" --every 24 && python3 scripts/multi_search.py watch run
+    python3 scripts/multi_search.py "검색어" --events fd:3 --output out.md 3>events.jsonl
+    python3 scripts/multi_search.py "검색어" --mode deep --timeout 600
+    python3 scripts/multi_search.py "검색어" --block-domains "pinterest.com,*.blogspot.com" --blocklist-file blocklist.txt
+    python3 scripts/multi_search.py "검색어" --regions KR,US,JP
+    python3 scripts/multi_search.py "검색어" --footnotes
+    python3 scripts/multi_search.py --batch queries.txt --export-dir export/ --research-id <UUID>
 """
 
 import argparse
 import json
 import os
 import sys
+import tempfile
+import threading
+import time
 import concurrent.futures
 from datetime import datetime
 
 
-def run_openai_search(query: str, mode: str, lang: str) -> dict:
-    """OpenAI Responses API + web_search 실행"""
+def provider_search(provider: str, search, query: str, reuse: dict | None, **params) -> tuple[dict, dict | None]:
+    """
+    프로바이더 search() 호출. reuse가 주어지면 유사 검색어 결과 재사용(query_index)을 거칩니다.
+
+    reuse: {"fresh": bool, "threshold": float, "max_age_hours": float} 또는 None
+    진행 중인 같은 요청과는 single_flight로 합쳐 API를 한 번만 호출합니다.
+    """
+    from single_flight import coalesced
+
+    search = coalesced(provider, search)
+    if reuse is None:
+        return search(query, **params), None
+    from query_index import search_with_reuse
+    return search_with_reuse(provider, search, query, **reuse, **params)
+
+
+def region_location(region: str | None) -> dict | None:
+    """국가 코드(KR, US, ...) → web_search 도구의 user_location"""
+    return {"type": "approximate", "country": region} if region else None
+
+
+def success_result(provider: str, text: str, raw: dict, reused: dict | None, dropped: list | None = None) -> dict:
+    result = {"provider": provider, "status": "success", "text": text, "raw": raw}
+    if reused:
+        result["reused_from"] = reused
+    if dropped:
+        result["dropped_sources"] = dropped
+    return result
+
+
+def run_openai_search(
+    query: str,
+    mode: str,
+    lang: str,
+    reuse: dict | None = None,
+    on_event=None,
+    deadline: float | None = None,
+    policy: dict | None = None,
+    region: str | None = None,
+) -> dict:
+    """OpenAI Responses API + web_search 실행 (deep 모드는 백그라운드 실행 후 deadline까지 폴링)"""
     try:
+        from domain_policy import apply_policy, native_allowed_domains
         from openai_search import search, extract_response
-        result = search(query, mode=mode, lang=lang)
+        result, reused = provider_search(
+            "openai", search, query, reuse, mode=mode, lang=lang, on_event=on_event, deadline=deadline,
+            allowed_domains=native_allowed_domains(policy), user_location=region_location(region),
+        )
+        result, dropped = apply_policy("openai", result, policy)
         text = extract_response(result)
-        return {"provider": "OpenAI", "status": "success", "text": text, "raw": result}
+        return success_result("OpenAI", text, result, reused, dropped)
     except SystemExit:
         return {"provider": "OpenAI", "status": "error", "text": "API 키 미설정 또는 API 오류", "raw": None}
     except Exception as e:
         return {"provider": "OpenAI", "status": "error", "text": str(e), "raw": None}
 
 
-def run_anthropic_search(query: str, mode: str, lang: str) -> dict:
+def run_anthropic_search(
+    query: str,
+    mode: str,
+    lang: str,
+    reuse: dict | None = None,
+    on_event=None,
+    policy: dict | None = None,
+    region: str | None = None,
+) -> dict:
     """Anthropic Claude Messages API + web_search 실행"""
     try:
         from anthropic_search import search, extract_response
-        result = search(query, mode=mode, lang=lang)
+        from domain_policy import apply_policy, native_allowed_domains
+        result, reused = provider_search(
+            "anthropic", search, query, reuse, mode=mode, lang=lang, on_event=on_event,
+            allowed_domains=native_allowed_domains(policy), user_location=region_location(region),
+        )
+        result, dropped = apply_policy("anthropic", result, policy)
         text = extract_response(result)
-        return {"provider": "Anthropic", "status": "success", "text": text, "raw": result}
+        return success_result("Anthropic", text, result, reused, dropped)
     except SystemExit:
         return {"provider": "Anthropic", "status": "error", "text": "API 키 미설정 또는 API 오류", "raw": None}
     except Exception as e:
         return {"provider": "Anthropic", "status": "error", "text": str(e), "raw": None}
 
 
-def run_gemini_search(query: str, mode: str, lang: str) -> dict:
-    """Gemini API + google_search 그라운딩 실행"""
+def run_gemini_search(
+    query: str, mode: str, lang: str, reuse: dict | None = None, on_event=None, policy: dict | None = None
+) -> dict:
+    """Gemini API + google_search 그라운딩 실행 (API 도메인 필터가 없으므로 정책은 로컬 후처리로만 적용)"""
     gemini_mode = "grounding" if mode == "search" else mode
     try:
+        from domain_policy import apply_policy
         from gemini_search import search, extract_response
-        result = search(query, mode=gemini_mode, lang=lang)
+        result, reused = provider_search(
+            "gemini", search, query, reuse, mode=gemini_mode, lang=lang, on_event=on_event
+        )
+        result, dropped = apply_policy("gemini", result, policy)
         text = extract_response(result)
-        return {"provider": "Gemini", "status": "success", "text": text, "raw": result}
+        return success_result("Gemini", text, result, reused, dropped)
     except SystemExit:
         return {"provider": "Gemini", "status": "error", "text": "API 키 미설정 또는 API 오류", "raw": None}
     except Exception as e:
         return {"provider": "Gemini", "status": "error", "text": str(e), "raw": None}
 
 
-def format_combined_report(query: str, results: list, mode: str) -> str:
-    """통합 검색 보고서 생성"""
+def format_combined_report(query: str, results: list, mode: str, footnotes: bool = False) -> str:
+    """통합 검색 보고서 생성 (footnotes=True이면 답변 본문에 문장별 인라인 각주 표시)"""
     now = datetime.now().strftime("%Y-%m-%d %H:%M")
     successful = [r for r in results if r["status"] == "success"]
     failed = [r for r in results if r["status"] == "error"]
@@ -68,7 +146,7 @@ def format_combined_report(query: str, results: list, mode: str) -> str:
 _검색어: {query}_
 _모드: {mode}_
 _생성일: {now}_
-_프로바이더: {', '.join(r['provider'] for r in results)}_
+_프로바이더: {', '.join(r['provider'] + (f"/{r['region']}" if r.get("region") else "") for r in results)}_
 _성공: {len(successful)}/{len(results)}_
 
 ---
@@ -78,8 +156,24 @@ _성공: {len(successful)}/{len(results)}_
     # 프로바이더별 결과
     for r in results:
         status_icon = "✅" if r["status"] == "success" else "❌"
-        report += f"## {status_icon} {r['provider']} 검색 결과\n\n"
-        report += r["text"] + "\n\n"
+        region = f" ({r['region']})" if r.get("region") else ""
+        report += f"## {status_icon} {r['provider']}{region} 검색 결과\n\n"
+        if r.get("reused_from"):
+            reused = r["reused_from"]
+            report += (
+                f"> ♻️ 유사 검색어 _{reused['query']}_ 의 결과 재사용 "
+                f"(유사도 {reused['similarity']:.2f}, {reused['age_hours']:.1f}시간 전)\n\n"
+            )
+        if r.get("dropped_sources"):
+            from domain_policy import summarize_dropped
+
+            report += f"> 🚫 도메인 정책으로 제외: {summarize_dropped(r['dropped_sources'])}\n\n"
+        if footnotes:
+            from span_index import footnoted_text
+
+            report += footnoted_text(r) + "\n\n"
+        else:
+            report += r["text"] + "\n\n"
         report += "---\n\n"
 
     # 교차 검증 가이드
@@ -90,18 +184,408 @@ _성공: {len(successful)}/{len(results)}_
         report += "- 1개 프로바이더에서만 나온 정보는 ⚠️ (추가 검증 필요)\n"
         report += "- 프로바이더 간 상충되는 정보는 🔴 (모순 추적 필요)\n\n"
 
+    if any(r.get("region") for r in successful):
+        report += format_region_section(successful)
+
     if failed:
         report += "## ⚠️ 검색 실패 프로바이더\n\n"
         for r in failed:
-            report += f"- **{r['provider']}**: {r['text']}\n"
+            region = f" ({r['region']})" if r.get("region") else ""
+            report += f"- **{r['provider']}{region}**: {r['text']}\n"
         report += "\n"
 
     return report
 
 
+def format_region_section(results: list, limit: int = 10) -> str:
+    """
+    지역별 차이 섹션: 지역별 소스 수, 공통 소스 수, 한 지역에서만 나온 소스 목록.
+    지역 없이 한 번만 실행한 프로바이더(Gemini)의 소스는 "공통" 판정에만 참고합니다.
+    """
+    from source_utils import merge_regional_sources
+
+    merged = merge_regional_sources(results)
+    regions = list(dict.fromkeys(r["region"] for r in results if r.get("region")))
+    if len(regions) < 2:
+        return ""
+    regional = [s for s in merged if s["regions"]]
+    shared = [s for s in regional if len(s["regions"]) == len(regions)]
+
+    report = "## 🌏 지역별 차이\n\n"
+    report += f"- 지역: {', '.join(regions)} · 지역별 검색 소스 {len(regional)}개 (전 지역 공통 {len(shared)}개)\n"
+    for region in regions:
+        count = sum(1 for s in regional if region in s["regions"])
+        only = [s for s in regional if s["regions"] == [region] and not s["global"]]
+        report += f"- **{region}**: 소스 {count}개, {region}에서만 {len(only)}개\n"
+    for region in regions:
+        only = [s for s in regional if s["regions"] == [region] and not s["global"]]
+        if not only:
+            continue
+        report += f"\n### {region}에서만 나온 소스\n"
+        for s in only[:limit]:
+            report += f"- [{s['title'] or s['url']}]({s['url']}) — {', '.join(s['providers'])}\n"
+        if len(only) > limit:
+            report += f"- ... 외 {len(only) - limit}개\n"
+    return report + "\n"
+
+
+class EventWriter:
+    """
+    진행 이벤트를 한 줄에 JSON 하나씩 기록 (웹 앱의 진행 표시용).
+
+    target: "stderr" | "fd:N" (또는 "N") | 파일 경로
+    모든 이벤트에 event, ts(epoch 초), elapsed(시작 후 초)가 포함됩니다.
+
+    target이 stderr이면 원래 stderr(fd 2)를 복제해 이벤트 전용으로 쓰고, fd 2는 close()까지
+    임시 파일로 돌립니다. 프로바이더 모듈의 경고/ERROR 출력(후처리 하위 프로세스 포함)이
+    이벤트 줄 사이에 섞이지 않아 stderr가 JSON Lines로만 구성되며, 실패로 끝나면 main이
+    error 이벤트(type, message)를 남긴 뒤 fd 2를 되돌려 traceback은 원래 stderr에 출력됩니다.
+    """
+
+    def __init__(self, target: str):
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._owns_stream = True
+        self._saved_stderr = None
+        self._captured = None
+        if target == "stderr":
+            sys.stderr.flush()
+            self._saved_stderr = os.dup(2)
+            self._stream = os.fdopen(os.dup(2), "w", encoding="utf-8", buffering=1)
+            # 가려진 stderr 출력은 임시 파일에 모아 두고 실패 시 error 이벤트 메시지로 사용
+            self._captured = tempfile.TemporaryFile()
+            os.dup2(self._captured.fileno(), 2)
+        elif target.startswith("fd:") or target.isdigit():
+            fd = int(target.removeprefix("fd:"))
+            self._stream = os.fdopen(fd, "w", encoding="utf-8", buffering=1, closefd=False)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+            self._stream = open(target, "a", encoding="utf-8", buffering=1)
+
+    def emit(self, event: str, **fields) -> None:
+        record = {
+            "event": event,
+            "ts": round(time.time(), 3),
+            "elapsed": round(time.monotonic() - self._started, 3),
+            **fields,
+        }
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+    def last_error_line(self) -> str | None:
+        """가려진 stderr 출력 중 마지막 "ERROR:" 줄 (stderr 대상이 아니거나 없으면 None)"""
+        if self._captured is None:
+            return None
+        sys.stderr.flush()
+        self._captured.seek(0)
+        lines = self._captured.read().decode("utf-8", "replace").splitlines()
+        return next((line for line in reversed(lines) if line.startswith("ERROR:")), None)
+
+    def close(self) -> None:
+        if self._owns_stream:
+            self._stream.close()
+        if self._saved_stderr is not None:
+            sys.stderr.flush()
+            os.dup2(self._saved_stderr, 2)
+            os.close(self._saved_stderr)
+            self._saved_stderr = None
+        if self._captured is not None:
+            self._captured.close()
+            self._captured = None
+
+
+# --events stderr 사용 시 사람용 진행 메시지는 끔 (JSON 줄만 남도록)
+_log_enabled = True
+
+
+def log(message: str) -> None:
+    if _log_enabled:
+        print(message, file=sys.stderr)
+
+
+def log_coalesced() -> None:
+    """동시에 진행 중이던 같은 요청을 합친 경우 프로바이더별 횟수 출력"""
+    from single_flight import stats
+
+    merged = {p: s["coalesced"] for p, s in stats().items() if s["coalesced"]}
+    if merged:
+        log(f"🔗 동일 요청 합치기: {', '.join(f'{p} {n}건' for p, n in merged.items())} (API 호출 생략)")
+
+
+def result_metrics(result: dict) -> dict:
+    """provider_done 이벤트용 소스/인용 수"""
+    from source_utils import canonicalize_url, extract_result_sources
+
+    try:
+        refs = extract_result_sources(result)
+    except Exception:
+        return {"sources": 0, "citations": 0}
+    unique = lambda items: len({canonicalize_url(r.get("url", "")) for r in items} - {""})
+    return {"sources": unique(refs["sources"] + refs["citations"]), "citations": unique(refs["citations"])}
+
+
+def run_job(
+    query: str,
+    provider: str,
+    mode: str,
+    lang: str,
+    reuse: dict | None,
+    events: EventWriter | None,
+    deadline: float | None = None,
+    policy: dict | None = None,
+    region: str | None = None,
+) -> dict:
+    """
+    작업 하나 실행. events가 있으면 provider_started/first_token/provider_done 이벤트 기록.
+
+    deadline(epoch 초)이 지났으면 호출하지 않고 시간 초과 오류를 반환하며,
+    deadline을 지원하는 프로바이더(DEADLINE_PROVIDERS)에는 그대로 전달합니다.
+    policy는 domain_policy.compile_policy 결과로, 모든 프로바이더 응답에 적용합니다.
+    region(국가 코드)은 REGION_PROVIDERS에 user_location으로 전달하고 결과에 "region"으로 표시합니다.
+    """
+    tag = {"region": region} if region else {}
+    if deadline is not None and time.time() >= deadline:
+        if events:
+            events.emit("provider_done", query=query, provider=provider, status="error", error="timeout", **tag)
+        return {
+            "provider": PROVIDER_LABELS[provider], "status": "error", "text": "시간 초과 (--timeout)", "raw": None, **tag
+        }
+    kwargs = {"deadline": deadline} if deadline is not None and provider in DEADLINE_PROVIDERS else {}
+    if policy is not None:
+        kwargs["policy"] = policy
+    if region and provider in REGION_PROVIDERS:
+        kwargs["region"] = region
+
+    if events is None:
+        return {**SEARCH_FUNCS[provider](query, mode, lang, reuse, **kwargs), **tag}
+
+    started = time.monotonic()
+    received = {"bytes": 0}
+
+    def on_event(name: str, **fields) -> None:
+        if name == "first_token":
+            events.emit("first_token", query=query, provider=provider,
+                        latency=round(time.monotonic() - started, 3))
+        elif name == "response":
+            received["bytes"] += fields.get("bytes", 0)
+        elif name == "background":
+            events.emit("provider_background", query=query, provider=provider, **fields)
+        elif name == "continuation":
+            events.emit("provider_continuation", query=query, provider=provider, **tag, **fields)
+        elif name == "coalesced":
+            events.emit("provider_coalesced", query=query, provider=provider, **tag)
+
+    events.emit("provider_started", query=query, provider=provider, mode=mode, **tag)
+    result = {**SEARCH_FUNCS[provider](query, mode, lang, reuse, on_event, **kwargs), **tag}
+    events.emit(
+        "provider_done",
+        query=query,
+        provider=provider,
+        **tag,
+        status=result["status"],
+        latency=round(time.monotonic() - started, 3),
+        bytes=received["bytes"],
+        reused=bool(result.get("reused_from")),
+        dropped=len(result.get("dropped_sources", [])),
+        **result_metrics(result),
+        **({"error": result["text"]} if result["status"] == "error" else {}),
+    )
+    return result
+
+
+SEARCH_FUNCS = {
+    "openai": run_openai_search,
+    "anthropic": run_anthropic_search,
+    "gemini": run_gemini_search,
+}
+PROVIDER_LABELS = {"openai": "OpenAI", "anthropic": "Anthropic", "gemini": "Gemini"}
+# search()가 deadline 인자를 받는 프로바이더
+DEADLINE_PROVIDERS = {"openai"}
+# search()가 user_location을 받는 프로바이더 (나머지는 --regions와 무관하게 한 번만 실행)
+REGION_PROVIDERS = {"openai", "anthropic"}
+
+
+def load_batch_queries(path: str) -> list[str]:
+    """배치 파일 읽기 (한 줄에 검색어 하나, 빈 줄과 # 주석은 무시)"""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def iter_results(
+    queries: list[str],
+    providers: list[str],
+    mode: str,
+    lang: str,
+    max_workers: int = 3,
+    reuse: dict | None = None,
+    events: EventWriter | None = None,
+    deadline: float | None = None,
+    policy: dict | None = None,
+    regions: list[str] | None = None,
+):
+    """
+    (query, provider) 조합을 병렬 실행하고 완료되는 순서대로 (query, result)를 yield.
+    deadline(epoch 초)이 지난 뒤 시작할 작업은 실행하지 않고 시간 초과 오류로 반환합니다.
+    regions가 주어지면 REGION_PROVIDERS는 지역마다 한 번씩, 나머지는 한 번만 실행합니다.
+
+    결과를 모아두지 않으므로 배치 크기와 무관하게 메모리 사용량이 일정합니다.
+    한 번에 제출하는 작업 수를 max_workers의 2배로 제한합니다.
+    """
+    jobs = iter([
+        (q, p, r)
+        for q in queries
+        for p in providers if p in SEARCH_FUNCS
+        for r in (regions if regions and p in REGION_PROVIDERS else [None])
+    ])
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+
+        def submit_next() -> bool:
+            job = next(jobs, None)
+            if job is None:
+                return False
+            query, provider, region = job
+            futures[executor.submit(run_job, query, provider, mode, lang, reuse, events, deadline, policy, region)] = job
+            return True
+
+        for _ in range(max_workers * 2):
+            if not submit_next():
+                break
+
+        while futures:
+            done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                query, provider, region = futures.pop(future)
+                name = f"{provider}/{region}" if region else provider
+                try:
+                    result = future.result()
+                    status = "✅" if result["status"] == "success" else "❌"
+                    log(f"   {status} {name} 완료")
+                except Exception as e:
+                    tag = {"region": region} if region else {}
+                    result = {
+                        "provider": provider.capitalize(),
+                        "status": "error",
+                        "text": f"실행 오류: {str(e)}",
+                        "raw": None,
+                        **tag,
+                    }
+                    log(f"   ❌ {name} 오류: {e}")
+                    if events:
+                        events.emit("provider_done", query=query, provider=provider, **tag, status="error", error=str(e))
+                yield query, result
+                submit_next()
+
+
+def ndjson_record(query: str, result: dict, mode: str, include_raw: bool = True, sentences: bool = False) -> str:
+    """NDJSON 한 줄 (compact JSON, 개행 없음). sentences=True이면 문장별 근거(span_index) 포함"""
+    record = {"query": query, "mode": mode, **result}
+    if sentences:
+        from span_index import build_index
+
+        index = build_index(result)
+        if index is not None:
+            record["sentences"] = index.sentences()
+    if not include_raw:
+        record.pop("raw", None)
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def record_history(results_iter, mode: str, lang: str):
+    """결과를 그대로 흘려보내면서 로컬 검색 이력 인덱스(search_history)와 벡터 인덱스(vector_store)에 저장"""
+    import search_history
+
+    conn = search_history.connect()
+    run_ids = {}
+    store = None
+    try:
+        import vector_store
+
+        store = vector_store.open_store()
+    except Exception as e:
+        log(f"   ⚠️ 벡터 인덱스 열기 실패: {e}")
+    try:
+        for query, result in results_iter:
+            if result.get("reused_from"):
+                # 재사용한 결과는 원래 검색 때 이미 저장됨
+                yield query, result
+                continue
+            try:
+                if query not in run_ids:
+                    run_ids[query] = search_history.start_run(conn, query, mode, lang)
+                search_history.index_result(conn, run_ids[query], query, result)
+            except Exception as e:
+                log(f"   ⚠️ 검색 이력 저장 실패: {e}")
+            if store:
+                try:
+                    store.add_result(query, result, mode)
+                except Exception as e:
+                    log(f"   ⚠️ 벡터 인덱스 저장 실패: {e}")
+            yield query, result
+    finally:
+        conn.close()
+        if store:
+            store.close()
+
+
+def show_local_history(queries: list[str], mode: str, out) -> int:
+    """이전 검색 결과를 out에 출력. 찾은 결과 수 반환"""
+    import search_history
+
+    found = 0
+    for query in queries:
+        rows = search_history.lookup(query, mode=mode)
+        found += len(rows)
+        print(search_history.format_history(query, rows), file=out)
+    return found
+
+
+def run_subcommand(argv: list[str]) -> bool:
+    """첫 인자가 서브커맨드(search-history, watch, similar)이면 실행하고 True 반환"""
+    if not argv:
+        return False
+    if argv[0] == "search-history":
+        import search_history
+
+        search_history.main(argv[1:])
+        return True
+    if argv[0] == "watch":
+        import watch
+
+        watch.main(argv[1:])
+        return True
+    if argv[0] == "similar":
+        import vector_store
+
+        vector_store.main(argv)
+        return True
+    return False
+
+
 def main():
-    parser = argparse.ArgumentParser(description="멀티 프로바이더 통합 검색")
-    parser.add_argument("query", help="검색할 주제 또는 질문")
+    # 스크립트 디렉토리를 Python 경로에 추가
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+
+    if run_subcommand(sys.argv[1:]):
+        return
+
+    parser = argparse.ArgumentParser(
+        description="멀티 프로바이더 통합 검색",
+        epilog=(
+            "서브커맨드: search-history (이전 검색 결과 조회), watch (저장된 검색어 주기 실행 및 변화 보고), "
+            "similar (의미가 비슷한 이전 답변 조회)"
+        ),
+    )
+    parser.add_argument("query", nargs="?", help="검색할 주제 또는 질문")
+    parser.add_argument(
+        "--batch",
+        help="검색어 목록 파일 (한 줄에 하나, # 주석 허용)",
+    )
     parser.add_argument(
         "--mode",
         choices=["search", "verify", "deep"],
@@ -124,67 +608,326 @@ def main():
         help="결과를 저장할 파일 경로 (미지정 시 stdout 출력)",
     )
     parser.add_argument("--raw", action="store_true", help="원본 JSON 출력")
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="프로바이더 완료 시마다 JSON 한 줄씩 즉시 출력 (NDJSON 스트리밍)",
+    )
+    parser.add_argument(
+        "--no-raw-payload",
+        action="store_true",
+        help="--ndjson 레코드에서 원본 응답(raw) 필드 제외",
+    )
+    parser.add_argument(
+        "--footnotes",
+        action="store_true",
+        help="답변 본문에 문장별 인라인 각주 표시 (--ndjson이면 문장별 근거 sentences 필드 추가, --procs 미적용)",
+    )
+    parser.add_argument(
+        "--fetch-sources",
+        action="store_true",
+        help="결과의 소스 URL을 직접 병렬 페치하여 응답 여부를 보고서에 추가 (마크다운 보고서 전용, --raw/--ndjson 불가)",
+    )
+    parser.add_argument(
+        "--local-first",
+        action="store_true",
+        help="API 호출 전에 로컬 검색 이력에서 일치하는 이전 결과를 먼저 표시 (stderr)",
+    )
+    parser.add_argument(
+        "--local-only",
+        action="store_true",
+        help="API를 호출하지 않고 로컬 검색 이력만 조회",
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="이번 결과를 로컬 검색 이력에 저장하지 않음",
+    )
+    parser.add_argument(
+        "--domains",
+        default=None,
+        help="허용 도메인 (콤마 구분, 하위 도메인 포함, *.example.com은 하위 도메인만). 3사 모두 로컬 필터 적용",
+    )
+    parser.add_argument(
+        "--block-domains",
+        default=None,
+        help="차단 도메인 (콤마 구분). 3사 모두 결과에서 해당 소스/인용 제외",
+    )
+    parser.add_argument(
+        "--blocklist-file",
+        action="append",
+        default=[],
+        help="차단 도메인 목록 파일 (한 줄에 하나, hosts 형식 허용, 여러 번 지정 가능)",
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="유사 검색어의 최근 결과를 재사용하지 않고 항상 새로 검색",
+    )
+    parser.add_argument(
+        "--reuse-hours",
+        type=float,
+        default=6.0,
+        help="유사 검색어 결과 재사용 기간(시간, 0이면 재사용 안 함, 기본: 6)",
+    )
+    parser.add_argument(
+        "--similarity",
+        type=float,
+        default=0.6,
+        help="재사용할 최소 검색어 유사도 0~1 (기본: 0.6)",
+    )
+    parser.add_argument(
+        "--events",
+        metavar="TARGET",
+        help="구조화된 진행 이벤트(JSON Lines) 기록 대상: stderr | fd:N | 파일 경로 (stderr이면 사람용 출력은 모두 끔)",
+    )
+    parser.add_argument(
+        "--procs",
+        type=int,
+        default=0,
+        help="후처리(파싱/추출/주장 대조/보고서)를 N개 프로세스에서 실행 (대량 배치용, 0이면 사용 안 함; 유사 검색어 재사용과 --events 미적용, --raw/--timeout/--regions와 함께 사용 불가)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="전체 대기 시간 한도(초). 이후 시작할 작업은 건너뛰고, OpenAI 백그라운드 작업은 서버에서 계속되어 재실행 시 이어받음",
+    )
+    parser.add_argument(
+        "--regions",
+        default=None,
+        help="지역(국가 코드, 콤마 구분, 예: KR,US,JP)마다 OpenAI/Anthropic을 동시에 실행하고 지역별 차이를 보고 (Gemini는 한 번만 실행)",
+    )
+    parser.add_argument(
+        "--export-dir",
+        default=None,
+        help="research_source(--mode verify면 fact_check_result 포함) 테이블용 COPY 파일과 load.sql을 이 디렉토리에 기록",
+    )
+    parser.add_argument(
+        "--export-format",
+        choices=["tsv", "csv"],
+        default="tsv",
+        help="--export-dir 파일 형식 (기본: tsv, COPY text 형식)",
+    )
+    parser.add_argument("--research-id", default=None, help="--export-dir 행의 research.id (UUID, 모든 검색어 공통)")
+    parser.add_argument("--research-ids", default=None, help="검색어별 research.id 파일 (\"검색어<TAB>UUID\" 한 줄씩)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="동시 실행 수 (기본: 3, --regions 사용 시 검색어당 작업 수)",
+    )
 
     args = parser.parse_args()
+    if bool(args.query) == bool(args.batch):
+        parser.error("검색어 또는 --batch 중 하나만 지정하세요")
+
+    queries = load_batch_queries(args.batch) if args.batch else [args.query]
+    # 결과를 검색어별로 모으므로 같은 검색어가 두 번 있으면 결과가 한 항목에 섞임 → 한 번만 실행
+    duplicate_queries = len(queries) - len(dict.fromkeys(queries))
+    queries = list(dict.fromkeys(queries))
     providers = [p.strip().lower() for p in args.providers.split(",")]
+    regions = [r.strip().upper() for r in args.regions.split(",") if r.strip()] if args.regions else None
+    if regions and args.procs > 0:
+        parser.error("--regions는 --procs와 함께 사용할 수 없습니다")
+    if args.procs > 0 and args.raw:
+        parser.error("--raw는 --procs와 함께 사용할 수 없습니다 (후처리 결과에는 원본 응답이 없음)")
+    if args.procs > 0 and args.timeout:
+        parser.error("--timeout은 --procs와 함께 사용할 수 없습니다")
+    if args.fetch_sources and (args.raw or args.ndjson):
+        parser.error("--fetch-sources는 마크다운 보고서에만 추가되므로 --raw/--ndjson과 함께 사용할 수 없습니다")
+    jobs_per_query = sum(len(regions) if regions and p in REGION_PROVIDERS else 1 for p in providers) if regions else len(providers)
+    workers = args.workers
+    if workers is None:
+        workers = jobs_per_query if regions else 3
+    exporter = None
+    if args.export_dir:
+        from copy_export import Exporter, SchemaError, load_research_ids
 
-    # 스크립트 디렉토리를 Python 경로에 추가
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    if script_dir not in sys.path:
-        sys.path.insert(0, script_dir)
+        try:
+            research_ids = load_research_ids(args.research_id, args.research_ids)
+        except (OSError, ValueError) as e:
+            parser.error(f"research id 읽기 실패: {e}")
+        if not research_ids:
+            parser.error("--export-dir에는 --research-id 또는 --research-ids가 필요합니다")
+        if not isinstance(research_ids, str):
+            missing = [q for q in queries if q not in research_ids]
+            if missing:
+                parser.error(f"research id가 없는 검색어: {', '.join(missing[:5])}")
+        try:
+            exporter = Exporter(
+                args.export_dir, research_ids, args.export_format, fact_checks=args.mode == "verify"
+            )
+        except (OSError, SchemaError) as e:
+            print(f"ERROR: 내보내기 준비 실패: {e}", file=sys.stderr)
+            sys.exit(1)
 
-    print(f"🔍 멀티 프로바이더 검색 시작: '{args.query}'", file=sys.stderr)
-    print(f"   프로바이더: {', '.join(providers)} | 모드: {args.mode} | 언어: {args.lang}", file=sys.stderr)
+    if args.local_only:
+        found = show_local_history(queries, args.mode, sys.stdout)
+        log(f"🗂 로컬 검색 이력 {found}건")
+        return
+    events = EventWriter(args.events) if args.events else None
+    if args.events == "stderr":
+        global _log_enabled
+        _log_enabled = False
+    # 어떤 경로로 끝나든 stderr(fd 2)를 되돌리고, 실패면 error 이벤트를 남긴 뒤 예외를 그대로 전달
+    try:
+        run_search(args, queries, providers, regions, workers, jobs_per_query, duplicate_queries, exporter, events)
+    except BaseException as e:
+        if events and not (isinstance(e, SystemExit) and e.code in (0, None)):
+            events.emit("error", **error_fields(e, events))
+        raise
+    finally:
+        if events:
+            events.close()
 
-    # 병렬 검색 실행
-    results = []
-    search_funcs = {
-        "openai": run_openai_search,
-        "anthropic": run_anthropic_search,
-        "gemini": run_gemini_search,
-    }
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-        futures = {}
-        for provider in providers:
-            if provider in search_funcs:
-                future = executor.submit(search_funcs[provider], args.query, args.mode, args.lang)
-                futures[future] = provider
+def error_fields(error: BaseException, events: "EventWriter") -> dict:
+    """error 이벤트 필드. sys.exit(1)로 끝났으면 가려진 stderr의 마지막 ERROR: 줄을 메시지로 사용"""
+    if isinstance(error, SystemExit):
+        message = events.last_error_line() or f"exit {error.code}"
+        return {"type": "SystemExit", "code": error.code, "message": message}
+    return {"type": type(error).__name__, "message": str(error) or type(error).__name__}
 
-        for future in concurrent.futures.as_completed(futures):
-            provider = futures[future]
-            try:
-                result = future.result(timeout=180)
-                results.append(result)
-                status = "✅" if result["status"] == "success" else "❌"
-                print(f"   {status} {provider} 완료", file=sys.stderr)
-            except Exception as e:
-                results.append({
-                    "provider": provider.capitalize(),
-                    "status": "error",
-                    "text": f"실행 오류: {str(e)}",
-                    "raw": None,
-                })
-                print(f"   ❌ {provider} 오류: {e}", file=sys.stderr)
 
-    # 결과 정렬 (프로바이더 이름순)
-    results.sort(key=lambda r: r["provider"])
+def run_search(
+    args, queries, providers, regions, workers: int, jobs_per_query: int, duplicate_queries: int, exporter, events
+) -> None:
+    """main의 검색 → 저장/내보내기 → 출력 단계 (events 정리는 main이 담당)"""
+    if args.local_first and _log_enabled:
+        show_local_history(queries, args.mode, sys.stderr)
+
+    label = f"'{args.query}'" if args.query else f"배치 {len(queries)}건 ({args.batch})"
+    log(f"🔍 멀티 프로바이더 검색 시작: {label}")
+    log(f"   프로바이더: {', '.join(providers)} | 모드: {args.mode} | 언어: {args.lang}")
+    if regions:
+        log(f"   지역: {', '.join(regions)} (OpenAI/Anthropic 지역별 실행)")
+
+    deadline = time.time() + args.timeout if args.timeout else None
+    from domain_policy import compile_policy
+    from single_flight import total_coalesced
+
+    policy = compile_policy(
+        args.domains.split(",") if args.domains else None,
+        args.block_domains.split(",") if args.block_domains else None,
+        args.blocklist_file,
+    )
+    if duplicate_queries:
+        log(f"   배치 파일의 중복 검색어 {duplicate_queries}개는 한 번만 실행합니다")
+    if policy:
+        log(f"   도메인 정책: 허용 {len(policy['allowed_domains'])}개, 차단 {policy['blocked_count']}개")
+    reuse = None
+    if args.reuse_hours > 0:
+        reuse = {"fresh": args.fresh, "threshold": args.similarity, "max_age_hours": args.reuse_hours}
+    if events:
+        events.emit("started", queries=queries, providers=providers, mode=args.mode, lang=args.lang)
+    if args.procs > 0:
+        from postprocess import iter_processed_results
+
+        results_iter = iter_processed_results(
+            queries, providers, args.mode, args.lang, io_workers=max(1, workers), procs=args.procs, policy=policy
+        )
+    else:
+        results_iter = iter_results(
+            queries,
+            providers,
+            args.mode,
+            args.lang,
+            max_workers=max(1, workers),
+            reuse=reuse,
+            events=events,
+            deadline=deadline,
+            policy=policy,
+            regions=regions,
+        )
+    if not args.no_history:
+        results_iter = record_history(results_iter, args.mode, args.lang)
+    if exporter:
+        from copy_export import export_results
+
+        results_iter = export_results(results_iter, exporter, jobs_per_query)
+
+    # NDJSON: 완료되는 즉시 한 줄씩 기록하고 flush
+    if args.ndjson:
+        if args.output:
+            os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+            out = open(args.output, "w", encoding="utf-8")
+        else:
+            out = sys.stdout
+        total = succeeded = 0
+        try:
+            for query, result in results_iter:
+                out.write(ndjson_record(
+                    query, result, args.mode, include_raw=not args.no_raw_payload, sentences=args.footnotes
+                ) + "\n")
+                out.flush()
+                total += 1
+                succeeded += result["status"] == "success"
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        if args.output:
+            log(f"✅ 결과 저장: {args.output}")
+        log_coalesced()
+        log(f"🏁 멀티 프로바이더 검색 완료 ({succeeded}/{total} 성공)")
+        if events:
+            events.emit("finished", total=total, succeeded=succeeded, output=args.output, coalesced=total_coalesced())
+        return
+
+    results_by_query = {q: [] for q in queries}
+    for query, result in results_iter:
+        results_by_query[query].append(result)
+
+    # 결과 정렬 (프로바이더 이름순, 같은 프로바이더는 --regions 순서)
+    region_order = {r: i for i, r in enumerate(regions or [])}
+    for results in results_by_query.values():
+        results.sort(key=lambda r: (r["provider"], region_order.get(r.get("region"), -1)))
+    all_results = [r for results in results_by_query.values() for r in results]
 
     if args.raw:
-        output = json.dumps([r for r in results], ensure_ascii=False, indent=2, default=str)
+        if args.batch:
+            payload = [{"query": q, "results": rs} for q, rs in results_by_query.items()]
+        else:
+            payload = all_results
+        output = json.dumps(payload, ensure_ascii=False, indent=2, default=str)
     else:
-        output = format_combined_report(args.query, results, args.mode)
+        if args.procs > 0:
+            from postprocess import format_reports
+
+            reports = format_reports(results_by_query, args.mode, procs=args.procs)
+        else:
+            reports = [
+                format_combined_report(q, rs, args.mode, footnotes=args.footnotes) for q, rs in results_by_query.items()
+            ]
+
+        sections = []
+        for (q, rs), section in zip(results_by_query.items(), reports):
+            if args.fetch_sources:
+                from fetch_sources import fetch_sources, format_fetch_summary
+                from source_utils import collect_sources
+
+                urls = [s["url"] for s in collect_sources(rs)]
+                log(f"🌐 소스 URL {len(urls)}개 페치 중...")
+                section += format_fetch_summary(fetch_sources(urls))
+            sections.append(section)
+        output = "\n".join(sections)
 
     # 출력
     if args.output:
         os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
         with open(args.output, "w", encoding="utf-8") as f:
             f.write(output)
-        print(f"✅ 결과 저장: {args.output}", file=sys.stderr)
+        log(f"✅ 결과 저장: {args.output}")
     else:
         print(output)
 
-    print(f"🏁 멀티 프로바이더 검색 완료 ({len([r for r in results if r['status']=='success'])}/{len(results)} 성공)", file=sys.stderr)
+    succeeded = len([r for r in all_results if r["status"] == "success"])
+    log_coalesced()
+    log(f"🏁 멀티 프로바이더 검색 완료 ({succeeded}/{len(all_results)} 성공)")
+    if events:
+        events.emit(
+            "finished", total=len(all_results), succeeded=succeeded, output=args.output, coalesced=total_coalesced()
+        )
 
 
 if __name__ == "__main__":
@@ -10,21 +10,213 @@ OpenAI Responses API의 web_search 도구를 활용한 웹 검색 스크립트.
     python3 scripts/openai_search.py "검색어" --mode search|verify|deep
     python3 scripts/openai_search.py "검색어" --lang ko|en|both
     python3 scripts/openai_search.py "검색어" --domains "pubmed.ncbi.nlm.nih.gov,fda.gov"
+    python3 scripts/openai_search.py "검색어" --mode deep --timeout 900  # 백그라운드 실행 (deep 기본)
 """
 
 import argparse
+import hashlib
 import json
 import os
 import sys
+import time
 from datetime import datetime
 
+CACHE_DIR = os.environ.get("REAL_RESEARCH_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "real-research")
+BACKGROUND_DIR = os.path.join(CACHE_DIR, "openai_background")
 
-def get_api_key():
-    key = os.environ.get("OPENAI_API_KEY")
-    if not key:
+POLL_INITIAL = 2.0
+POLL_MAX = 20.0
+POLL_TIMEOUT = 30
+PENDING_MAX_AGE = 24 * 3600
+TERMINAL_STATUSES = {"completed", "failed", "cancelled", "incomplete"}
+
+
+def get_key_pool():
+    """OPENAI_API_KEY / OPENAI_API_KEYS / OPENAI_API_KEY_FILE로 구성한 키 풀 (key_pool 참고)"""
+    from key_pool import get_pool
+
+    pool = get_pool("openai")
+    if pool is None:
         print("ERROR: OPENAI_API_KEY 환경 변수가 설정되지 않았습니다.", file=sys.stderr)
         sys.exit(1)
-    return key
+    return pool
+
+
+class BackgroundPending(Exception):
+    """deadline까지 백그라운드 응답이 끝나지 않음. 응답 ID는 보존되어 같은 요청을 다시 실행하면 이어받습니다."""
+
+    def __init__(self, response_id: str, status: str):
+        super().__init__(
+            f"OpenAI 백그라운드 응답 {response_id} 미완료 (status={status}) — 같은 명령을 다시 실행하면 이어서 기다립니다"
+        )
+        self.response_id = response_id
+        self.status = status
+
+
+def request_key(payload: dict) -> str:
+    """요청 페이로드 해시 (백그라운드 응답 ID 저장 키)"""
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def pending_path(key: str) -> str:
+    return os.path.join(BACKGROUND_DIR, f"{key}.json")
+
+
+def load_pending(key: str) -> dict | None:
+    """
+    저장된 미완료 백그라운드 응답 {"id", "key_fingerprint", "created_at"} (PENDING_MAX_AGE가 지났으면 버림).
+    key_fingerprint는 제출한 API 키의 지문 (key_pool.fingerprint)
+    """
+    try:
+        with open(pending_path(key), encoding="utf-8") as f:
+            record = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if time.time() - record.get("created_at", 0) > PENDING_MAX_AGE or not record.get("id"):
+        clear_pending(key)
+        return None
+    return record
+
+
+def save_pending(key: str, response_id: str, key_fingerprint: str) -> None:
+    os.makedirs(BACKGROUND_DIR, exist_ok=True)
+    tmp_path = f"{pending_path(key)}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"id": response_id, "key_fingerprint": key_fingerprint, "created_at": time.time()}, f)
+    os.replace(tmp_path, pending_path(key))
+
+
+def clear_pending(key: str) -> None:
+    try:
+        os.remove(pending_path(key))
+    except FileNotFoundError:
+        pass
+
+
+def api_request(
+    key_pool, api_key: str, url: str, payload: dict | None = None, timeout: float = POLL_TIMEOUT
+) -> bytes:
+    """
+    Responses API 호출 (payload가 있으면 POST, 없으면 GET). 응답 본문 bytes 반환.
+    api_key 하나로만 요청하되 키 풀을 거쳐 rate limit 헤더와 429/401 쿨다운을 반영합니다.
+    """
+    import urllib.request
+
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+
+    def make_request(key: str) -> urllib.request.Request:
+        return urllib.request.Request(
+            url,
+            data=data,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {key}",
+            },
+            method="POST" if payload is not None else "GET",
+        )
+
+    with key_pool.urlopen(make_request, timeout=timeout, key=api_key) as resp:
+        return resp.read()
+
+
+def run_background(payload: dict, key_pool, deadline: float | None = None, on_event=None) -> bytes:
+    """
+    백그라운드 모드 실행: background=true로 제출하고 응답 ID로 완료될 때까지 폴링.
+
+    - 제출 직후 응답 ID와 제출한 키의 지문을 BACKGROUND_DIR에 저장하고, 같은 페이로드로 다시 호출하면
+      새로 제출하지 않고 그 키로 이어받음 (응답은 제출한 키로만 조회 가능, 키가 풀에서 빠졌으면 새로 제출)
+    - 폴링 간격은 POLL_INITIAL부터 1.5배씩 POLL_MAX까지 증가
+    - 제출/폴링도 키 풀을 거쳐 rate limit 헤더와 쿨다운을 반영 (키는 고정)
+    - 폴링 중 네트워크 오류/429/5xx는 작업을 버리지 않고 다음 폴링에서 재시도 (429는 retry-after 이상 대기)
+    - deadline(epoch 초)까지 끝나지 않으면 BackgroundPending (서버 작업과 저장된 ID는 유지)
+
+    완료(completed/incomplete) 상태의 응답 본문을 반환하고, 실패(failed/cancelled)는 API 오류로 종료합니다.
+    """
+    key = request_key(payload)
+    pending = load_pending(key)
+    api_key = None
+    if pending is not None:
+        # 지문이 없는 이전 형식 기록은 아무 키로나 이어받기를 시도 (404면 새로 제출)
+        if pending.get("key_fingerprint"):
+            api_key = key_pool.acquire_fingerprint(pending["key_fingerprint"])
+        else:
+            api_key = key_pool.acquire()
+        if api_key is None:
+            print(
+                f"   ⚠️ OpenAI 백그라운드 응답 {pending['id']}을 제출한 키가 키 풀에 없어 새로 제출합니다",
+                file=sys.stderr,
+            )
+            clear_pending(key)
+            pending = None
+    if api_key is None:
+        api_key = key_pool.acquire()
+    try:
+        body = poll_background(
+            payload, key, key_pool, api_key, pending["id"] if pending else None, deadline, on_event
+        )
+    finally:
+        key_pool.release(api_key)
+    if body is None:
+        # 저장된 응답이 서버에서 사라짐 → 새로 제출
+        return run_background(payload, key_pool, deadline, on_event)
+    return body
+
+
+def poll_background(
+    payload: dict, key: str, key_pool, api_key: str, response_id: str | None, deadline: float | None, on_event
+) -> bytes | None:
+    """run_background의 제출/폴링 본체 (키 하나로 실행). 이어받은 응답이 404로 사라졌으면 None"""
+    import urllib.error
+
+    from key_pool import fingerprint, parse_retry_after
+
+    resumed = response_id is not None
+    body = None
+    if resumed:
+        print(f"   ↻ OpenAI 백그라운드 응답 이어받기: {response_id}", file=sys.stderr)
+    else:
+        body = api_request(
+            key_pool,
+            api_key,
+            "https://api.openai.com/v1/responses",
+            {**payload, "background": True, "store": True},
+            timeout=60,
+        )
+        response_id = json.loads(body)["id"]
+        save_pending(key, response_id, fingerprint(api_key))
+
+    status = "queued"
+    delay = 0.0 if body is None else POLL_INITIAL
+    while True:
+        if body is not None:
+            status = json.loads(body).get("status", "")
+            if status in TERMINAL_STATUSES:
+                clear_pending(key)
+                if status in ("failed", "cancelled"):
+                    error = json.loads(body).get("error") or {}
+                    print(f"ERROR: OpenAI 백그라운드 응답 {status}: {error.get('message', '')}", file=sys.stderr)
+                    sys.exit(1)
+                return body
+            if on_event:
+                on_event("background", response_id=response_id, status=status)
+        if deadline is not None and time.time() + delay > deadline:
+            raise BackgroundPending(response_id, status)
+        time.sleep(delay)
+        delay = min(max(delay * 1.5, POLL_INITIAL), POLL_MAX)
+        try:
+            body = api_request(key_pool, api_key, f"https://api.openai.com/v1/responses/{response_id}")
+        except urllib.error.HTTPError as e:
+            if e.code == 404 and resumed:
+                clear_pending(key)
+                return None
+            if e.code != 429 and e.code < 500:
+                raise
+            # 제출한 키로만 조회할 수 있으므로 다른 키로 돌리지 않고 retry-after만큼 기다림
+            delay = max(delay, parse_retry_after(e.headers) or 0.0)
+            print(f"   ⚠️ OpenAI 백그라운드 폴링 실패 (HTTP {e.code}), 재시도: {response_id}", file=sys.stderr)
+        except (urllib.error.URLError, TimeoutError) as e:
+            print(f"   ⚠️ OpenAI 백그라운드 폴링 네트워크 오류, 재시도: {e}", file=sys.stderr)
 
 
 def search(
@@ -34,7 +226,11 @@ def search(
     model: str = "gpt-4.1",
     allowed_domains: list[str] | None = None,
     user_location: dict | None = None,
-) -> dict:
+    background: bool | None = None,
+    deadline: float | None = None,
+    on_event=None,
+    raw_bytes: bool = False,
+) -> dict | bytes:
     """
     OpenAI Responses API + web_search 도구를 사용한 웹 검색.
 
@@ -42,11 +238,25 @@ def search(
     - 도메인 필터: filters.allowed_domains (최대 100개)
     - 위치 기반: user_location (country, city, region, timezone)
     - 소스 포함: include=["web_search_call.action.sources"]
+
+    background=True이면 백그라운드 모드로 제출 후 폴링합니다 (run_background, None이면 deep 모드에서만).
+    클라이언트 타임아웃으로 작업이 버려지지 않고, 재실행 시 저장된 응답 ID로 이어받습니다.
+    deadline(epoch 초)을 넘기면 백그라운드 모드는 BackgroundPending, 동기 호출은 타임아웃 오류가 됩니다.
+
+    on_event(name, **fields): 진행 이벤트 콜백 (선택)
+    - "first_token": 응답 첫 바이트 수신 (비스트리밍 호출이므로 헤더 도착 시점)
+    - "response": 응답 본문 수신 완료 (bytes)
+    - "background": 백그라운드 응답 폴링 중 (response_id, status)
+
+    raw_bytes=True이면 JSON 파싱 없이 응답 본문(bytes)을 그대로 반환합니다 (postprocess 파이프라인용).
     """
     import urllib.request
     import urllib.error
 
-    api_key = get_api_key()
+    key_pool = get_key_pool()
+
+    if background is None:
+        background = mode == "deep"
 
     # 모드별 시스템 프롬프트
     system_prompts = {
@@ -96,20 +306,36 @@ def search(
         ],
     }
 
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        "https://api.openai.com/v1/responses",
-        data=data,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        },
-        method="POST",
-    )
-
     try:
-        with urllib.request.urlopen(req, timeout=120) as resp:
-            result = json.loads(resp.read().decode("utf-8"))
+        if background:
+            # 폴링은 제출한 키로 계속해야 하므로 run_background가 작업 전체에 키 하나를 사용
+            body = run_background(payload, key_pool, deadline=deadline, on_event=on_event)
+            if on_event:
+                on_event("first_token")
+        else:
+            timeout = 120 if deadline is None else max(1.0, min(120.0, deadline - time.time()))
+            data = json.dumps(payload).encode("utf-8")
+
+            def make_request(api_key: str) -> urllib.request.Request:
+                return urllib.request.Request(
+                    "https://api.openai.com/v1/responses",
+                    data=data,
+                    headers={
+                        "Content-Type": "application/json",
+                        "Authorization": f"Bearer {api_key}",
+                    },
+                    method="POST",
+                )
+
+            with key_pool.urlopen(make_request, timeout=timeout) as resp:
+                if on_event:
+                    on_event("first_token")
+                body = resp.read()
+        if on_event:
+            on_event("response", bytes=len(body))
+        if raw_bytes:
+            return body
+        result = json.loads(body.decode("utf-8"))
     except urllib.error.HTTPError as e:
         error_body = e.read().decode("utf-8") if e.fp else ""
         print(f"ERROR: OpenAI API 호출 실패 (HTTP {e.code}): {error_body}", file=sys.stderr)
@@ -121,29 +347,20 @@ def search(
     return result
 
 
-def extract_response(result: dict) -> str:
+def extract_sources(result: dict) -> dict:
     """
-    Responses API 응답에서 텍스트와 인용 추출.
+    Responses API 응답에서 인용과 검색 소스를 구조화하여 추출.
 
-    응답 구조 (output 배열):
-    - type: "web_search_call" → 검색 실행 정보 (status, id)
-    - type: "message" → content 배열 내 output_text + annotations
-      - annotation.type: "url_citation" → url, title, start_index, end_index
+    반환: {"citations": [{title, url}], "sources": [{title, url}]} (중복 포함, 응답 순서 유지)
     """
-    output_parts = []
     citations = []
     search_sources = []
 
-    if "output" not in result:
-        return "(응답 없음)"
-
-    for item in result["output"]:
+    for item in result.get("output", []):
         item_type = item.get("type")
 
-        # 검색 호출 정보
+        # 검색 호출 정보 (include 옵션으로 sources 포함)
         if item_type == "web_search_call":
-            status = item.get("status", "unknown")
-            # sources가 포함된 경우 (include 옵션)
             action = item.get("action", {})
             for source in action.get("sources", []):
                 search_sources.append({
@@ -151,11 +368,10 @@ def extract_response(result: dict) -> str:
                     "url": source.get("url", ""),
                 })
 
-        # 메시지 (텍스트 + 인용)
+        # 메시지 내 url_citation
         elif item_type == "message":
             for content in item.get("content", []):
                 if content.get("type") == "output_text":
-                    output_parts.append(content["text"])
                     for annotation in content.get("annotations", []):
                         if annotation.get("type") == "url_citation":
                             citations.append({
@@ -163,6 +379,70 @@ def extract_response(result: dict) -> str:
                                 "url": annotation.get("url", ""),
                             })
 
+    return {"citations": citations, "sources": search_sources}
+
+
+def extract_spans(result: dict) -> dict:
+    """
+    답변 본문과 url_citation 구간 추출 (span_index용).
+
+    반환: {"text": 본문(extract_response와 같은 결합), "sources": [{title, url}],
+    "spans": [{"start", "end", "sources": [소스 번호], "confidence": []}]}
+    start_index/end_index는 output_text 안의 문자 오프셋이므로 본문 내 위치로 옮깁니다.
+    """
+    parts, spans, sources, source_ids = [], [], [], {}
+    offset = 0  # 다음 part의 본문 내 시작 위치
+    for item in result.get("output", []):
+        if item.get("type") != "message":
+            continue
+        for content in item.get("content", []):
+            if content.get("type") != "output_text":
+                continue
+            base = offset
+            parts.append(content["text"])
+            offset += len(content["text"]) + 1
+            for annotation in content.get("annotations", []):
+                if annotation.get("type") != "url_citation" or not annotation.get("url"):
+                    continue
+                url = annotation["url"]
+                if url not in source_ids:
+                    source_ids[url] = len(sources)
+                    sources.append({"title": annotation.get("title", ""), "url": url})
+                start, end = annotation.get("start_index", 0), annotation.get("end_index", 0)
+                if end > start:
+                    spans.append({
+                        "start": base + start,
+                        "end": base + end,
+                        "sources": [source_ids[url]],
+                        "confidence": [],
+                    })
+    return {"text": "\n".join(parts), "sources": sources, "spans": spans}
+
+
+def extract_response(result: dict) -> str:
+    """
+    Responses API 응답에서 텍스트와 인용 추출.
+
+    응답 구조 (output 배열):
+    - type: "web_search_call" → 검색 실행 정보 (status, id)
+    - type: "message" → content 배열 내 output_text + annotations
+      - annotation.type: "url_citation" → url, title, start_index, end_index
+    """
+    output_parts = []
+
+    if "output" not in result:
+        return "(응답 없음)"
+
+    for item in result["output"]:
+        if item.get("type") == "message":
+            for content in item.get("content", []):
+                if content.get("type") == "output_text":
+                    output_parts.append(content["text"])
+
+    refs = extract_sources(result)
+    citations = refs["citations"]
+    search_sources = refs["sources"]
+
     text = "\n".join(output_parts)
 
     # 인용 URL 정리
@@ -218,6 +498,35 @@ def main():
         default=None,
         help="검색 위치 국가 코드 (예: KR, US, GB)",
     )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="유사 검색어의 최근 결과를 재사용하지 않고 항상 새로 검색",
+    )
+    parser.add_argument(
+        "--reuse-hours",
+        type=float,
+        default=6.0,
+        help="유사 검색어 결과 재사용 기간(시간, 0이면 재사용 안 함, 기본: 6)",
+    )
+    parser.add_argument(
+        "--similarity",
+        type=float,
+        default=0.6,
+        help="재사용할 최소 검색어 유사도 0~1 (기본: 0.6)",
+    )
+    parser.add_argument(
+        "--background",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="백그라운드 모드로 제출 후 폴링 (기본: deep 모드에서만)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="최대 대기 시간(초). 백그라운드 모드에서 초과하면 작업은 서버에서 계속되고 재실행 시 이어받음",
+    )
     parser.add_argument("--raw", action="store_true", help="원본 JSON 출력")
 
     args = parser.parse_args()
@@ -234,14 +543,27 @@ def main():
 
     print(f"🔍 OpenAI Web Search: '{args.query}' (mode={args.mode}, lang={args.lang})", file=sys.stderr)
 
-    result = search(
-        args.query,
-        mode=args.mode,
-        lang=args.lang,
-        model=args.model,
-        allowed_domains=allowed_domains,
-        user_location=user_location,
-    )
+    from query_index import search_with_reuse
+
+    try:
+        result, _ = search_with_reuse(
+            "openai",
+            search,
+            args.query,
+            fresh=args.fresh,
+            threshold=args.similarity,
+            max_age_hours=args.reuse_hours,
+            mode=args.mode,
+            lang=args.lang,
+            model=args.model,
+            allowed_domains=allowed_domains,
+            user_location=user_location,
+            background=args.background,
+            deadline=time.time() + args.timeout if args.timeout else None,
+        )
+    except BackgroundPending as e:
+        print(f"⏳ {e}", file=sys.stderr)
+        sys.exit(1)
 
     if args.raw:
         print(json.dumps(result, ensure_ascii=False, indent=2))
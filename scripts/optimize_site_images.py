@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Build responsive WebP/AVIF variants and optimized PNG fallbacks for the site images.
+
+Each source PNG in public/images is encoded in a separate worker process into
+several widths, and a manifest (public/images/optimized/manifest.json) records
+the dimensions, file sizes and a tiny blur placeholder for every variant.
+Sources whose content hash is unchanged since the last run are skipped.
+"""
+
+import argparse
+import base64
+import concurrent.futures
+import hashlib
+import io
+import json
+import os
+import sys
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "public", "images")
+VARIANTS_DIR = os.path.join(IMAGES_DIR, "optimized")
+MANIFEST_PATH = os.path.join(VARIANTS_DIR, "manifest.json")
+PUBLIC_PREFIX = "/images/optimized"
+
+WIDTHS = [320, 640, 960, 1280, 1920]
+FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 6},
+    "avif": {"format": "AVIF", "quality": 60, "speed": 6},
+}
+PLACEHOLDER_WIDTH = 16
+# Bump when encoder settings change so every variant is rebuilt.
+PIPELINE_VERSION = 1
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_key(path, formats):
+    """Hash of the source bytes plus the pipeline settings that shape the output.
+
+    Only the formats this Pillow can actually encode count, so gaining AVIF
+    support later invalidates entries that were written without it.
+    """
+    settings = json.dumps([PIPELINE_VERSION, WIDTHS, {fmt: FORMATS[fmt] for fmt in formats}], sort_keys=True)
+    return hashlib.sha256((file_hash(path) + settings).encode("utf-8")).hexdigest()
+
+
+def list_sources():
+    return sorted(
+        name for name in os.listdir(IMAGES_DIR)
+        if name.lower().endswith(".png") and os.path.isfile(os.path.join(IMAGES_DIR, name))
+    )
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(manifest):
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def entry_files(entry):
+    """File names (in VARIANTS_DIR) referenced by a manifest entry."""
+    outputs = entry.get("variants", []) + ([entry["fallback"]] if entry.get("fallback") else [])
+    return {os.path.basename(v["src"]) for v in outputs}
+
+
+def remove_files(names):
+    for name in names:
+        try:
+            os.remove(os.path.join(VARIANTS_DIR, name))
+        except FileNotFoundError:
+            pass
+
+
+def is_up_to_date(name, key, manifest):
+    entry = manifest.get(name)
+    if not entry or entry.get("sourceHash") != key or not entry.get("fallback"):
+        return False
+    return all(os.path.exists(os.path.join(VARIANTS_DIR, f)) for f in entry_files(entry))
+
+
+def supported_formats():
+    from PIL import features
+
+    return [fmt for fmt in FORMATS if features.check(fmt)]
+
+
+def target_widths(source_width):
+    widths = [w for w in WIDTHS if w < source_width]
+    # Always offer the native width so large screens never get an upscaled image.
+    widths.append(source_width)
+    return widths
+
+
+def encode_image(name, key, formats):
+    """Worker entry point: encode every variant of one source image. Runs in a child process."""
+    from PIL import Image
+
+    stem = os.path.splitext(name)[0]
+    with Image.open(os.path.join(IMAGES_DIR, name)) as source:
+        source.load()
+        has_alpha = source.mode in ("RGBA", "LA") or "transparency" in source.info
+        image = source.convert("RGBA" if has_alpha else "RGB")
+
+    width, height = image.size
+    variants = []
+    for w in target_widths(width):
+        h = round(height * w / width)
+        resized = image if w == width else image.resize((w, h), Image.LANCZOS)
+        for fmt in formats:
+            filename = f"{stem}-{w}.{fmt}"
+            path = os.path.join(VARIANTS_DIR, filename)
+            options = dict(FORMATS[fmt])
+            resized.save(path, options.pop("format"), **options)
+            variants.append({
+                "src": f"{PUBLIC_PREFIX}/{filename}",
+                "type": f"image/{fmt}",
+                "width": w,
+                "height": h,
+                "bytes": os.path.getsize(path),
+            })
+
+    # PNG fallback for browsers without WebP/AVIF, capped at the largest responsive width.
+    fallback_width = min(width, WIDTHS[-1])
+    fallback_height = round(height * fallback_width / width)
+    fallback = image if fallback_width == width else image.resize((fallback_width, fallback_height), Image.LANCZOS)
+    fallback_name = f"{stem}-{fallback_width}.png"
+    fallback_path = os.path.join(VARIANTS_DIR, fallback_name)
+    if has_alpha:
+        fallback.save(fallback_path, "PNG", optimize=True)
+    else:
+        # Opaque illustrations compress far better as 256-color palettes.
+        fallback.quantize(colors=256, method=Image.Quantize.MEDIANCUT).save(fallback_path, "PNG", optimize=True)
+
+    placeholder_height = max(1, round(height * PLACEHOLDER_WIDTH / width))
+    buf = io.BytesIO()
+    image.resize((PLACEHOLDER_WIDTH, placeholder_height), Image.BILINEAR).save(buf, "WEBP", quality=40)
+
+    return name, {
+        "sourceHash": key,
+        "width": width,
+        "height": height,
+        "variants": variants,
+        "fallback": {
+            "src": f"{PUBLIC_PREFIX}/{fallback_name}",
+            "type": "image/png",
+            "width": fallback_width,
+            "height": fallback_height,
+            "bytes": os.path.getsize(fallback_path),
+        },
+        "blurDataURL": "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii"),
+    }
+
+
+def optimize(names=None, workers=None, force=False):
+    """Encode variants for the given source names (default: every PNG). Returns the failure count."""
+    os.makedirs(VARIANTS_DIR, exist_ok=True)
+    manifest = load_manifest()
+    formats = supported_formats()
+    if "avif" not in formats:
+        print("  ℹ️  Pillow has no AVIF support here; writing WebP + PNG only")
+
+    sources = list_sources() if names is None else names
+    pending = []
+    for name in sources:
+        key = source_key(os.path.join(IMAGES_DIR, name), formats)
+        if not force and is_up_to_date(name, key, manifest):
+            print(f"  ⏭ {name} variants are up to date, skipping")
+        else:
+            pending.append((name, key))
+
+    # Drop entries (and their files) whose source image no longer exists.
+    for stale in set(manifest) - set(list_sources()):
+        remove_files(entry_files(manifest.pop(stale)))
+
+    failed = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(encode_image, name, key, formats): name for name, key in pending}
+        for future in concurrent.futures.as_completed(futures):
+            name = futures[future]
+            try:
+                _, entry = future.result()
+            except Exception as e:
+                print(f"  ❌ Error encoding {name}: {e}")
+                failed += 1
+                continue
+            # Variants from the previous encode that this one no longer produces (e.g. a
+            # narrower source or a format that is no longer available) would linger forever.
+            if name in manifest:
+                remove_files(entry_files(manifest[name]) - entry_files(entry))
+            manifest[name] = entry
+            total = sum(v["bytes"] for v in entry["variants"])
+            print(f"  ✅ {name}: {len(entry['variants'])} variants ({total / 1024:.0f} KiB total)")
+
+    save_manifest(manifest)
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build responsive variants for the Real Research site images")
+    parser.add_argument("--workers", type=int, default=None, help="Encoder processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-encode every image even if its source hash matches")
+    parser.add_argument("--only", default=None, help="Comma-separated source names to encode")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.only.split(",")] if args.only else None
+    missing = sorted(set(names or []) - set(list_sources()))
+    if missing:
+        print(f"ERROR: no such source image in {IMAGES_DIR}: {', '.join(missing)}", file=sys.stderr)
+        sys.exit(1)
+    print(f"🖼  Building responsive variants in {VARIANTS_DIR}\n")
+    failed = optimize(names, workers=args.workers, force=args.force)
+    print(f"📄 Manifest: {MANIFEST_PATH}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+배치 후처리 파이프라인 (스레드 I/O + 프로세스 풀 CPU 작업)
+
+대량 배치에서 응답 JSON 파싱, extract_response, URL 정규화, 주장 추출/대조, 보고서 생성이
+네트워크 스레드와 같은 프로세스에서 GIL을 두고 경쟁하지 않도록 분리합니다.
+
+- 네트워크 호출은 스레드 풀에서 실행하고 응답 본문을 파싱하지 않은 bytes로 받음
+- 파싱/추출/분석은 ProcessPoolExecutor에서 실행 (코어 수만큼 확장)
+- SHM_THRESHOLD 이상의 큰 응답은 pickle 대신 공유 메모리로 전달
+- 워커는 원본 응답(raw)을 돌려보내지 않고 추출 결과(text, refs, claims)만 반환
+
+사용법:
+    python3 scripts/multi_search.py --batch queries.txt --procs 8
+    python3 scripts/multi_search.py --batch queries.txt --procs 8 --ndjson --output results.ndjson
+"""
+
+import concurrent.futures
+import json
+import os
+import sys
+import multiprocessing
+from multiprocessing import resource_tracker, shared_memory
+
+from claims import extract_claims, match_claims
+from domain_policy import apply_policy, native_allowed_domains
+from single_flight import coalesced
+from source_utils import canonicalize_url, provider_module
+
+SHM_THRESHOLD = 1 << 20  # 1 MiB
+PROVIDER_LABELS = {"openai": "OpenAI", "anthropic": "Anthropic", "gemini": "Gemini"}
+
+
+def fetch_payload(
+    query: str, provider: str, mode: str, lang: str, policy: dict | None = None
+) -> tuple[bytes | None, str | None, int | None]:
+    """
+    네트워크 스레드: 응답 본문 bytes 반환. (body, error, max_uses)
+
+    max_uses는 Anthropic 요청에 쓴 web_search max_uses로, 검색 수익을 기록해야 할 때만 값이 있음
+    (raw_bytes 응답은 anthropic_search가 기록하지 않고, 합쳐진 호출의 응답은 선두 호출이 기록)
+    """
+    import anthropic_tuning
+
+    params = {}
+    if provider == "gemini" and mode == "search":
+        mode = "grounding"
+    if provider != "gemini" and native_allowed_domains(policy):
+        params["allowed_domains"] = native_allowed_domains(policy)
+    if provider == "anthropic":
+        params["max_search_uses"] = anthropic_tuning.choose_max_uses(mode)
+    events = []
+    try:
+        search = coalesced(provider, provider_module(provider).search)
+        body = search(
+            query, mode=mode, lang=lang, raw_bytes=True, on_event=lambda name, **_: events.append(name), **params
+        )
+    except SystemExit:
+        return None, "API 키 미설정 또는 API 오류", None
+    except Exception as e:
+        return None, str(e), None
+    return body, None, None if "coalesced" in events else params.get("max_search_uses")
+
+
+def to_payload_ref(body: bytes) -> tuple[tuple, shared_memory.SharedMemory | None]:
+    """워커에 넘길 페이로드 참조. 큰 응답은 공유 메모리에 복사하고 (ref, shm) 반환"""
+    if len(body) < SHM_THRESHOLD:
+        return ("bytes", body), None
+    shm = shared_memory.SharedMemory(create=True, size=len(body))
+    shm.buf[:len(body)] = body
+    return ("shm", shm.name, len(body)), shm
+
+
+def load_payload(ref: tuple) -> bytes:
+    if ref[0] == "bytes":
+        return ref[1]
+    shm = shared_memory.SharedMemory(name=ref[1])
+    # 세그먼트의 수명은 부모가 관리하므로 워커 자신의 resource_tracker 등록은 해제
+    # (그대로 두면 워커 종료 시 이미 unlink된 세그먼트를 "누수"로 경고함, Python < 3.13).
+    # fork 워커는 부모와 같은 tracker를 공유하므로 해제하면 부모의 등록이 지워져
+    # 부모의 unlink() 때 KeyError가 나므로 fork가 아닐 때만 해제
+    if multiprocessing.get_start_method() != "fork":
+        resource_tracker.unregister(shm._name, "shared_memory")
+    try:
+        return bytes(shm.buf[:ref[2]])
+    finally:
+        shm.close()
+
+
+def process_response(
+    query: str, provider: str, ref: tuple, max_claims: int = 50, policy: dict | None = None, with_yields: bool = False
+) -> tuple[dict, tuple | None]:
+    """
+    워커 프로세스: 응답 파싱 → 도메인 정책 적용 → 텍스트/인용 추출 → URL 정규화 → 주장 추출.
+
+    multi_search 결과와 같은 형태이되 raw 대신 refs(정규화 URL 포함)와 claims를 담습니다.
+    반환: (result, yields) — with_yields=True면 yields는 정책 적용 전 응답의
+    (anthropic_tuning.search_yields, 사용한 검색 수), 아니면 None (기록은 부모 프로세스에서)
+    """
+    from anthropic_tuning import search_yields
+
+    label = PROVIDER_LABELS[provider]
+    yields = None
+    try:
+        raw = json.loads(load_payload(ref))
+        if with_yields:
+            steps = search_yields(raw)
+            yields = (steps, raw.get("usage", {}).get("server_tool_use", {}).get("web_search_requests", len(steps)))
+        raw, dropped = apply_policy(provider, raw, policy)
+        module = provider_module(provider)
+        text = module.extract_response(raw)
+        refs = module.extract_sources(raw)
+    except Exception as e:
+        return {"provider": label, "status": "error", "text": f"후처리 오류: {e}", "raw": None}, None
+
+    for items in refs.values():
+        for item in items:
+            item["canonical_url"] = canonicalize_url(item.get("url", ""))
+    result = {
+        "provider": label,
+        "status": "success",
+        "text": text,
+        "raw": None,
+        "refs": refs,
+        "claims": extract_claims(text, max_claims=max_claims),
+    }
+    if dropped:
+        result["dropped_sources"] = dropped
+    return result, yields
+
+
+def record_search_yields(mode: str, yields: tuple, max_uses: int) -> None:
+    """워커가 계산한 Anthropic 검색 수익을 통계에 기록 (통계 파일은 부모 프로세스만 씀)"""
+    import anthropic_tuning
+
+    try:
+        anthropic_tuning.record_steps(mode, yields[0], yields[1], max_uses)
+    except OSError as e:
+        print(f"   ⚠️ 검색 수익 기록 실패: {e}", file=sys.stderr)
+
+
+def iter_processed_results(
+    queries: list[str],
+    providers: list[str],
+    mode: str,
+    lang: str,
+    io_workers: int = 3,
+    procs: int | None = None,
+    policy: dict | None = None,
+):
+    """
+    multi_search.iter_results와 같은 (query, result)를 yield하되 CPU 작업은 프로세스 풀에서 처리.
+
+    네트워크 + 후처리 대기 중인 작업 수를 io_workers * 2 + procs * 2로 제한해
+    배치 크기와 무관하게 메모리 사용량을 일정하게 유지합니다.
+    """
+    jobs = iter([(q, p) for q in queries for p in providers if p in PROVIDER_LABELS])
+    # 워커를 fork하기 전에 resource_tracker를 띄워 워커가 부모의 tracker를 공유하게 함
+    # (나중에 띄우면 워커마다 자기 tracker가 생겨 부모가 unlink한 세그먼트를 종료 시 다시 정리하려 함)
+    resource_tracker.ensure_running()
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=procs) as cpu_pool:
+        # fork 방식 풀은 첫 submit 때 워커를 한꺼번에 fork하므로, I/O 스레드를 만들기 전에
+        # 빈 작업 하나로 워커를 먼저 띄움 (스레드가 도는 중에 fork하면 그 스레드가 잡고 있던
+        # 락이 자식에서 영영 풀리지 않을 수 있음)
+        cpu_pool.submit(os.getpid).result()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=io_workers) as io_pool:
+            max_in_flight = io_workers * 2 + (procs or os.cpu_count() or 1) * 2
+            io_futures = {}
+            cpu_futures = {}
+
+            def submit_next() -> bool:
+                if len(io_futures) + len(cpu_futures) >= max_in_flight:
+                    return False
+                job = next(jobs, None)
+                if job is None:
+                    return False
+                io_futures[io_pool.submit(fetch_payload, job[0], job[1], mode, lang, policy)] = job
+                return True
+
+            while submit_next():
+                pass
+
+            while io_futures or cpu_futures:
+                done, _ = concurrent.futures.wait(
+                    list(io_futures) + list(cpu_futures), return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    if future in io_futures:
+                        query, provider = io_futures.pop(future)
+                        body, error, max_uses = future.result()
+                        if error is not None:
+                            print(f"   ❌ {provider} 오류: {error}", file=sys.stderr)
+                            yield query, {"provider": PROVIDER_LABELS[provider], "status": "error", "text": error, "raw": None}
+                            continue
+                        ref, shm = to_payload_ref(body)
+                        cpu_futures[cpu_pool.submit(
+                            process_response, query, provider, ref, policy=policy, with_yields=max_uses is not None
+                        )] = (query, provider, shm, max_uses)
+                    else:
+                        query, provider, shm, max_uses = cpu_futures.pop(future)
+                        if shm is not None:
+                            shm.close()
+                            shm.unlink()
+                        try:
+                            result, yields = future.result()
+                        except Exception as e:
+                            result = {"provider": PROVIDER_LABELS[provider], "status": "error", "text": f"후처리 오류: {e}", "raw": None}
+                            yields = None
+                        if yields is not None:
+                            record_search_yields(mode, yields, max_uses)
+                        status = "✅" if result["status"] == "success" else "❌"
+                        print(f"   {status} {provider} 완료", file=sys.stderr)
+                        yield query, result
+                while submit_next():
+                    pass
+
+
+def format_claim_section(results: list) -> str:
+    """프로바이더 간 주장 대조 섹션 (claims가 있는 결과만)"""
+    claims_by_provider = {r["provider"]: r["claims"] for r in results if r.get("claims")}
+    if len(claims_by_provider) < 2:
+        return ""
+
+    groups = match_claims(claims_by_provider)
+    total = len(claims_by_provider)
+    report = "## 🔎 주장 교차 확인\n\n"
+    confirmed = [g for g in groups if g["support"] >= 2]
+    single = [g for g in groups if g["support"] == 1]
+    for g in confirmed:
+        report += f"- ✅ ({g['support']}/{total}) {g['claim']} — {', '.join(g['providers'])}\n"
+    for g in single[:10]:
+        report += f"- ⚠️ (1/{total}) {g['claim']} — {g['providers'][0]}\n"
+    if len(single) > 10:
+        report += f"- … 단일 프로바이더 주장 {len(single) - 10}개 더 있음\n"
+    return report + "\n"
+
+
+def build_report(query: str, results: list, mode: str) -> str:
+    """워커 프로세스: 보고서 본문 + 주장 교차 확인 섹션"""
+    from multi_search import format_combined_report
+
+    return format_combined_report(query, results, mode) + format_claim_section(results)
+
+
+def format_reports(results_by_query: dict, mode: str, procs: int | None = None) -> list[str]:
+    """질의별 보고서를 프로세스 풀에서 병렬 생성 (입력 순서 유지)"""
+    with concurrent.futures.ProcessPoolExecutor(max_workers=procs) as pool:
+        futures = [pool.submit(build_report, q, rs, mode) for q, rs in results_by_query.items()]
+        return [f.result() for f in futures]
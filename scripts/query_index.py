@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+유사 검색어 인덱스 (MinHash + LSH)
+최근에 검색한 질문과 거의 같은 질문("GLP-1 부작용" ↔ "GLP-1 부작용 정리해줘")이
+다시 들어오면 API를 호출하지 않고 이전 응답을 재사용합니다.
+
+- 정규화: NFKC, 소문자화, 구두점 제거, 요청성 불용어(정리, 알려줘 등) 제거
+- 토큰화: 영문/숫자는 단어 단위, 한글은 어절에 붙은 불용어(정리해줘, 있나요)와 조사(이/가/은/는 …)를
+  뗀 뒤 음절 bigram
+- MinHash 64개 → LSH 32밴드 x 2행으로 후보 검색 후 실제 유사도로 확인
+- 범위(scope): 프로바이더/모델/모드/언어/필터가 모두 같을 때만 재사용
+
+유사도는 Jaccard와 양방향 포함도(양쪽 토큰 중 상대에 포함된 비율의 작은 값)의 평균이라,
+한쪽에 조건이 더 붙은 검색어("tesla stock" ↔ "tesla stock 2023 crash")는 재사용하지 않습니다.
+부정 표현(not, 않, 없 등)이나 숫자(연도 등)가 서로 다르면 유사도와 무관하게 재사용하지 않고,
+verify 모드는 주장 하나하나의 판정이 달라질 수 있으므로 재사용하지 않습니다.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import time
+import unicodedata
+import zlib
+
+CACHE_DIR = os.environ.get("REAL_RESEARCH_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "real-research")
+DB_PATH = os.path.join(CACHE_DIR, "query_index.db")
+
+NUM_PERM = 64
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+MERSENNE_PRIME = (1 << 61) - 1
+
+# 결과 내용과 무관한 실행 옵션 (재사용 범위 계산에서 제외)
+RUNTIME_PARAMS = {"background", "deadline"}
+
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_MAX_AGE_HOURS = 6.0
+RETENTION_HOURS = 24 * 7
+
+STOPWORDS = {
+    # 한국어 요청/서술 표현
+    "정리", "알려줘", "알려주세요", "설명", "설명해줘", "대해", "대한", "관련", "관해", "무엇", "뭐야", "어떻게",
+    "해줘", "해주세요", "주세요", "요약", "조사", "검색", "있나요", "있는지", "있을까", "인가요", "인지", "뭔가요",
+    "무엇인가요", "줘", "좀",
+    # 영어 기능어
+    "a", "an", "the", "of", "on", "in", "for", "to", "and", "or", "is", "are", "what", "about", "please",
+    "summary", "summarize", "explain", "tell", "me", "latest",
+}
+
+# 한글 단어 끝의 조사 (긴 것부터 확인, 떼고 두 글자 이상 남을 때만 뗌)
+PARTICLES = sorted(
+    ["이", "가", "은", "는", "을", "를", "의", "에", "에서", "에게", "으로", "로", "와", "과", "도", "만",
+     "까지", "부터", "이나", "이란", "이라", "에서는", "으로는", "에는"],
+    key=len,
+    reverse=True,
+)
+_HANGUL_STOPWORDS = sorted((w for w in STOPWORDS if re.fullmatch(r"[가-힣]+", w)), key=len, reverse=True)
+
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+_HANGUL_RUN = re.compile(r"[가-힣]+")
+_NEGATION = re.compile(r"\b(?:not|no|never|none|nor|without|cannot)\b|n't|않|없|아니|못")
+_WORD = re.compile(r"[a-z0-9]+")
+_NUMBER = re.compile(r"\d+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entry (
+    id INTEGER PRIMARY KEY,
+    scope TEXT NOT NULL,
+    query TEXT NOT NULL,
+    tokens TEXT NOT NULL,
+    result BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS band (
+    scope TEXT NOT NULL,
+    band_no INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    entry_id INTEGER NOT NULL REFERENCES entry(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_band_lookup ON band(scope, band_no, hash);
+CREATE INDEX IF NOT EXISTS idx_entry_created ON entry(created_at);
+"""
+
+
+def normalize(query: str) -> str:
+    """NFKC + 소문자화 + 구두점 제거. 영숫자 사이 하이픈/점은 붙임 (GLP-1 → glp1)"""
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = re.sub(r"(?<=[a-z0-9])[-.·](?=[a-z0-9])", "", text)
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+def strip_hangul(run: str) -> str:
+    """
+    한글 어절에서 요청 표현과 조사를 떼어 냄.
+    불용어가 앞/뒤에 붙어 있으면 떼고(정리해줘 → 정리 + 해줘 → ""), 끝의 조사를 뗍니다(부작용이 → 부작용).
+    """
+    while run:
+        if run in STOPWORDS:
+            return ""
+        for word in _HANGUL_STOPWORDS:
+            if len(run) > len(word) and run.startswith(word):
+                run = run[len(word):]
+                break
+            if len(run) > len(word) and run.endswith(word):
+                run = run[:-len(word)]
+                break
+        else:
+            for particle in PARTICLES:
+                if run.endswith(particle) and len(run) - len(particle) >= 2:
+                    run = run[:-len(particle)]
+                    break
+            else:
+                return run
+    return run
+
+
+def tokenize(query: str) -> set[str]:
+    """정규화한 검색어의 토큰 집합 (영숫자 단어 + 요청 표현/조사를 뗀 한글 음절 bigram)"""
+    text = normalize(query)
+    tokens = set()
+    for word in text.split():
+        if word in STOPWORDS:
+            continue
+        for latin in _WORD.findall(word):
+            if latin not in STOPWORDS:
+                tokens.add(latin)
+        for run in _HANGUL_RUN.findall(word):
+            run = strip_hangul(run)
+            if not run:
+                continue
+            if len(run) == 1:
+                tokens.add(run)
+            else:
+                tokens.update(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def minhash(tokens: set[str]) -> list[int]:
+    hashes = [_token_hash(t) for t in tokens] or [0]
+    return [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def band_hashes(signature: list[int]) -> list[str]:
+    return [
+        hashlib.blake2b(json.dumps(signature[i * ROWS:(i + 1) * ROWS]).encode(), digest_size=8).hexdigest()
+        for i in range(BANDS)
+    ]
+
+
+def similarity(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    jaccard = inter / len(a | b)
+    containment = inter / max(len(a), len(b))
+    # 임계값 경계(예: 3/5)에서 부동소수점 오차로 판정이 갈리지 않도록 반올림
+    return round((jaccard + containment) / 2, 6)
+
+
+def numbers(tokens: set[str]) -> frozenset[str]:
+    """숫자 토큰 (연도, 수치 등). 다르면 다른 질문으로 보고 재사용하지 않음 (glp1처럼 붙은 숫자는 제외)"""
+    return frozenset(t for t in tokens if _NUMBER.fullmatch(t))
+
+
+def negation_markers(query: str) -> frozenset[str]:
+    """검색어의 부정 표현 집합 (한쪽에만 있으면 반대 질문으로 보고 재사용하지 않음)"""
+    text = unicodedata.normalize("NFKC", query).lower()
+    return frozenset(m.group(0) for m in _NEGATION.finditer(text))
+
+
+def query_scope(provider: str, **params) -> str:
+    """재사용 범위 키. 검색어를 제외한 모든 요청 파라미터가 같아야 같은 범위"""
+    clean = {k: v for k, v in params.items() if v not in (None, [], {}, "")}
+    return provider.lower() + "|" + json.dumps(clean, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def connect(db_path: str = DB_PATH) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def find_similar(
+    query: str,
+    scope: str,
+    threshold: float = DEFAULT_THRESHOLD,
+    max_age_hours: float = DEFAULT_MAX_AGE_HOURS,
+    db_path: str = DB_PATH,
+) -> dict | None:
+    """
+    범위 내에서 가장 유사한 최근 검색 결과 반환.
+
+    반환: {"query", "similarity", "age_hours", "result"} 또는 None
+    """
+    if max_age_hours <= 0 or not os.path.exists(db_path):
+        return None
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    negations = negation_markers(query)
+
+    since = time.time() - max_age_hours * 3600
+    bands = band_hashes(minhash(tokens))
+    conn = connect(db_path)
+    try:
+        clauses = " OR ".join("(band_no = ? AND hash = ?)" for _ in bands)
+        params = [scope]
+        for i, h in enumerate(bands):
+            params += [i, h]
+        candidate_ids = [
+            row[0] for row in conn.execute(
+                f"SELECT DISTINCT entry_id FROM band WHERE scope = ? AND ({clauses})", params
+            )
+        ]
+        if not candidate_ids:
+            return None
+
+        best = None
+        placeholders = ",".join("?" * len(candidate_ids))
+        for entry_id, prev_query, prev_tokens, created_at in conn.execute(
+            f"SELECT id, query, tokens, created_at FROM entry WHERE id IN ({placeholders}) AND created_at >= ?",
+            candidate_ids + [since],
+        ):
+            if negation_markers(prev_query) != negations:
+                continue
+            prev = set(json.loads(prev_tokens))
+            if numbers(prev) != numbers(tokens):
+                continue
+            score = similarity(tokens, prev)
+            if score >= threshold and (best is None or (score, created_at) > (best[1], best[3])):
+                best = (entry_id, score, prev_query, created_at)
+
+        if best is None:
+            return None
+        blob = conn.execute("SELECT result FROM entry WHERE id = ?", (best[0],)).fetchone()[0]
+    finally:
+        conn.close()
+
+    return {
+        "query": best[2],
+        "similarity": round(best[1], 3),
+        "age_hours": round((time.time() - best[3]) / 3600, 2),
+        "result": json.loads(zlib.decompress(blob)),
+    }
+
+
+def remember(query: str, scope: str, result: dict, db_path: str = DB_PATH) -> None:
+    """검색 결과를 인덱스에 저장"""
+    tokens = tokenize(query)
+    if not tokens:
+        return
+    blob = zlib.compress(json.dumps(result, ensure_ascii=False).encode("utf-8"))
+    conn = connect(db_path)
+    try:
+        cur = conn.execute(
+            "INSERT INTO entry (scope, query, tokens, result, created_at) VALUES (?, ?, ?, ?, ?)",
+            (scope, query, json.dumps(sorted(tokens), ensure_ascii=False), blob, time.time()),
+        )
+        conn.executemany(
+            "INSERT INTO band (scope, band_no, hash, entry_id) VALUES (?, ?, ?, ?)",
+            [(scope, i, h, cur.lastrowid) for i, h in enumerate(band_hashes(minhash(tokens)))],
+        )
+        # 보관 기간이 지난 항목 정리 (밴드는 ON DELETE CASCADE)
+        conn.execute("DELETE FROM entry WHERE created_at < ?", (time.time() - RETENTION_HOURS * 3600,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def search_with_reuse(
+    provider: str,
+    search_fn,
+    query: str,
+    fresh: bool = False,
+    threshold: float = DEFAULT_THRESHOLD,
+    max_age_hours: float = DEFAULT_MAX_AGE_HOURS,
+    **params,
+) -> tuple[dict, dict | None]:
+    """
+    search_fn(query, **params) 앞에 유사 검색어 재사용을 붙인 래퍼.
+
+    반환: (result, reused) — reused는 재사용한 경우 {"query", "similarity", "age_hours"}, 아니면 None
+    fresh=True이면 항상 새로 검색하고 그 결과를 저장합니다.
+    mode="verify"이면 재사용 없이 search_fn을 그대로 호출합니다 (저장도 하지 않음).
+    """
+    if params.get("mode") == "verify":
+        return search_fn(query, **params), None
+    # 기본값까지 채워서 범위를 계산해야 CLI와 multi_search 호출이 같은 범위가 됨
+    bound = inspect.signature(search_fn).bind_partial(query, **params)
+    bound.apply_defaults()
+    scope_params = {
+        k: v for k, v in bound.arguments.items() if k != "query" and k not in RUNTIME_PARAMS and not callable(v)
+    }
+    scope = query_scope(provider, **scope_params)
+    if not fresh:
+        try:
+            match = find_similar(query, scope, threshold=threshold, max_age_hours=max_age_hours)
+        except sqlite3.Error as e:
+            print(f"   ⚠️ 유사 검색어 인덱스 조회 실패: {e}", file=sys.stderr)
+            match = None
+        if match:
+            result = match.pop("result")
+            print(
+                f"♻️ {provider}: 유사 검색어 '{match['query']}' 결과 재사용 "
+                f"(유사도 {match['similarity']:.2f}, {match['age_hours']:.1f}시간 전) — 새로 검색하려면 --fresh",
+                file=sys.stderr,
+            )
+            return result, match
+
+    result = search_fn(query, **params)
+    try:
+        remember(query, scope, result)
+    except sqlite3.Error as e:
+        print(f"   ⚠️ 유사 검색어 인덱스 저장 실패: {e}", file=sys.stderr)
+    return result, None
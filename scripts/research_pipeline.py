@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+리서치 파이프라인 DAG 실행기
+검색 팬아웃 → 주장 추출/대조 → 주장별 verify 검증 → 종합 보고서를 의존 관계(DAG)로 선언하고,
+서로 의존하지 않는 노드는 동시에 실행합니다. 전체 소요 시간이 단계별 지연의 합이 아니라
+임계 경로(critical path) 길이가 됩니다.
+
+- 노드 출력은 캐시(CACHE_DIR/pipeline)에 저장. 키 = 노드 설정 + 검색어 + 상위 노드 출력 해시
+  → 같은 명령을 다시 실행하면 완료된 노드는 건너뛰고 실패/미완료 노드부터 재개
+- verify 노드는 bulk_verify로 주장을 묶어 검증하고 주장 단위로도 캐시하므로 중간에 끊겨도 검증한 주장은 다시 호출하지 않음
+- 실패한 노드의 하위 노드는 건너뜀 (require="any"인 노드는 상위 중 하나만 성공해도 실행)
+
+파이프라인 정의(--spec JSON, 생략 시 DEFAULT_PIPELINE):
+    [{"id": "search.openai", "stage": "search", "params": {"provider": "openai"}},
+     {"id": "claims", "stage": "claims", "deps": ["search.openai", ...], "require": "any"},
+     {"id": "verify", "stage": "verify", "deps": ["claims"], "params": {"provider": "anthropic", "max_claims": 8}},
+     {"id": "synthesis", "stage": "synthesis", "deps": ["search.openai", ..., "claims", "verify"]}]
+
+사용법:
+    python3 scripts/research_pipeline.py "GLP-1 부작용" --output research-output/report.md
+    python3 scripts/research_pipeline.py "GLP-1 부작용" --mode deep --workers 6
+    python3 scripts/research_pipeline.py "GLP-1 부작용" --rerun verify   # 해당 노드만 다시 실행 (하위 노드도 갱신)
+    python3 scripts/research_pipeline.py "GLP-1 부작용" --plan           # 실행 계획과 캐시 상태만 출력
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+CACHE_DIR = os.environ.get("REAL_RESEARCH_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "real-research")
+PIPELINE_CACHE_DIR = os.path.join(CACHE_DIR, "pipeline")
+
+DEFAULT_PIPELINE = [
+    {"id": "search.openai", "stage": "search", "params": {"provider": "openai"}},
+    {"id": "search.anthropic", "stage": "search", "params": {"provider": "anthropic"}},
+    {"id": "search.gemini", "stage": "search", "params": {"provider": "gemini"}},
+    {
+        "id": "claims",
+        "stage": "claims",
+        "deps": ["search.openai", "search.anthropic", "search.gemini"],
+        "require": "any",
+    },
+    {
+        "id": "verify",
+        "stage": "verify",
+        "deps": ["claims"],
+        "params": {"provider": "anthropic", "max_claims": 8, "workers": 4},
+    },
+    {
+        "id": "synthesis",
+        "stage": "synthesis",
+        "deps": ["search.openai", "search.anthropic", "search.gemini", "claims", "verify"],
+        "require": "any",
+    },
+]
+
+
+def digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def cache_path(key: str) -> str:
+    return os.path.join(PIPELINE_CACHE_DIR, key[:2], f"{key}.json")
+
+
+def cache_load(key: str) -> dict | None:
+    try:
+        with open(cache_path(key), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def cache_store(key: str, record: dict) -> None:
+    path = cache_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+
+
+# ---------------------------------------------------------------------------
+# 단계(stage) 구현: fn(ctx, inputs, **params) -> JSON 직렬화 가능한 출력
+# ctx: {"query", "mode", "lang", "node_key", "refresh"}, inputs: {상위 노드 id: 출력}
+# ---------------------------------------------------------------------------
+
+
+def stage_search(ctx: dict, inputs: dict, provider: str) -> dict:
+    """프로바이더 하나로 검색 (multi_search와 같은 결과 dict). 실패하면 예외 → 재실행 시 재시도"""
+    from multi_search import run_job
+
+    result = run_job(ctx["query"], provider, ctx["mode"], ctx["lang"], None, None)
+    if result["status"] != "success":
+        raise RuntimeError(result["text"])
+    return result
+
+
+def stage_claims(ctx: dict, inputs: dict, max_claims: int = 50) -> dict:
+    """검색 결과에서 주장을 추출하고 프로바이더 간 대조"""
+    from claims import extract_claims, match_claims
+
+    claims_by_provider = {
+        result["provider"]: extract_claims(result["text"], max_claims=max_claims)
+        for result in inputs.values()
+        if isinstance(result, dict) and result.get("status") == "success"
+    }
+    return {"claims_by_provider": claims_by_provider, "groups": match_claims(claims_by_provider)}
+
+
+def stage_verify(
+    ctx: dict,
+    inputs: dict,
+    provider: str = "anthropic",
+    max_claims: int = 8,
+    workers: int = 4,
+) -> dict:
+    """
+    교차 확인되지 않은(support가 낮은) 주장부터 max_claims개를 verify 모드로 검증.
+    bulk_verify로 여러 주장을 한 요청에 묶고, 판정은 주장 단위로 캐시하므로
+    중단 후 재실행하면 판정을 받지 못한 주장만 다시 요청합니다.
+    """
+    from bulk_verify import verify_claims
+
+    groups = next(iter(inputs.values()))["groups"]
+    targets = sorted(groups, key=lambda g: (g["support"], not re.search(r"\d", g["claim"])))[:max_claims]
+    result = verify_claims(
+        [g["claim"] for g in targets], [provider], lang=ctx["lang"], workers=workers, refresh=ctx.get("refresh", False)
+    )
+    verdicts = []
+    for group, item in zip(targets, result["claims"]):
+        entry = item["providers"][provider]
+        verdicts.append({
+            "claim": group["claim"],
+            "providers": group["providers"],
+            "verdict": item["verdict"],
+            "reason": entry["reason"],
+            "sources": entry["sources"],
+        })
+    missing = [v["claim"] for v in verdicts if v["verdict"] is None]
+    if missing:
+        # 노드를 실패시켜 재실행 시 누락된 주장만 다시 검증 (판정 받은 주장은 bulk_verify 캐시에 있음)
+        raise RuntimeError(f"주장 검증 {len(missing)}/{len(targets)}건 판정 누락: {missing[0][:60]}")
+    return {"verdicts": verdicts}
+
+
+def stage_synthesis(ctx: dict, inputs: dict) -> dict:
+    """검색 결과 보고서 + 주장 교차 확인 + 검증 결과를 하나의 마크다운 보고서로 종합"""
+    from multi_search import format_combined_report
+    from postprocess import format_claim_section
+
+    results = sorted(
+        (r for r in inputs.values() if isinstance(r, dict) and r.get("status") in ("success", "error")),
+        key=lambda r: r["provider"],
+    )
+    claim_results = []
+    for output in inputs.values():
+        if isinstance(output, dict) and "claims_by_provider" in output:
+            claim_results = [{"provider": p, "claims": c} for p, c in output["claims_by_provider"].items()]
+
+    report = format_combined_report(ctx["query"], results, ctx["mode"])
+    report += format_claim_section(claim_results)
+
+    verdicts = next((o["verdicts"] for o in inputs.values() if isinstance(o, dict) and "verdicts" in o), [])
+    if verdicts:
+        report += "## 🧪 주장별 검증 (verify)\n\n| 주장 | 판정 | 출처 프로바이더 |\n|---|---|---|\n"
+        for v in verdicts:
+            claim = v["claim"].replace("|", "\\|")
+            report += f"| {claim} | {v['verdict']} | {', '.join(v['providers'])} |\n"
+        report += "\n"
+    return {"report": report}
+
+
+STAGES = {
+    "search": stage_search,
+    "claims": stage_claims,
+    "verify": stage_verify,
+    "synthesis": stage_synthesis,
+}
+
+
+# ---------------------------------------------------------------------------
+# DAG 스케줄러
+# ---------------------------------------------------------------------------
+
+
+def validate_pipeline(nodes: list[dict]) -> list[dict]:
+    """노드 id 중복, 알 수 없는 단계/의존성, 순환을 검사. 위상 정렬된 노드 목록 반환"""
+    by_id = {}
+    for node in nodes:
+        if node["id"] in by_id:
+            raise ValueError(f"노드 id 중복: {node['id']}")
+        if node["stage"] not in STAGES:
+            raise ValueError(f"알 수 없는 단계: {node['stage']} (노드 {node['id']})")
+        by_id[node["id"]] = node
+    for node in nodes:
+        for dep in node.get("deps", []):
+            if dep not in by_id:
+                raise ValueError(f"알 수 없는 의존 노드: {dep} (노드 {node['id']})")
+
+    ordered, state = [], {}
+
+    def visit(node_id: str, path: list[str]) -> None:
+        if state.get(node_id) == "done":
+            return
+        if state.get(node_id) == "visiting":
+            raise ValueError(f"순환 의존: {' → '.join(path + [node_id])}")
+        state[node_id] = "visiting"
+        for dep in by_id[node_id].get("deps", []):
+            visit(dep, path + [node_id])
+        state[node_id] = "done"
+        ordered.append(by_id[node_id])
+
+    for node in nodes:
+        visit(node["id"], [])
+    return ordered
+
+
+def node_key(node: dict, ctx: dict, dep_outputs: dict) -> str:
+    return digest([
+        node["stage"],
+        node.get("params", {}),
+        ctx["query"],
+        ctx["mode"],
+        ctx["lang"],
+        {dep: digest(output) for dep, output in sorted(dep_outputs.items())},
+    ])
+
+
+def run_pipeline(
+    nodes: list[dict],
+    query: str,
+    mode: str = "search",
+    lang: str = "both",
+    workers: int = 4,
+    rerun: set | None = None,
+    fresh: bool = False,
+) -> dict:
+    """
+    DAG 실행. 의존 노드가 끝나는 즉시 실행 가능한 노드를 제출합니다.
+
+    반환: {node_id: {"status": "done"|"cached"|"failed"|"skipped", "output", "elapsed", "error"}}
+    """
+    ordered = validate_pipeline(nodes)
+    rerun = rerun or set()
+    ctx = {"query": query, "mode": mode, "lang": lang}
+    states = {}
+    pending = {n["id"]: n for n in ordered}
+
+    def ready(node: dict) -> bool | None:
+        """실행 가능 여부 (True/False), 더 이상 실행할 수 없으면 None"""
+        deps = node.get("deps", [])
+        if any(d not in states for d in deps):
+            return False
+        ok = [d for d in deps if states[d]["status"] in ("done", "cached")]
+        if node.get("require", "all") == "any":
+            return True if ok or not deps else None
+        return True if len(ok) == len(deps) else None
+
+    def execute(node: dict, dep_outputs: dict) -> dict:
+        key = node_key(node, ctx, dep_outputs)
+        refresh = fresh or node["id"] in rerun
+        if not refresh:
+            cached = cache_load(key)
+            if cached is not None:
+                return {"status": "cached", "output": cached["output"], "elapsed": 0.0, "key": key}
+        started = time.monotonic()
+        output = STAGES[node["stage"]]({**ctx, "node_key": key, "refresh": refresh}, dep_outputs, **node.get("params", {}))
+        elapsed = time.monotonic() - started
+        cache_store(key, {"node": node, "output": output, "elapsed": elapsed, "created_at": time.time()})
+        return {"status": "done", "output": output, "elapsed": elapsed, "key": key}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        running = {}
+
+        def submit_ready() -> None:
+            for node_id, node in list(pending.items()):
+                status = ready(node)
+                if status is None:
+                    del pending[node_id]
+                    states[node_id] = {"status": "skipped", "output": None, "elapsed": 0.0}
+                    print(f"   ⏭ {node_id} 건너뜀 (상위 노드 실패)", file=sys.stderr)
+                elif status:
+                    del pending[node_id]
+                    dep_outputs = {
+                        d: states[d]["output"] for d in node.get("deps", [])
+                        if states[d]["status"] in ("done", "cached")
+                    }
+                    print(f"   ▶ {node_id} 시작", file=sys.stderr)
+                    running[executor.submit(execute, node, dep_outputs)] = node_id
+
+        # 건너뜀 처리로 새로 결정되는 노드가 없을 때까지 반복
+        before = None
+        while before != len(pending):
+            before = len(pending)
+            submit_ready()
+        while running:
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                node_id = running.pop(future)
+                try:
+                    states[node_id] = future.result()
+                    icon = "♻️" if states[node_id]["status"] == "cached" else "✅"
+                    print(f"   {icon} {node_id} {states[node_id]['status']} ({states[node_id]['elapsed']:.1f}s)", file=sys.stderr)
+                except Exception as e:
+                    states[node_id] = {"status": "failed", "output": None, "elapsed": 0.0, "error": str(e)}
+                    print(f"   ❌ {node_id} 실패: {e}", file=sys.stderr)
+            before = None
+            while before != len(pending):
+                before = len(pending)
+                submit_ready()
+    return states
+
+
+def critical_path(nodes: list[dict], states: dict) -> tuple[float, list[str]]:
+    """노드 실행 시간 기준 임계 경로 (길이, 노드 id 목록)"""
+    best = {}
+    for node in validate_pipeline(nodes):
+        elapsed = states.get(node["id"], {}).get("elapsed", 0.0)
+        prev = max((best[d] for d in node.get("deps", [])), key=lambda x: x[0], default=(0.0, []))
+        best[node["id"]] = (prev[0] + elapsed, prev[1] + [node["id"]])
+    return max(best.values(), key=lambda x: x[0], default=(0.0, []))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리서치 파이프라인 DAG 실행기")
+    parser.add_argument("query", help="조사할 주제 또는 질문")
+    parser.add_argument("--mode", choices=["search", "verify", "deep"], default="search", help="검색 모드")
+    parser.add_argument("--lang", choices=["ko", "en", "both"], default="both", help="검색 언어")
+    parser.add_argument("--spec", help="파이프라인 정의 JSON 파일 (생략 시 기본 파이프라인)")
+    parser.add_argument("--workers", type=int, default=4, help="동시에 실행할 노드 수 (기본: 4)")
+    parser.add_argument("--rerun", default="", help="캐시를 무시하고 다시 실행할 노드 id (콤마 구분)")
+    parser.add_argument("--fresh", action="store_true", help="모든 노드 캐시 무시")
+    parser.add_argument("--plan", action="store_true", help="실행하지 않고 노드 순서와 의존 관계만 출력")
+    parser.add_argument("--output", help="종합 보고서 저장 경로 (미지정 시 stdout)")
+    args = parser.parse_args()
+
+    if args.spec:
+        with open(args.spec, encoding="utf-8") as f:
+            nodes = json.load(f)
+    else:
+        nodes = DEFAULT_PIPELINE
+
+    try:
+        ordered = validate_pipeline(nodes)
+    except ValueError as e:
+        print(f"ERROR: 파이프라인 정의 오류: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.plan:
+        for node in ordered:
+            deps = ", ".join(node.get("deps", [])) or "-"
+            print(f"{node['id']:20s} [{node['stage']}] ← {deps}")
+        return
+
+    print(f"🧭 리서치 파이프라인: '{args.query}' (노드 {len(ordered)}개, 동시 {args.workers})", file=sys.stderr)
+    started = time.monotonic()
+    states = run_pipeline(
+        nodes,
+        args.query,
+        mode=args.mode,
+        lang=args.lang,
+        workers=args.workers,
+        rerun={r.strip() for r in args.rerun.split(",") if r.strip()},
+        fresh=args.fresh,
+    )
+    wall = time.monotonic() - started
+    total = sum(s.get("elapsed", 0.0) for s in states.values())
+    path_len, path = critical_path(nodes, states)
+    print(
+        f"⏱ 경과 {wall:.1f}s · 노드 합계 {total:.1f}s · 임계 경로 {path_len:.1f}s ({' → '.join(path)})",
+        file=sys.stderr,
+    )
+
+    failed = [n for n, s in states.items() if s["status"] in ("failed", "skipped")]
+    final = ordered[-1]["id"]
+    output = states.get(final, {}).get("output")
+    if isinstance(output, dict) and "report" in output:
+        report = output["report"]
+        report += f"\n_파이프라인 실행: {datetime.now().strftime('%Y-%m-%d %H:%M')} · 실패/건너뜀 노드: {', '.join(failed) or '없음'}_\n"
+        if args.output:
+            os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(report)
+            print(f"✅ 보고서 저장: {args.output}", file=sys.stderr)
+        else:
+            print(report)
+    elif output is not None:
+        print(json.dumps(output, ensure_ascii=False, indent=2, default=str))
+
+    if failed:
+        print(f"⚠️ 실패/건너뜀 노드: {', '.join(failed)} — 같은 명령을 다시 실행하면 완료된 노드는 캐시에서 재개합니다", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
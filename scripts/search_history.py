@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+검색 이력 로컬 인덱스 (SQLite FTS5)
+multi_search 실행 결과(답변 본문, 인용, 소스)를 로컬 SQLite에 저장하고 전문 검색합니다.
+같은 주제를 다시 조사하기 전에 이전 결과를 밀리초 단위로 찾아볼 수 있습니다.
+
+사용법:
+    python3 scripts/multi_search.py search-history "GLP-1 부작용"
+    python3 scripts/multi_search.py search-history "GLP-1" --provider openai --limit 10 --full
+    python3 scripts/multi_search.py search-history --stats
+    python3 scripts/multi_search.py "검색어" --local-first   # 이전 결과 먼저 표시 후 검색
+    python3 scripts/multi_search.py "검색어" --local-only    # API 호출 없이 이전 결과만
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+from source_utils import canonicalize_url, extract_result_sources
+
+CACHE_DIR = os.environ.get("REAL_RESEARCH_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "real-research")
+DB_PATH = os.path.join(CACHE_DIR, "search_history.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS run (
+    id INTEGER PRIMARY KEY,
+    query TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS result (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES run(id) ON DELETE CASCADE,
+    provider TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS source (
+    result_id INTEGER NOT NULL REFERENCES result(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL CHECK (kind IN ('citation', 'source')),
+    url TEXT NOT NULL,
+    canonical_url TEXT NOT NULL,
+    title TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_result_run ON result(run_id);
+CREATE INDEX IF NOT EXISTS idx_source_result ON source(result_id);
+CREATE INDEX IF NOT EXISTS idx_source_canonical ON source(canonical_url);
+CREATE VIRTUAL TABLE IF NOT EXISTS result_fts USING fts5(
+    query, provider, text, sources,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def connect(db_path: str = DB_PATH) -> sqlite3.Connection:
+    """인덱스 DB 연결 (없으면 스키마 생성)"""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def start_run(conn: sqlite3.Connection, query: str, mode: str, lang: str) -> int:
+    cur = conn.execute(
+        "INSERT INTO run (query, mode, lang, created_at) VALUES (?, ?, ?, ?)",
+        (query, mode, lang, time.time()),
+    )
+    conn.commit()
+    return cur.lastrowid
+
+
+def index_result(conn: sqlite3.Connection, run_id: int, query: str, result: dict) -> int | None:
+    """성공한 프로바이더 결과 하나를 인덱싱. 결과 id 반환 (실패 결과는 건너뜀)"""
+    if result.get("status") != "success":
+        return None
+
+    refs = extract_result_sources(result)
+    cur = conn.execute(
+        "INSERT INTO result (run_id, provider, text, created_at) VALUES (?, ?, ?, ?)",
+        (run_id, result["provider"], result["text"], time.time()),
+    )
+    result_id = cur.lastrowid
+
+    rows = []
+    for kind, items in (("citation", refs["citations"]), ("source", refs["sources"])):
+        seen = set()
+        for ref in items:
+            key = canonicalize_url(ref.get("url", ""))
+            if key and key not in seen:
+                seen.add(key)
+                rows.append((result_id, kind, ref["url"], key, ref.get("title", "")))
+    conn.executemany(
+        "INSERT INTO source (result_id, kind, url, canonical_url, title) VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+
+    source_text = "\n".join(f"{r[4]} {r[2]}" for r in rows)
+    conn.execute(
+        "INSERT INTO result_fts (rowid, query, provider, text, sources) VALUES (?, ?, ?, ?, ?)",
+        (result_id, query, result["provider"], result["text"], source_text),
+    )
+    conn.commit()
+    return result_id
+
+
+def index_results(query: str, mode: str, lang: str, results: list, db_path: str = DB_PATH) -> int:
+    """multi_search 결과 목록을 한 번에 인덱싱. 인덱싱한 결과 수 반환"""
+    conn = connect(db_path)
+    try:
+        run_id = start_run(conn, query, mode, lang)
+        return sum(index_result(conn, run_id, query, r) is not None for r in results)
+    finally:
+        conn.close()
+
+
+def build_match(query: str) -> str:
+    """
+    검색어 → FTS5 MATCH 식.
+
+    토큰마다 접두 검색("토큰"*)을 OR로 결합합니다. 한국어는 조사가 붙어
+    토큰화되므로("부작용은") 접두 검색이어야 "부작용"과 일치합니다.
+    """
+    tokens = [t for t in re.findall(r"\w+", query.lower()) if len(t) > 1 or not t.isascii()]
+    return " OR ".join(f'"{t}"*' for t in dict.fromkeys(tokens))
+
+
+def lookup(
+    query: str,
+    limit: int = 5,
+    provider: str | None = None,
+    mode: str | None = None,
+    max_age_days: float | None = None,
+    db_path: str = DB_PATH,
+) -> list[dict]:
+    """이전 결과를 BM25 순으로 검색. 각 항목에 snippet과 인용 URL 포함"""
+    match = build_match(query)
+    if not match or not os.path.exists(db_path):
+        return []
+
+    sql = """
+        SELECT result.id, result.provider, result.text, result.created_at, run.query, run.mode, run.lang,
+               snippet(result_fts, 2, '**', '**', ' … ', 24) AS snippet,
+               bm25(result_fts, 4.0, 0.5, 1.0, 0.5) AS score
+        FROM result_fts
+        JOIN result ON result.id = result_fts.rowid
+        JOIN run ON run.id = result.run_id
+        WHERE result_fts MATCH ?
+    """
+    params = [match]
+    if provider:
+        sql += " AND lower(result.provider) = ?"
+        params.append(provider.lower())
+    if mode:
+        sql += " AND run.mode = ?"
+        params.append(mode)
+    if max_age_days is not None:
+        sql += " AND result.created_at >= ?"
+        params.append(time.time() - max_age_days * 86400)
+    sql += " ORDER BY score LIMIT ?"
+    params.append(limit)
+
+    conn = connect(db_path)
+    try:
+        rows = [dict(r) for r in conn.execute(sql, params)]
+        for row in rows:
+            row["citations"] = [
+                dict(s) for s in conn.execute(
+                    "SELECT url, title FROM source WHERE result_id = ? AND kind = 'citation'", (row["id"],)
+                )
+            ]
+    finally:
+        conn.close()
+    return rows
+
+
+def stats(db_path: str = DB_PATH) -> dict:
+    if not os.path.exists(db_path):
+        return {"runs": 0, "results": 0, "sources": 0}
+    conn = connect(db_path)
+    try:
+        return {
+            "runs": conn.execute("SELECT count(*) FROM run").fetchone()[0],
+            "results": conn.execute("SELECT count(*) FROM result").fetchone()[0],
+            "sources": conn.execute("SELECT count(DISTINCT canonical_url) FROM source").fetchone()[0],
+        }
+    finally:
+        conn.close()
+
+
+def format_history(query: str, rows: list, full: bool = False) -> str:
+    """이전 결과 목록 → 마크다운"""
+    report = f"# 🗂 이전 검색 결과: {query}\n\n"
+    if not rows:
+        return report + "_일치하는 이전 결과가 없습니다._\n"
+
+    for row in rows:
+        when = datetime.fromtimestamp(row["created_at"]).strftime("%Y-%m-%d %H:%M")
+        report += f"## {row['provider']} · {when} · _{row['query']}_ ({row['mode']})\n\n"
+        if full:
+            report += row["text"] + "\n\n"
+        else:
+            report += f"> {' '.join(row['snippet'].split())}\n\n"
+            for c in row["citations"][:5]:
+                report += f"- [{c['title'] or c['url']}]({c['url']})\n"
+            if row["citations"]:
+                report += "\n"
+    return report
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog="multi_search.py search-history",
+        description="로컬에 저장된 이전 검색 결과 전문 검색",
+    )
+    parser.add_argument("query", nargs="?", help="찾을 주제 또는 키워드")
+    parser.add_argument("--limit", type=int, default=5, help="최대 결과 수 (기본: 5)")
+    parser.add_argument("--provider", choices=["openai", "anthropic", "gemini"], help="프로바이더 필터")
+    parser.add_argument("--mode", choices=["search", "verify", "deep"], help="검색 모드 필터")
+    parser.add_argument("--max-age-days", type=float, default=None, help="최근 N일 이내 결과만")
+    parser.add_argument("--full", action="store_true", help="스니펫 대신 전체 답변 출력")
+    parser.add_argument("--stats", action="store_true", help="인덱스 통계 출력")
+    parser.add_argument("--db", default=DB_PATH, help=f"인덱스 DB 경로 (기본: {DB_PATH})")
+
+    args = parser.parse_args(argv)
+
+    if args.stats:
+        s = stats(args.db)
+        print(f"🗂 실행 {s['runs']}회 · 결과 {s['results']}건 · 고유 소스 {s['sources']}개 ({args.db})")
+        return
+    if not args.query:
+        parser.error("검색어를 지정하세요")
+
+    started = time.perf_counter()
+    rows = lookup(
+        args.query,
+        limit=args.limit,
+        provider=args.provider,
+        mode=args.mode,
+        max_age_days=args.max_age_days,
+        db_path=args.db,
+    )
+    print(format_history(args.query, rows, full=args.full))
+    print(f"🗂 {len(rows)}건 ({(time.perf_counter() - started) * 1000:.1f}ms)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+동일 요청 합치기 (single-flight)
+같은 프로세스 안에서 같은 프로바이더에 같은 요청(모델, 모드, 언어, 검색어, 필터 등)이 동시에 들어오면
+처음 호출만 실제로 API를 호출하고, 진행 중에 들어온 같은 요청은 그 결과(오류 포함)를 기다려 함께 받습니다.
+배치 파일이나 여러 스레드에서 같은 검색어가 겹쳐 실행될 때 중복 호출 비용을 없앱니다.
+
+- 요청 키: search() 시그니처의 기본값까지 채운 인자 (query_index.query_scope와 같은 방식).
+  on_event 같은 콜백과 실행 옵션(deadline, background)은 키에서 제외하므로 합쳐진 호출은 선두 호출의 deadline을 따름
+- 완료된 결과는 보관하지 않음 (동시에 진행 중인 호출만 합침, 이후 재사용은 query_index의 몫)
+- 합쳐진 호출은 결과 사본을 받고, on_event가 있으면 "coalesced" 이벤트를 받음
+
+사용법:
+    from single_flight import coalesced
+    search = coalesced("openai", openai_search.search)
+    result = search("검색어", mode="search")          # 동시에 같은 요청이면 API 호출 1회
+"""
+
+import copy
+import functools
+import inspect
+import threading
+from collections import Counter
+
+from query_index import RUNTIME_PARAMS, query_scope
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _copy_error(error: BaseException) -> BaseException:
+    """
+    기다리던 호출마다 발생시킬 예외 사본. 같은 객체를 여러 스레드에서 raise하면
+    __traceback__/__context__가 서로 덮어써지므로 호출마다 새 객체를 만듭니다.
+    생성자 인자가 args와 다른 예외(BackgroundPending 등)는 __init__ 없이 속성만 복사.
+    """
+    try:
+        return copy.copy(error)
+    except Exception:
+        clone = type(error).__new__(type(error), *error.args)
+        clone.__dict__.update(error.__dict__)
+        return clone
+
+
+class SingleFlight:
+    """
+    키별로 진행 중인 호출 하나만 실행하는 그룹.
+
+    counters: calls(전체 요청), executed(실제 실행), coalesced(합쳐진 요청), errors(오류로 끝난 실행)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.counters = Counter()
+
+    def do(self, key, fn, *args, **kwargs) -> tuple:
+        """
+        fn(*args, **kwargs)을 키당 하나만 실행. (결과, shared) 반환 — shared는 다른 호출의 결과를 받은 경우 True.
+        선두 호출이 예외(SystemExit 포함)로 끝나면 기다리던 호출에도 같은 종류의 예외를 발생시킵니다
+        (호출마다 사본, __cause__가 선두 호출의 예외).
+        """
+        with self._lock:
+            self.counters["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self.counters["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise _copy_error(call.error) from call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self.counters["executed"] += 1
+                if call.error is not None:
+                    self.counters["errors"] += 1
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def group(provider: str) -> SingleFlight:
+    """프로바이더별 공용 그룹 (프로세스 전역)"""
+    provider = provider.lower()
+    with _groups_lock:
+        if provider not in _groups:
+            _groups[provider] = SingleFlight()
+        return _groups[provider]
+
+
+def request_key(provider: str, search_fn, query: str, *args, **kwargs) -> str:
+    """search_fn 호출의 요청 키 (콜백/실행 옵션 제외, 기본값 포함)"""
+    bound = inspect.signature(search_fn).bind_partial(query, *args, **kwargs)
+    bound.apply_defaults()
+    params = {k: v for k, v in bound.arguments.items() if k not in RUNTIME_PARAMS and not callable(v)}
+    return query_scope(provider, **params)
+
+
+def coalesced(provider: str, search_fn):
+    """search_fn 앞에 프로바이더별 single-flight를 붙인 래퍼 (시그니처 유지)"""
+
+    @functools.wraps(search_fn)
+    def wrapper(query: str, *args, **kwargs):
+        key = request_key(provider, search_fn, query, *args, **kwargs)
+        result, shared = group(provider).do(key, search_fn, query, *args, **kwargs)
+        if not shared:
+            return result
+        on_event = kwargs.get("on_event")
+        if on_event:
+            on_event("coalesced")
+        # 호출자가 응답을 고쳐 쓸 수 있으므로 합쳐진 호출에는 사본을 반환
+        return result if isinstance(result, bytes) else copy.deepcopy(result)
+
+    return wrapper
+
+
+def stats() -> dict:
+    """프로바이더별 카운터 {provider: {"calls", "executed", "coalesced", "errors"}}"""
+    with _groups_lock:
+        return {
+            p: {k: g.counters[k] for k in ("calls", "executed", "coalesced", "errors")} for p, g in _groups.items()
+        }
+
+
+def total_coalesced() -> int:
+    return sum(s["coalesced"] for s in stats().values())
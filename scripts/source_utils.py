@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+검색 결과 소스 공통 유틸리티
+프로바이더별 응답에서 인용/소스를 모으고, URL을 정규화하여 중복을 제거합니다.
+
+multi_search 결과 dict ({"provider", "status", "raw", ...}) 목록을 입력으로 받습니다.
+"""
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 추적용 쿼리 파라미터 (정규화 시 제거)
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "ref", "ref_src", "spm",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    URL 정규화 (중복 판정용 키).
+
+    - scheme/host 소문자화, 기본 포트 및 www. 제거
+    - fragment와 추적 파라미터(utm_*, fbclid 등) 제거, 나머지 파라미터는 정렬
+    - 루트가 아닌 경로의 끝 슬래시 제거
+    """
+    url = (url or "").strip()
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower() or "https"
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    port = parts.port if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)) else None
+    netloc = f"{host}:{port}" if port else host
+
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/")
+
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query.sort()
+
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
+
+
+def url_domain(url: str) -> str:
+    """URL의 호스트명 (소문자, www. 제거)"""
+    try:
+        host = (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def provider_module(provider: str):
+    """프로바이더 이름(OpenAI/Anthropic/Gemini)에 해당하는 검색 모듈"""
+    name = provider.lower()
+    if name == "openai":
+        import openai_search as module
+    elif name == "anthropic":
+        import anthropic_search as module
+    elif name == "gemini":
+        import gemini_search as module
+    else:
+        raise ValueError(f"알 수 없는 프로바이더: {provider}")
+    return module
+
+
+def extract_result_sources(result: dict) -> dict:
+    """multi_search 결과 하나의 raw 응답에서 {"citations": [...], "sources": [...]} 추출"""
+    if result.get("refs"):
+        # postprocess 파이프라인 결과는 raw 대신 추출된 refs를 가짐
+        return result["refs"]
+    if result.get("status") != "success" or not result.get("raw"):
+        return {"citations": [], "sources": []}
+    return provider_module(result["provider"]).extract_sources(result["raw"])
+
+
+def collect_sources(results: list) -> list:
+    """
+    여러 프로바이더 결과의 인용/소스를 정규화 URL 기준으로 병합.
+
+    반환 항목: {url, canonical_url, title, providers: [...], cited: bool}
+    - cited: 어느 프로바이더든 본문 인용(citation)으로 사용했으면 True
+    - 순서: 처음 등장한 순서 유지
+    """
+    merged = {}
+    for result in results:
+        refs = extract_result_sources(result)
+        for kind in ("citations", "sources"):
+            for ref in refs[kind]:
+                key = canonicalize_url(ref.get("url", ""))
+                if not key:
+                    continue
+                entry = merged.setdefault(key, {
+                    "url": ref["url"],
+                    "canonical_url": key,
+                    "title": ref.get("title", ""),
+                    "providers": [],
+                    "cited": False,
+                })
+                if not entry["title"] and ref.get("title"):
+                    entry["title"] = ref["title"]
+                if result["provider"] not in entry["providers"]:
+                    entry["providers"].append(result["provider"])
+                if kind == "citations":
+                    entry["cited"] = True
+    return list(merged.values())
+
+
+def merge_regional_sources(results: list) -> list:
+    """
+    --regions 결과의 소스를 정규화 URL 기준으로 병합하고 지역을 표시.
+
+    반환 항목: collect_sources 항목 + regions: [지역 결과에서 나온 지역 코드...],
+    global: 지역 없이 실행한 결과(Gemini 등)에도 있으면 True
+    """
+    merged = {}
+    for result in results:
+        for source in collect_sources([result]):
+            entry = merged.setdefault(source["canonical_url"], {**source, "providers": [], "regions": [], "global": False})
+            if not entry["title"] and source["title"]:
+                entry["title"] = source["title"]
+            entry["cited"] = entry["cited"] or source["cited"]
+            if result["provider"] not in entry["providers"]:
+                entry["providers"].append(result["provider"])
+            region = result.get("region")
+            if region is None:
+                entry["global"] = True
+            elif region not in entry["regions"]:
+                entry["regions"].append(region)
+    return list(merged.values())
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+답변 구간 → 근거 소스 인덱스 (구간 트리)
+프로바이더 응답의 인용 구간(OpenAI url_citation start/end_index, Gemini groundingSupports 세그먼트,
+Anthropic 인용 text 블록)을 답변 본문의 문자 오프셋으로 모아, 임의의 문자 범위나 문장이
+어떤 소스에 근거하는지 O(log n + k)로 조회합니다.
+
+- 구간은 시작 위치로 정렬한 배열 위의 암시적 균형 이진 트리로 저장하고, 노드마다 하위 트리의
+  최대 끝 위치를 두어 겹치지 않는 하위 트리는 건너뜀
+- 오프셋은 extract_response 본문 기준 (Gemini 바이트 오프셋은 provider 모듈에서 문자로 변환)
+- 인라인 각주: 근거가 있는 문장 끝에 [^openai-n]처럼 프로바이더별 각주를 붙이고 본문 뒤에 각주 목록 추가
+- 문장별 근거 JSON: 웹 앱의 근거 배지용 (--json)
+
+사용법:
+    python3 scripts/multi_search.py "검색어" --raw --output results.json
+    python3 scripts/span_index.py results.json                  # 인라인 각주 보고서
+    python3 scripts/span_index.py results.json --json           # 문장별 근거 JSON
+    python3 scripts/span_index.py results.json --at 120:180     # 문자 범위 조회
+    python3 scripts/span_index.py response.json --provider gemini  # 프로바이더 원본 응답 하나
+"""
+
+import argparse
+import json
+import re
+import sys
+
+from source_utils import canonicalize_url, provider_module
+
+_SENTENCE_END = re.compile(r"[.!?。]+(?=\s|$)|\n")
+# 문장부호 뒤에 붙는 인라인 인용 표기 "([site](url))" — OpenAI는 이 표기만 url_citation 구간으로 잡음
+_TRAILING_MARKERS = re.compile(r"(?:[ \t]*\(?\[[^\]\n]*\]\([^)\s]*\)\)?)+")
+
+
+class SpanIndex:
+    """
+    답변 본문(text)과 인용 구간(spans)의 구간 트리.
+
+    spans 항목: {"start", "end", "sources": [소스 번호], "confidence": [...]} (문자 오프셋, end 미포함)
+    sources 항목: {"title", "url"}
+    """
+
+    def __init__(self, text: str, spans: list[dict], sources: list[dict]):
+        self.text = text
+        self.sources = sources
+        self.spans = sorted(
+            (s for s in spans if s["end"] > s["start"]),
+            key=lambda s: (s["start"], s["end"]),
+        )
+        self._starts = [s["start"] for s in self.spans]
+        self._source_keys = [canonicalize_url(s["url"]) or f"#{i}" for i, s in enumerate(sources)]
+        self._max_end = [0] * len(self.spans)
+        self._build(0, len(self.spans))
+
+    def _build(self, lo: int, hi: int) -> int:
+        """[lo, hi) 하위 트리의 최대 끝 위치 계산 (루트 = 중간 원소)"""
+        if lo >= hi:
+            return -1
+        mid = (lo + hi) // 2
+        self._max_end[mid] = max(self.spans[mid]["end"], self._build(lo, mid), self._build(mid + 1, hi))
+        return self._max_end[mid]
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def lookup(self, start: int, end: int | None = None) -> list[dict]:
+        """[start, end)와 겹치는 구간 목록 (시작 위치 순). end를 생략하면 start 한 글자"""
+        end = start + 1 if end is None else end
+        found = []
+        stack = [(0, len(self.spans))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self._max_end[mid] <= start:
+                continue  # 이 하위 트리의 모든 구간이 start 전에 끝남
+            stack.append((lo, mid))
+            if self._starts[mid] < end:
+                if self.spans[mid]["end"] > start:
+                    found.append(self.spans[mid])
+                stack.append((mid + 1, hi))
+        found.sort(key=lambda s: (s["start"], s["end"]))
+        return found
+
+    def sources_for(self, start: int, end: int | None = None) -> list[dict]:
+        """
+        범위의 근거 소스 (정규화 URL 기준 중복 제거, 겹치는 길이가 긴 순).
+
+        반환 항목: {"id", "title", "url", "overlap": 겹친 글자 수, "confidence": 최대 신뢰도 | None}
+        """
+        end = start + 1 if end is None else end
+        merged = {}
+        for span in self.lookup(start, end):
+            overlap = min(end, span["end"]) - max(start, span["start"])
+            for i, source_id in enumerate(span["sources"]):
+                source = self.sources[source_id]
+                entry = merged.setdefault(self._source_keys[source_id], {
+                    "id": source_id,
+                    "title": source["title"],
+                    "url": source["url"],
+                    "overlap": 0,
+                    "confidence": None,
+                })
+                entry["overlap"] = max(entry["overlap"], overlap)
+                if i < len(span["confidence"]):
+                    entry["confidence"] = max(entry["confidence"] or 0.0, span["confidence"][i])
+        return sorted(merged.values(), key=lambda e: (-e["overlap"], e["id"]))
+
+    def sentences(self) -> list[dict]:
+        """
+        문장별 근거: [{"start", "end", "text", "sources": [...]}] (공백 문장 제외)
+        문장 끝 바로 뒤의 인용 표기는 다음 문장이 아니라 앞 문장에 포함합니다.
+        """
+        items = []
+        bounds = []
+        for m in _SENTENCE_END.finditer(self.text):
+            bound = m.end()
+            if m.group(0) != "\n":
+                marker = _TRAILING_MARKERS.match(self.text, bound)
+                bound = marker.end() if marker else bound
+            bounds.append(bound)
+        bounds.append(len(self.text))
+        position = 0
+        for bound in bounds:
+            if bound <= position:
+                continue
+            raw = self.text[position:bound]
+            stripped = raw.strip()
+            if stripped:
+                start = position + len(raw) - len(raw.lstrip())
+                end = start + len(stripped)
+                items.append({"start": start, "end": end, "text": stripped, "sources": self.sources_for(start, end)})
+            position = bound
+        return items
+
+    def to_dict(self) -> dict:
+        return {"text": self.text, "sources": self.sources, "spans": self.spans, "sentences": self.sentences()}
+
+
+def build_index(result: dict) -> SpanIndex | None:
+    """multi_search 결과 dict(raw 포함)의 구간 인덱스. raw가 없거나 추출에 실패하면 None"""
+    if result.get("status") != "success" or not isinstance(result.get("raw"), dict):
+        return None
+    module = provider_module(result["provider"])
+    if not hasattr(module, "extract_spans"):
+        return None
+    extracted = module.extract_spans(result["raw"])
+    return SpanIndex(extracted["text"], extracted["spans"], extracted["sources"])
+
+
+def render_footnotes(index: SpanIndex, label: str = "") -> str:
+    """
+    근거가 있는 문장 끝에 [^n] 각주를 붙인 본문 + 각주 목록 (번호는 처음 등장 순).
+    label을 주면 [^label-n]으로 붙여 한 보고서에 여러 프로바이더 각주가 섞여도 겹치지 않게 합니다.
+    """
+    prefix = f"{label}-" if label else ""
+    numbers = {}
+    pieces, position = [], 0
+    for sentence in index.sentences():
+        if not sentence["sources"]:
+            continue
+        marks = []
+        for source in sentence["sources"]:
+            key = index._source_keys[source["id"]]
+            if key not in numbers:
+                numbers[key] = (len(numbers) + 1, source)
+            mark = f"[^{prefix}{numbers[key][0]}]"
+            if mark not in marks:
+                marks.append(mark)
+        pieces.append(index.text[position:sentence["end"]])
+        pieces.append("".join(marks))
+        position = sentence["end"]
+    pieces.append(index.text[position:])
+    body = "".join(pieces)
+    if not numbers:
+        return body
+    notes = "\n".join(
+        f"[^{prefix}{n}]: [{source['title'] or source['url']}]({source['url']})" for n, source in numbers.values()
+    )
+    return f"{body}\n\n{notes}\n"
+
+
+def footnoted_text(result: dict) -> str:
+    """
+    결과 text의 답변 본문 부분을 인라인 각주 버전으로 바꿔 반환.
+    본문이 extract_response 출력과 일치하지 않으면(재사용/후처리 결과 등) 원래 text를 그대로 반환합니다.
+    """
+    text = result.get("text", "")
+    try:
+        index = build_index(result)
+    except Exception:
+        return text
+    if index is None or not len(index) or not text.startswith(index.text):
+        return text
+    return render_footnotes(index, result.get("provider", "")) + text[len(index.text):]
+
+
+def load_results(path: str, provider: str | None = None) -> list[dict]:
+    """multi_search --raw JSON(목록), --ndjson 파일, 또는 프로바이더 원본 응답 하나(--provider 필요)"""
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        data = [json.loads(line) for line in content.splitlines() if line.strip()]
+    if isinstance(data, dict) and "results" not in data and provider:
+        return [{"provider": provider, "status": "success", "raw": data}]
+    if isinstance(data, dict):
+        data = [data]
+    results = []
+    for item in data:
+        # 배치 --raw 형식: [{"query", "results": [...]}]
+        results += item["results"] if isinstance(item, dict) and "results" in item else [item]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="답변 구간 → 근거 소스 인덱스")
+    parser.add_argument("input", help="multi_search --raw/--ndjson 출력 또는 프로바이더 원본 응답 JSON")
+    parser.add_argument("--provider", choices=["openai", "anthropic", "gemini"], help="원본 응답 하나를 읽을 때 프로바이더")
+    parser.add_argument("--json", action="store_true", help="문장별 근거를 JSON으로 출력")
+    parser.add_argument("--at", metavar="START:END", help="문자 범위의 근거 소스 조회")
+    args = parser.parse_args()
+
+    results = load_results(args.input, args.provider)
+    output = []
+    for result in results:
+        index = build_index(result)
+        if index is None:
+            print(f"⚠️ {result.get('provider', '?')}: 원본 응답(raw) 없음, 건너뜀", file=sys.stderr)
+            continue
+        print(f"📍 {result['provider']}: 구간 {len(index)}개, 소스 {len(index.sources)}개", file=sys.stderr)
+        if args.at:
+            start, _, end = args.at.partition(":")
+            start = int(start)
+            found = index.sources_for(start, int(end) if end else None)
+            output.append({"provider": result["provider"], "range": [start, int(end) if end else start + 1], "sources": found})
+        elif args.json:
+            output.append({"provider": result["provider"], "sentences": index.sentences(), "sources": index.sources})
+        else:
+            print(f"## {result['provider']}\n\n{render_footnotes(index, result['provider'])}")
+    if args.at or args.json:
+        print(json.dumps(output, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
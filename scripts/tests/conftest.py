@@ -0,0 +1,5 @@
+import os
+import sys
+
+# scripts/ 모듈은 패키지가 아니라 스크립트 디렉토리 기준으로 import하므로 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,39 @@
+import multiprocessing
+
+from anthropic_tuning import load_stats, marginal_yields, record_steps
+
+STEP = {"new_sources": 3, "new_citations": 0}
+
+
+def test_early_stop_records_zero_yield_up_to_max_uses(tmp_path):
+    path = str(tmp_path / "stats.json")
+    record_steps("search", [STEP, STEP], used=2, max_uses=5, path=path)
+    entry = load_stats(path)["search"]
+    assert entry["samples"] == [1, 1, 1, 1, 1]
+    assert entry["yield_sum"] == [3.0, 3.0, 0.0, 0.0, 0.0]
+    assert entry["cap_hits"] == 0
+
+
+def test_capped_run_records_only_observed_steps(tmp_path):
+    path = str(tmp_path / "stats.json")
+    for _ in range(3):
+        record_steps("search", [STEP] * 3, used=3, max_uses=3, path=path)
+    entry = load_stats(path)["search"]
+    assert entry["samples"] == [3, 3, 3]
+    assert entry["cap_hits"] == 3
+    assert marginal_yields(entry) == [3.0, 3.0, 3.0]
+
+
+def _record_many(path, count):
+    for _ in range(count):
+        record_steps("deep", [STEP], used=1, max_uses=1, path=path)
+
+
+def test_concurrent_processes_do_not_lose_updates(tmp_path):
+    path = str(tmp_path / "stats.json")
+    procs = [multiprocessing.Process(target=_record_many, args=(path, 20)) for _ in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+    assert load_stats(path)["deep"]["runs"] == 80
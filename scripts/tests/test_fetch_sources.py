@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import fetch_sources
+from fetch_sources import fetch_all_async
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            if self.path == "/redirect":
+                self._send(302, headers=[("Location", "/page")])
+            elif self.path == "/page":
+                self._send(200, "<html><head><title>제목</title></head><body><p>본문</p></body></html>".encode())
+            elif self.path == "/binary":
+                self._send(200, b"\x89PNG\r\n\x1a\n" + bytes(256), content_type="application/octet-stream")
+            elif self.path.startswith("/slow"):
+                time.sleep(1.5)
+                self._send(200, b"<p>late</p>")
+            elif self.path.startswith("/trickle"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", "100")
+                self.end_headers()
+                for _ in range(100):
+                    self.wfile.write(b"x")
+                    self.wfile.flush()
+                    time.sleep(0.05)
+            elif self.path.startswith("/hold"):
+                time.sleep(0.2)
+                self._send(200, b"<p>ok</p>")
+            else:
+                self._send(404, b"not found")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with server.lock:
+                server.active -= 1
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    httpd.lock = threading.Lock()
+    httpd.active = 0
+    httpd.max_active = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def fetch(urls, **kwargs):
+    return asyncio.run(fetch_all_async(urls, cache_dir=None, **kwargs))
+
+
+def test_redirect_follows_to_final_url(server):
+    _, base = server
+    [record] = fetch([f"{base}/redirect"])
+    assert record["status"] == 200
+    assert record["final_url"] == f"{base}/page"
+    assert record["title"] == "제목"
+    assert record["text"] == "본문"
+
+
+def test_non_html_keeps_status_without_text(server):
+    _, base = server
+    [record] = fetch([f"{base}/binary"])
+    assert record["status"] == 200
+    assert record["content_type"] == "image/unknown"
+    assert record["text"] == ""
+    assert record["bytes"] == 264
+
+
+def test_missing_page_records_status(server):
+    _, base = server
+    [record] = fetch([f"{base}/missing"])
+    assert record["status"] == 404
+    assert record["error"] is None
+
+
+@pytest.mark.parametrize("path", ["/slow", "/trickle"])
+def test_timeout_bounds_whole_fetch(server, path):
+    _, base = server
+    started = time.monotonic()
+    [record] = fetch([f"{base}{path}"], timeout=0.5)
+    assert record["status"] is None
+    assert record["error"] == "시간 초과 (0.5초)"
+    assert time.monotonic() - started < 1.4
+
+
+def test_per_domain_limit(server):
+    httpd, base = server
+    records = fetch([f"{base}/hold/{i}" for i in range(6)], concurrency=8, per_domain=2)
+    assert [r["status"] for r in records] == [200] * 6
+    assert httpd.max_active == 2
+
+
+def test_timed_out_fetch_keeps_domain_slot(server, monkeypatch):
+    # 시간 초과된 요청의 스레드가 끝나기 전에 다음 요청이 같은 도메인에 나가면 안 됨
+    _, base = server
+    lock = threading.Lock()
+    running = {"now": 0, "max": 0}
+    real_fetch_url = fetch_sources.fetch_url
+
+    def counting_fetch_url(*args):
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        try:
+            return real_fetch_url(*args)
+        finally:
+            with lock:
+                running["now"] -= 1
+
+    monkeypatch.setattr(fetch_sources, "fetch_url", counting_fetch_url)
+    records = fetch([f"{base}/trickle/{i}" for i in range(3)], per_domain=1, timeout=0.3)
+    assert all(r["error"] == "시간 초과 (0.3초)" for r in records)
+    assert running["max"] == 1
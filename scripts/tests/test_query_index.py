@@ -0,0 +1,44 @@
+import pytest
+
+from query_index import DEFAULT_THRESHOLD, find_similar, remember, similarity, tokenize
+
+REUSE_PAIRS = [
+    ("GLP-1 부작용", "GLP-1 부작용 정리해줘"),
+    ("GLP-1 부작용", "GLP-1 부작용이 있나요"),
+    ("GLP-1 부작용", "GLP-1 side effects 부작용 정리"),
+]
+
+DISTINCT_PAIRS = [
+    ("tesla stock", "tesla stock 2023 crash"),
+    ("GLP-1 부작용 2023", "GLP-1 부작용 2024"),
+    ("GLP-1 부작용", "GLP-1 부작용이 없나요"),
+]
+
+
+@pytest.mark.parametrize("cached, query", REUSE_PAIRS)
+def test_near_duplicates_reach_threshold(cached, query):
+    assert similarity(tokenize(cached), tokenize(query)) >= DEFAULT_THRESHOLD
+
+
+def test_request_suffixes_and_particles_are_stripped():
+    assert tokenize("GLP-1 부작용 정리해줘") == tokenize("GLP-1 부작용")
+    assert tokenize("GLP-1 부작용이 있나요") == tokenize("GLP-1 부작용")
+
+
+def test_broader_query_stays_below_threshold():
+    assert similarity(tokenize("tesla stock"), tokenize("tesla stock 2023 crash")) < DEFAULT_THRESHOLD
+
+
+@pytest.mark.parametrize("cached, query", REUSE_PAIRS)
+def test_find_similar_reuses(tmp_path, cached, query):
+    db = str(tmp_path / "index.db")
+    remember(cached, "openai|{}", {"answer": cached}, db_path=db)
+    match = find_similar(query, "openai|{}", db_path=db)
+    assert match is not None and match["result"] == {"answer": cached}
+
+
+@pytest.mark.parametrize("cached, query", DISTINCT_PAIRS)
+def test_find_similar_rejects_different_questions(tmp_path, cached, query):
+    db = str(tmp_path / "index.db")
+    remember(cached, "openai|{}", {"answer": cached}, db_path=db)
+    assert find_similar(query, "openai|{}", db_path=db) is None
@@ -0,0 +1,57 @@
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+class TwoArgError(Exception):
+    def __init__(self, response_id, status):
+        super().__init__(f"{response_id} {status}")
+        self.response_id = response_id
+        self.status = status
+
+
+def run_coalesced(error, waiters=3):
+    """선두 호출이 error로 끝날 때 기다리던 호출들이 받은 예외 목록"""
+    group = SingleFlight()
+    release = threading.Event()
+    caught = []
+
+    def leader():
+        release.wait()
+        raise error
+
+    def call():
+        try:
+            group.do("key", leader)
+        except BaseException as e:
+            caught.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(waiters + 1)]
+    for thread in threads:
+        thread.start()
+    while group.counters["coalesced"] < waiters:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert group.counters["executed"] == 1 and group.counters["errors"] == 1
+    return caught
+
+
+@pytest.mark.parametrize("error", [RuntimeError("boom"), SystemExit(1), TwoArgError("resp_1", "queued")])
+def test_each_waiter_gets_its_own_exception(error):
+    caught = run_coalesced(error)
+    assert len(caught) == 4
+    assert len({id(e) for e in caught}) == 4
+    assert all(type(e) is type(error) and str(e) == str(error) for e in caught)
+    assert sum(e is error for e in caught) == 1
+    assert all(e.__cause__ is error for e in caught if e is not error)
+
+
+def test_copied_exceptions_keep_attributes():
+    caught = run_coalesced(TwoArgError("resp_1", "queued"))
+    assert {(e.response_id, e.status) for e in caught} == {("resp_1", "queued")}
+    assert {e.code for e in run_coalesced(SystemExit(1))} == {1}
@@ -0,0 +1,708 @@
+#!/usr/bin/env python3
+"""
+이전 답변 로컬 벡터 인덱스 (메모리 매핑 float32 + IVF)
+multi_search 답변 본문(extract_response 출력)을 문단 단위 청크로 나눠 임베딩하고,
+DB 없이 의미가 비슷한 이전 조사를 밀리초 단위로 찾습니다. (웹 앱의 pgvector ivfflat 검색에 대응)
+
+- 임베더: 기본은 로컬 해싱 임베더(영숫자 단어 + 한글 음절 bigram → 부호 있는 feature hashing, L2 정규화).
+  --embedder "모듈:팩토리"로 교체 가능 (embed(texts) → 벡터 목록, dim, spec 속성을 가진 객체)
+- 저장: 벡터는 행 단위 float32 파일(vectors.<세대>.f32)에 추가만 하고 mmap으로 읽음.
+  청크 메타데이터, 중심점, 현재 벡터 파일 세대는 SQLite(vectors.db)에 기록
+- 색인: 구형 k-means 중심점(√n개)으로 나눈 IVF 목록 중 가까운 nprobe개만 내적 계산.
+  학습(k-means)은 add()에서 하지 않고 train/compact 명령에서만 실행 — 행이 TRAIN_MIN개를 넘거나 학습 시점의
+  RETRAIN_FACTOR배가 되면 add/stats가 train 실행을 안내함. 학습 후 추가된 행(목록 미배정)은 검색 때 항상 함께 비교
+- 압축(compact): 삭제/오래된/대체된 청크를 빼고 새 세대 파일로 다시 쓴 뒤 재학습.
+  행 번호와 세대 전환은 한 트랜잭션에서 바꾸므로 중간에 중단되어도 이전 세대가 그대로 유지됨
+
+사용법:
+    python3 scripts/multi_search.py similar "GLP-1 부작용"            # 비슷한 이전 답변
+    python3 scripts/vector_store.py similar "반도체 수출 규제" --k 10 --provider openai
+    python3 scripts/vector_store.py add results.ndjson                # NDJSON/--raw 결과 추가
+    python3 scripts/vector_store.py add --from-history                # 검색 이력(search_history) 전체 추가
+    python3 scripts/vector_store.py train                             # IVF 중심점 (재)학습
+    python3 scripts/vector_store.py compact --older-than-days 90 --keep-latest
+    python3 scripts/vector_store.py stats
+"""
+
+import argparse
+import hashlib
+import heapq
+import importlib
+import json
+import math
+import mmap
+import os
+import random
+import re
+import sqlite3
+import sys
+import time
+from array import array
+from collections import Counter
+from datetime import datetime
+
+from query_index import STOPWORDS, normalize
+
+CACHE_DIR = os.environ.get("REAL_RESEARCH_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "real-research")
+STORE_DIR = os.path.join(CACHE_DIR, "vectors")
+
+DEFAULT_EMBEDDER = "hashing"
+DEFAULT_DIM = 512
+CHUNK_CHARS = 800
+MIN_CHUNK_CHARS = 40
+DEFAULT_NPROBE = 4
+TRAIN_MIN = 256
+RETRAIN_FACTOR = 4
+MAX_LISTS = 256
+TRAIN_SAMPLE_PER_LIST = 32
+KMEANS_ITERATIONS = 6
+
+# extract_response가 본문 뒤에 붙이는 인용/소스 목록 구분선
+_SOURCES_BREAK = re.compile(r"\n-{3,}\n")
+_PARAGRAPH = re.compile(r"\n\s*\n")
+_TOKEN = re.compile(r"[a-z0-9]+|[가-힣]+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value BLOB
+);
+CREATE TABLE IF NOT EXISTS chunk (
+    row INTEGER PRIMARY KEY,
+    list_id INTEGER,
+    result_key TEXT NOT NULL,
+    query TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    text TEXT NOT NULL,
+    digest TEXT NOT NULL UNIQUE,
+    created_at REAL NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_chunk_list ON chunk(list_id);
+CREATE INDEX IF NOT EXISTS idx_chunk_result ON chunk(result_key);
+"""
+
+
+# ---------------------------------------------------------------------------
+# 임베더
+# ---------------------------------------------------------------------------
+
+
+class HashingEmbedder:
+    """
+    모델 없이 쓰는 로컬 임베더. 토큰 빈도(1 + log tf)를 부호 있는 해시로 dim개 버킷에 더한 뒤 L2 정규화.
+    한국어는 조사가 붙어도 겹치도록 음절 bigram을 씁니다 (query_index.tokenize와 같은 방식).
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        self.dim = dim
+        self.spec = f"hashing:{dim}"
+
+    def tokens(self, text: str) -> Counter:
+        counts = Counter()
+        for word in _TOKEN.findall(normalize(text)):
+            if word in STOPWORDS:
+                continue
+            if word[0] < "가" or len(word) == 1:
+                counts[word] += 1
+            else:
+                counts.update(word[i:i + 2] for i in range(len(word) - 1))
+        return counts
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.dim
+            for token, tf in self.tokens(text).items():
+                h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+                vector[h % self.dim] += (1.0 if h >> 63 else -1.0) * (1.0 + math.log(tf))
+            norm = math.sqrt(sum(v * v for v in vector))
+            vectors.append([v / norm for v in vector] if norm else vector)
+        return vectors
+
+
+def load_embedder(spec: str | None = None):
+    """
+    임베더 사양 → 임베더 객체.
+
+    - "hashing" / "hashing:1024": 로컬 해싱 임베더 (차원 지정 가능)
+    - "모듈:팩토리": 팩토리()가 embed(texts), dim, spec을 가진 객체를 반환 (예: 로컬 sentence-transformers 래퍼)
+    """
+    spec = spec or DEFAULT_EMBEDDER
+    name, _, arg = spec.partition(":")
+    if name == "hashing":
+        return HashingEmbedder(int(arg) if arg else DEFAULT_DIM)
+    if not arg:
+        raise ValueError(f"알 수 없는 임베더: {spec} (hashing[:차원] 또는 모듈:팩토리)")
+    embedder = getattr(importlib.import_module(name), arg)()
+    if not hasattr(embedder, "spec"):
+        embedder.spec = spec
+    return embedder
+
+
+# ---------------------------------------------------------------------------
+# 청크
+# ---------------------------------------------------------------------------
+
+
+def chunk_answer(text: str, max_chars: int = CHUNK_CHARS) -> list[str]:
+    """답변 본문(인용/소스 목록 제외)을 문단 경계에서 max_chars 이하 청크로 묶음"""
+    body = _SOURCES_BREAK.split(text, maxsplit=1)[0]
+    chunks, current = [], ""
+    for paragraph in _PARAGRAPH.split(body):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        while len(paragraph) > max_chars:
+            # 문단 하나가 너무 길면 문장 경계(없으면 글자 수)에서 자름
+            cut = max(paragraph.rfind(". ", 0, max_chars), paragraph.rfind("다. ", 0, max_chars))
+            cut = cut + 1 if cut > max_chars // 2 else max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return [c for c in chunks if len(c) >= MIN_CHUNK_CHARS]
+
+
+# ---------------------------------------------------------------------------
+# 벡터 연산 (희소 질의 벡터 × mmap 행)
+# ---------------------------------------------------------------------------
+
+
+def _sparse(vector) -> list[tuple[int, float]]:
+    return [(j, v) for j, v in enumerate(vector) if v]
+
+
+def _nearest(sparse: list[tuple[int, float]], columns: list[list[float]], nlist: int, top: int = 1) -> list[int]:
+    """희소 벡터와 가장 가까운(내적이 큰) 중심점 번호. columns는 차원별 중심점 값(전치 행렬)"""
+    scores = [0.0] * nlist
+    for j, v in sparse:
+        scores = [s + v * c for s, c in zip(scores, columns[j])]
+    if top == 1:
+        return [max(range(nlist), key=scores.__getitem__)]
+    return heapq.nlargest(top, range(nlist), key=scores.__getitem__)
+
+
+def _transpose(centroids: list[list[float]], dim: int) -> list[list[float]]:
+    return [[c[j] for c in centroids] for j in range(dim)]
+
+
+def train_centroids(vectors: list[list[tuple[int, float]]], dim: int, nlist: int, seed: int = 0) -> list[list[float]]:
+    """희소 벡터 표본으로 구형 k-means (중심점은 L2 정규화, 빈 목록은 이전 중심점 유지)"""
+    rng = random.Random(seed)
+    centroids = []
+    for sparse in rng.sample(vectors, nlist):
+        dense = [0.0] * dim
+        for j, v in sparse:
+            dense[j] = v
+        centroids.append(dense)
+    for _ in range(KMEANS_ITERATIONS):
+        columns = _transpose(centroids, dim)
+        sums = [[0.0] * dim for _ in range(nlist)]
+        counts = [0] * nlist
+        for sparse in vectors:
+            best = _nearest(sparse, columns, nlist)[0]
+            counts[best] += 1
+            target = sums[best]
+            for j, v in sparse:
+                target[j] += v
+        for i in range(nlist):
+            norm = math.sqrt(sum(v * v for v in sums[i]))
+            if counts[i] and norm:
+                centroids[i] = [v / norm for v in sums[i]]
+    return centroids
+
+
+class VectorStore:
+    """
+    디렉토리 하나에 저장된 벡터 인덱스. 여러 프로세스가 동시에 add해도 되도록 쓰기는
+    SQLite 쓰기 잠금(BEGIN IMMEDIATE) 안에서 벡터 파일 추가 → 행 기록 순으로 수행합니다.
+    """
+
+    def __init__(self, directory: str = STORE_DIR, embedder: str | None = None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.conn = sqlite3.connect(os.path.join(directory, "vectors.db"), timeout=60, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        stored = self._meta("embedder")
+        if stored and embedder and load_embedder(embedder).spec != stored:
+            raise ValueError(
+                f"저장소 임베더({stored})와 다른 임베더({embedder}) — compact --embedder로 다시 임베딩하세요"
+            )
+        self.embedder = load_embedder(stored or embedder)
+        self.dim = self.embedder.dim
+        if not stored:
+            self._set_meta("embedder", self.embedder.spec)
+            self._set_meta("generation", "0")
+        self._map = None
+        self._view = None
+        self._mapped_path = None
+        self._centroid_cache = (None, None, None)
+        self._recover()
+
+    # -- 메타데이터 --
+
+    def _meta(self, key: str, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key: str, value) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _vector_path(self, generation: str | None = None) -> str:
+        return os.path.join(self.directory, f"vectors.{generation or self._meta('generation', '0')}.f32")
+
+    def _recover(self) -> None:
+        """중단된 add가 남긴 기록되지 않은 벡터 행을 잘라냄"""
+        path = self._vector_path()
+        if not os.path.exists(path):
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = (self.conn.execute("SELECT max(row) FROM chunk").fetchone()[0] or -1) + 1
+            if os.path.getsize(path) > rows * self.dim * 4:
+                with open(path, "r+b") as f:
+                    f.truncate(rows * self.dim * 4)
+        finally:
+            self.conn.execute("COMMIT")
+
+    def _centroids(self):
+        """(중심점 목록, 전치 행렬, 목록 수) — 학습 전이면 (None, None, 0)"""
+        blob = self._meta("centroids")
+        if blob is None:
+            return None, None, 0
+        cached_blob, centroids, columns = self._centroid_cache
+        if cached_blob != blob:
+            flat = array("f")
+            flat.frombytes(blob)
+            centroids = [list(flat[i:i + self.dim]) for i in range(0, len(flat), self.dim)]
+            columns = _transpose(centroids, self.dim)
+            self._centroid_cache = (blob, centroids, columns)
+        return centroids, columns, len(centroids)
+
+    # -- 벡터 파일 --
+
+    def _vectors(self):
+        """현재 세대 벡터 파일의 float32 memoryview (파일이 커졌으면 다시 매핑)"""
+        path = self._vector_path()
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if self._view is None or self._mapped_path != path or len(self._view) * 4 != size:
+            self.close_map()
+            if not size:
+                return memoryview(b"").cast("f")
+            with open(path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._map).cast("f")
+            self._mapped_path = path
+        return self._view
+
+    def close_map(self) -> None:
+        if self._view is not None:
+            self._view.release()
+            self._map.close()
+        self._map = self._view = self._mapped_path = None
+
+    def close(self) -> None:
+        self.close_map()
+        self.conn.close()
+
+    # -- 추가 --
+
+    def add(self, query: str, provider: str, mode: str, text: str, created_at: float | None = None) -> int:
+        """
+        답변 하나를 청크로 나눠 추가. 추가한 청크 수 반환.
+        이미 있는 청크(같은 프로바이더·같은 내용)는 벡터를 다시 쓰지 않고, 이 답변이 더 새로우면 그 청크를
+        이 답변 소속(result_key, 검색어, 모드, 시각)으로 옮깁니다. 그래야 compact --keep-latest가 최신 답변과
+        겹치는 문단을 지우지 않고, similar도 그 문단을 최신 답변으로 보여 줌
+        """
+        created_at = created_at or time.time()
+        result_key = hashlib.sha1(f"{provider}\x1f{query}\x1f{created_at}".encode("utf-8")).hexdigest()[:16]
+        chunks = []
+        for chunk in chunk_answer(text):
+            digest = hashlib.sha1(f"{provider.lower()}\x1f{chunk}".encode("utf-8")).hexdigest()
+            chunks.append((chunk, digest))
+        if not chunks:
+            return 0
+        existing = {
+            r[0] for r in self.conn.execute(
+                f"SELECT digest FROM chunk WHERE digest IN ({','.join('?' * len(chunks))})", [d for _, d in chunks]
+            )
+        }
+        if existing:
+            self.conn.executemany(
+                "UPDATE chunk SET result_key = ?, query = ?, mode = ?, created_at = ? WHERE digest = ? AND created_at < ?",
+                [(result_key, query, mode, created_at, d, created_at) for d in existing],
+            )
+        chunks = [(c, d) for c, d in dict((d, (c, d)) for c, d in chunks).values() if d not in existing]
+        if not chunks:
+            return 0
+        vectors = self.embedder.embed([c for c, _ in chunks])
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            path = self._vector_path()
+            row = (os.path.getsize(path) if os.path.exists(path) else 0) // (self.dim * 4)
+            _, columns, nlist = self._centroids()
+            records = []
+            with open(path, "ab") as f:
+                for (chunk, digest), vector in zip(chunks, vectors):
+                    f.write(array("f", vector).tobytes())
+                    list_id = _nearest(_sparse(vector), columns, nlist)[0] if nlist else None
+                    records.append((row, list_id, result_key, query, provider, mode, chunk, digest, created_at))
+                    row += 1
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO chunk (row, list_id, result_key, query, provider, mode, text, digest, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                records,
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return len(records)
+
+    def add_result(self, query: str, result: dict, mode: str) -> int:
+        """multi_search 결과 dict 하나 추가 (실패/재사용 결과는 건너뜀)"""
+        if result.get("status") != "success" or result.get("reused_from"):
+            return 0
+        return self.add(query, result["provider"], mode, result.get("text", ""))
+
+    # -- IVF 학습 --
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT count(*) FROM chunk WHERE deleted = 0").fetchone()[0]
+
+    def needs_training(self) -> bool:
+        """처음 학습할 만큼(TRAIN_MIN) 쌓였거나 학습 시점의 RETRAIN_FACTOR배가 되었는지"""
+        n = self.count()
+        trained = int(self._meta("trained_rows", 0) or 0)
+        return n >= TRAIN_MIN and (not trained or n >= trained * RETRAIN_FACTOR)
+
+    def train(self) -> int:
+        """현재 행으로 IVF 중심점을 다시 학습하고 모든 행의 목록을 다시 배정. 목록 수 반환"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = [r[0] for r in self.conn.execute("SELECT row FROM chunk WHERE deleted = 0 ORDER BY row")]
+            nlist = max(1, min(MAX_LISTS, int(math.sqrt(len(rows)))))
+            if len(rows) < TRAIN_MIN:
+                self.conn.execute("UPDATE chunk SET list_id = NULL")
+                self.conn.execute("DELETE FROM meta WHERE key IN ('centroids', 'trained_rows')")
+                self.conn.execute("COMMIT")
+                return 0
+            view = self._vectors()
+            dim = self.dim
+            sample = random.Random(len(rows)).sample(rows, min(len(rows), nlist * TRAIN_SAMPLE_PER_LIST))
+            centroids = train_centroids([_sparse(view[r * dim:(r + 1) * dim]) for r in sample], dim, nlist)
+            columns = _transpose(centroids, dim)
+            self.conn.executemany(
+                "UPDATE chunk SET list_id = ? WHERE row = ?",
+                ((_nearest(_sparse(view[r * dim:(r + 1) * dim]), columns, nlist)[0], r) for r in rows),
+            )
+            self._set_meta("centroids", array("f", [v for c in centroids for v in c]).tobytes())
+            self._set_meta("trained_rows", str(len(rows)))
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        print(f"🧭 벡터 인덱스 학습: {len(rows)}행, 목록 {nlist}개", file=sys.stderr)
+        return nlist
+
+    # -- 검색 --
+
+    def similar(
+        self,
+        text: str,
+        k: int = 5,
+        nprobe: int = DEFAULT_NPROBE,
+        provider: str | None = None,
+        mode: str | None = None,
+        per_result: bool = True,
+    ) -> list[dict]:
+        """
+        text와 비슷한 청크 상위 k개 (코사인 유사도 순).
+        per_result=True면 같은 답변에서는 가장 비슷한 청크 하나만 반환합니다.
+
+        반환 항목: {"score", "query", "provider", "mode", "text", "created_at", "row"}
+        """
+        query_vector = _sparse(self.embedder.embed([text])[0])
+        if not query_vector:
+            return []
+        _, columns, nlist = self._centroids()
+        sql = "SELECT row, result_key FROM chunk WHERE deleted = 0"
+        params = []
+        if nlist:
+            probe = _nearest(query_vector, columns, nlist, top=min(nprobe, nlist))
+            # 학습 후 압축 전 다른 프로세스가 추가한 행(list_id 없음)도 포함
+            sql += f" AND (list_id IN ({','.join('?' * len(probe))}) OR list_id IS NULL)"
+            params += probe
+        if provider:
+            sql += " AND lower(provider) = ?"
+            params.append(provider.lower())
+        if mode:
+            sql += " AND mode = ?"
+            params.append(mode)
+
+        view = self._vectors()
+        dim = self.dim
+        limit = len(view) // dim
+        best = {}
+        for row, result_key in self.conn.execute(sql, params):
+            if row >= limit:
+                continue
+            base = row * dim
+            score = sum(v * view[base + j] for j, v in query_vector)
+            key = result_key if per_result else row
+            if key not in best or score > best[key][0]:
+                best[key] = (score, row)
+        top = heapq.nlargest(k, best.values())
+        if not top:
+            return []
+        rows = {
+            r["row"]: dict(r) for r in self.conn.execute(
+                f"SELECT row, query, provider, mode, text, created_at FROM chunk WHERE row IN ({','.join('?' * len(top))})",
+                [row for _, row in top],
+            )
+        }
+        return [{"score": round(score, 4), **rows[row]} for score, row in top if row in rows]
+
+    # -- 압축 --
+
+    def compact(
+        self,
+        older_than_days: float | None = None,
+        keep_latest: bool = False,
+        embedder: str | None = None,
+    ) -> dict:
+        """
+        삭제 표시/오래된(older_than_days)/대체된(keep_latest: 같은 검색어·프로바이더·모드의 최신 답변만 유지) 청크를
+        빼고 새 세대 벡터 파일로 다시 쓴 뒤 IVF를 다시 학습. embedder를 주면 모든 청크를 다시 임베딩합니다.
+        """
+        new_embedder = load_embedder(embedder) if embedder else self.embedder
+        if new_embedder.spec == self.embedder.spec:
+            new_embedder = self.embedder
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            if older_than_days is not None:
+                self.conn.execute(
+                    "UPDATE chunk SET deleted = 1 WHERE created_at < ?", (time.time() - older_than_days * 86400,)
+                )
+            if keep_latest:
+                self.conn.execute(
+                    """
+                    UPDATE chunk SET deleted = 1 WHERE created_at < (
+                        SELECT max(c.created_at) FROM chunk c
+                        WHERE c.query = chunk.query AND c.provider = chunk.provider AND c.mode = chunk.mode
+                    )
+                    """
+                )
+            before = self.conn.execute("SELECT count(*) FROM chunk").fetchone()[0]
+            self.conn.execute("DELETE FROM chunk WHERE deleted = 1")
+            live = self.conn.execute("SELECT row, text FROM chunk ORDER BY row").fetchall()
+
+            generation = str(int(self._meta("generation", "0")) + 1)
+            new_path = self._vector_path(generation)
+            view = self._vectors()
+            with open(new_path, "wb") as f:
+                if new_embedder is not self.embedder:
+                    for i in range(0, len(live), 64):
+                        batch = new_embedder.embed([r["text"] for r in live[i:i + 64]])
+                        f.write(b"".join(array("f", v).tobytes() for v in batch))
+                else:
+                    for r in live:
+                        f.write(view[r["row"] * self.dim:(r["row"] + 1) * self.dim].tobytes())
+            # 행 번호를 0부터 다시 매김 (새 번호 ≤ 이전 번호이므로 오름차순 갱신은 충돌 없음)
+            self.conn.executemany(
+                "UPDATE chunk SET row = ?, list_id = NULL WHERE row = ?", ((i, r["row"]) for i, r in enumerate(live))
+            )
+            old_path = self._vector_path()
+            self._set_meta("generation", generation)
+            self._set_meta("embedder", new_embedder.spec)
+            self.conn.execute("DELETE FROM meta WHERE key IN ('centroids', 'trained_rows')")
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.close_map()
+        self.embedder, self.dim = new_embedder, new_embedder.dim
+        if os.path.exists(old_path) and old_path != new_path:
+            os.remove(old_path)
+        # 이전에 중단된 압축이 남긴 파일 정리
+        for name in os.listdir(self.directory):
+            if name.startswith("vectors.") and name.endswith(".f32") and os.path.join(self.directory, name) != new_path:
+                os.remove(os.path.join(self.directory, name))
+        nlist = self.train()
+        return {"removed": before - len(live), "rows": len(live), "lists": nlist}
+
+    def stats(self) -> dict:
+        path = self._vector_path()
+        trained = int(self._meta("trained_rows", 0) or 0)
+        return {
+            "rows": self.count(),
+            "deleted": self.conn.execute("SELECT count(*) FROM chunk WHERE deleted = 1").fetchone()[0],
+            "answers": self.conn.execute("SELECT count(DISTINCT result_key) FROM chunk").fetchone()[0],
+            "lists": self._centroids()[2],
+            "trained_rows": trained,
+            "unassigned": self.conn.execute("SELECT count(*) FROM chunk WHERE list_id IS NULL").fetchone()[0],
+            "needs_training": self.needs_training(),
+            "embedder": self.embedder.spec,
+            "bytes": os.path.getsize(path) if os.path.exists(path) else 0,
+        }
+
+
+def open_store(directory: str = STORE_DIR, embedder: str | None = None) -> VectorStore:
+    return VectorStore(directory, embedder)
+
+
+# ---------------------------------------------------------------------------
+# 입력 읽기
+# ---------------------------------------------------------------------------
+
+
+def iter_result_file(path: str, default_query: str = ""):
+    """multi_search --ndjson / --raw 출력 → (query, mode, result) 목록"""
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        data = [json.loads(line) for line in content.splitlines() if line.strip()]
+    if isinstance(data, dict):
+        data = [data]
+    for item in data:
+        if "results" in item:
+            # 배치 --raw 형식: [{"query", "results": [...]}]
+            for result in item["results"]:
+                yield item["query"], result.get("mode", "search"), result
+        else:
+            yield item.get("query", default_query), item.get("mode", "search"), item
+
+
+def iter_history(db_path: str | None = None):
+    """search_history 인덱스의 모든 결과 → (query, mode, provider, text, created_at)"""
+    import search_history
+
+    db_path = db_path or search_history.DB_PATH
+    if not os.path.exists(db_path):
+        return
+    conn = search_history.connect(db_path)
+    try:
+        yield from conn.execute(
+            "SELECT run.query, run.mode, result.provider, result.text, result.created_at "
+            "FROM result JOIN run ON run.id = result.run_id ORDER BY result.id"
+        )
+    finally:
+        conn.close()
+
+
+def format_similar(text: str, hits: list[dict], elapsed_ms: float) -> str:
+    report = f"# 🧭 비슷한 이전 답변: {text}\n\n"
+    if not hits:
+        return report + "_비슷한 이전 답변이 없습니다._\n"
+    for hit in hits:
+        when = datetime.fromtimestamp(hit["created_at"]).strftime("%Y-%m-%d %H:%M")
+        snippet = " ".join(hit["text"].split())
+        snippet = snippet[:300] + ("…" if len(snippet) > 300 else "")
+        report += f"## {hit['score']:.3f} · {hit['provider']} · {when} · _{hit['query']}_ ({hit['mode']})\n\n> {snippet}\n\n"
+    return report + f"_{len(hits)}건, {elapsed_ms:.1f}ms_\n"
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="vector_store.py", description="이전 답변 로컬 벡터 인덱스")
+    parser.add_argument("--store", default=STORE_DIR, help=f"저장소 디렉토리 (기본: {STORE_DIR})")
+    parser.add_argument("--embedder", default=None, help="임베더 (hashing[:차원] | 모듈:팩토리, 기본: 저장소 설정 또는 hashing)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_similar = sub.add_parser("similar", help="비슷한 이전 답변 검색")
+    p_similar.add_argument("text", help="찾을 주제, 질문 또는 문단")
+    p_similar.add_argument("--k", type=int, default=5, help="결과 수 (기본: 5)")
+    p_similar.add_argument("--nprobe", type=int, default=DEFAULT_NPROBE, help=f"탐색할 IVF 목록 수 (기본: {DEFAULT_NPROBE})")
+    p_similar.add_argument("--provider", choices=["openai", "anthropic", "gemini"], help="프로바이더 필터")
+    p_similar.add_argument("--mode", choices=["search", "verify", "deep"], help="검색 모드 필터")
+    p_similar.add_argument("--chunks", action="store_true", help="답변당 하나가 아니라 청크 단위로 출력")
+    p_similar.add_argument("--json", action="store_true", help="JSON으로 출력")
+
+    p_add = sub.add_parser("add", help="결과 파일 또는 검색 이력 추가")
+    p_add.add_argument("inputs", nargs="*", help="multi_search --ndjson / --raw 출력 파일")
+    p_add.add_argument("--query", default="", help="검색어 필드가 없는 --raw 파일의 검색어")
+    p_add.add_argument("--from-history", action="store_true", help="로컬 검색 이력(search_history) 전체 추가")
+
+    p_compact = sub.add_parser("compact", help="삭제/오래된 청크 제거 후 다시 쓰고 재학습")
+    p_compact.add_argument("--older-than-days", type=float, default=None, help="N일보다 오래된 청크 제거")
+    p_compact.add_argument("--keep-latest", action="store_true", help="같은 검색어·프로바이더·모드는 최신 답변만 유지")
+
+    p_train = sub.add_parser("train", help="IVF 중심점 (재)학습")
+    p_train.add_argument("--if-needed", action="store_true", help="학습이 필요할 때만 실행 (cron 등 주기 실행용)")
+
+    sub.add_parser("stats", help="저장소 통계")
+
+    args = parser.parse_args(argv)
+    try:
+        store = open_store(args.store, None if args.command == "compact" else args.embedder)
+    except (ValueError, ImportError, AttributeError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        if args.command == "similar":
+            started = time.perf_counter()
+            hits = store.similar(
+                args.text, k=args.k, nprobe=args.nprobe, provider=args.provider, mode=args.mode, per_result=not args.chunks
+            )
+            elapsed = (time.perf_counter() - started) * 1000
+            if args.json:
+                print(json.dumps(hits, ensure_ascii=False, indent=2))
+            else:
+                print(format_similar(args.text, hits, elapsed))
+            print(f"🧭 {len(hits)}건 ({elapsed:.1f}ms)", file=sys.stderr)
+        elif args.command == "add":
+            if not args.inputs and not args.from_history:
+                parser.error("입력 파일 또는 --from-history를 지정하세요")
+            added = answers = 0
+            for path in args.inputs:
+                for query, mode, result in iter_result_file(path, args.query):
+                    count = store.add_result(query, result, mode)
+                    added += count
+                    answers += count > 0
+            if args.from_history:
+                for query, mode, provider, text, created_at in iter_history():
+                    count = store.add(query, provider, mode, text, created_at)
+                    added += count
+                    answers += count > 0
+            print(f"✅ 답변 {answers}건에서 청크 {added}개 추가 (전체 {store.count()}개)", file=sys.stderr)
+            if store.needs_training():
+                print("   ℹ️ IVF 학습이 필요합니다: python3 scripts/vector_store.py train", file=sys.stderr)
+        elif args.command == "train":
+            if args.if_needed and not store.needs_training():
+                print("🧭 학습이 필요하지 않습니다", file=sys.stderr)
+            elif not store.train():
+                print(f"🧭 청크가 {TRAIN_MIN}개 미만이라 학습하지 않습니다 (전체 비교로 검색)", file=sys.stderr)
+        elif args.command == "compact":
+            result = store.compact(args.older_than_days, args.keep_latest, embedder=args.embedder)
+            print(
+                f"🗜 압축 완료: {result['removed']}개 제거, {result['rows']}행, IVF 목록 {result['lists']}개",
+                file=sys.stderr,
+            )
+        elif args.command == "stats":
+            s = store.stats()
+            print(
+                f"🧭 청크 {s['rows']}개 · 답변 {s['answers']}건 · IVF 목록 {s['lists']}개 "
+                f"(학습 {s['trained_rows']}행, 미배정 {s['unassigned']}개) · {s['embedder']} · "
+                f"{s['bytes'] / 1024 / 1024:.1f}MB ({args.store})"
+            )
+            if s["needs_training"]:
+                print("   ℹ️ IVF 학습이 필요합니다: python3 scripts/vector_store.py train", file=sys.stderr)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
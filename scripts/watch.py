@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+모니터링 주제 감시 (watch)
+저장된 검색어를 주기적으로 다시 검색하고, 이전 실행과 비교해 바뀐 내용만 보고합니다.
+
+- 실행마다 프로바이더별 소스(정규화 URL)와 주장(claims) 지문을 SQLite에 저장
+- 보고 내용: 새 소스, 사라진 소스, 바뀐 주장(유사하지만 내용이 달라진 문장), 새/사라진 주장
+- 직전 실행에서 변화가 없던 프로바이더는 재확인 주기(기본: 감시 주기 x 2)가 지나기 전까지 건너뜀
+- (주제, 프로바이더) 작업을 --workers개까지 동시 실행
+- 모든 프로바이더가 실패한 주제는 5분부터 2배씩(감시 주기 이하) 늘려 가며 재시도
+
+사용법:
+    python3 scripts/multi_search.py watch add "GLP-1 부작용" --every 24
+    python3 scripts/multi_search.py watch add "반도체 수출 규제" --mode deep --providers openai,anthropic
+    python3 scripts/multi_search.py watch list
+    python3 scripts/multi_search.py watch run                  # 주기가 된 주제만 1회 실행 (cron용)
+    python3 scripts/multi_search.py watch run --all --output delta.md
+    python3 scripts/multi_search.py watch run --loop           # 다음 주기까지 대기하며 계속 실행
+    python3 scripts/multi_search.py watch remove 3
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+from claims import claim_similarity, extract_claims
+from source_utils import canonicalize_url, extract_result_sources
+
+CACHE_DIR = os.environ.get("REAL_RESEARCH_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "real-research")
+DB_PATH = os.path.join(CACHE_DIR, "watch.db")
+
+DEFAULT_INTERVAL_HOURS = 24.0
+RECHECK_FACTOR = 2.0
+RETRY_BASE_SECONDS = 300.0
+CLAIM_CHANGE_THRESHOLD = 0.5
+PROVIDERS = ["openai", "anthropic", "gemini"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS topic (
+    id INTEGER PRIMARY KEY,
+    query TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    providers TEXT NOT NULL,
+    interval_hours REAL NOT NULL,
+    created_at REAL NOT NULL,
+    last_run_at REAL,
+    failures INTEGER NOT NULL DEFAULT 0,
+    retry_at REAL,
+    UNIQUE (query, mode, lang)
+);
+CREATE TABLE IF NOT EXISTS snapshot (
+    id INTEGER PRIMARY KEY,
+    topic_id INTEGER NOT NULL REFERENCES topic(id) ON DELETE CASCADE,
+    provider TEXT NOT NULL,
+    sources TEXT NOT NULL,
+    claims TEXT NOT NULL,
+    changed INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshot_topic ON snapshot(topic_id, provider, created_at);
+"""
+
+
+def connect(db_path: str = DB_PATH) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(SCHEMA)
+    # 재시도 열이 없던 이전 DB 보강
+    columns = {r["name"] for r in conn.execute("PRAGMA table_info(topic)")}
+    if "failures" not in columns:
+        conn.execute("ALTER TABLE topic ADD COLUMN failures INTEGER NOT NULL DEFAULT 0")
+    if "retry_at" not in columns:
+        conn.execute("ALTER TABLE topic ADD COLUMN retry_at REAL")
+    conn.commit()
+    return conn
+
+
+def add_topic(
+    conn: sqlite3.Connection,
+    query: str,
+    mode: str = "search",
+    lang: str = "both",
+    providers: list[str] | None = None,
+    interval_hours: float = DEFAULT_INTERVAL_HOURS,
+) -> int:
+    """감시 주제 추가 (같은 검색어/모드/언어가 있으면 설정만 갱신). 주제 ID 반환"""
+    conn.execute(
+        """
+        INSERT INTO topic (query, mode, lang, providers, interval_hours, created_at) VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (query, mode, lang) DO UPDATE SET providers = excluded.providers, interval_hours = excluded.interval_hours
+        """,
+        (query, mode, lang, ",".join(providers or PROVIDERS), interval_hours, time.time()),
+    )
+    conn.commit()
+    return conn.execute(
+        "SELECT id FROM topic WHERE query = ? AND mode = ? AND lang = ?", (query, mode, lang)
+    ).fetchone()[0]
+
+
+def remove_topic(conn: sqlite3.Connection, topic_id: int) -> bool:
+    cur = conn.execute("DELETE FROM topic WHERE id = ?", (topic_id,))
+    conn.commit()
+    return cur.rowcount > 0
+
+
+def list_topics(conn: sqlite3.Connection) -> list[sqlite3.Row]:
+    return conn.execute("SELECT * FROM topic ORDER BY id").fetchall()
+
+
+def next_run_at(topic: sqlite3.Row) -> float:
+    """다음 실행 시각. 모든 프로바이더가 실패한 주제는 감시 주기 대신 재시도 시각(retry_at)"""
+    if topic["retry_at"] is not None:
+        return topic["retry_at"]
+    if topic["last_run_at"] is None:
+        return 0.0
+    return topic["last_run_at"] + topic["interval_hours"] * 3600
+
+
+def retry_delay(failures: int, interval_hours: float) -> float:
+    """연속 실패 횟수별 재시도 대기 (RETRY_BASE_SECONDS부터 2배씩, 감시 주기를 넘지 않음)"""
+    return min(RETRY_BASE_SECONDS * 2 ** max(0, failures - 1), interval_hours * 3600)
+
+
+def due_topics(conn: sqlite3.Connection, now: float | None = None, include_all: bool = False) -> list[sqlite3.Row]:
+    """감시 주기(실패한 주제는 재시도 시각)가 지난 주제 (include_all이면 전체)"""
+    now = now or time.time()
+    return [t for t in list_topics(conn) if include_all or now >= next_run_at(t)]
+
+
+def latest_snapshot(conn: sqlite3.Connection, topic_id: int, provider: str) -> dict | None:
+    row = conn.execute(
+        "SELECT * FROM snapshot WHERE topic_id = ? AND provider = ? ORDER BY created_at DESC LIMIT 1",
+        (topic_id, provider),
+    ).fetchone()
+    if row is None:
+        return None
+    return {
+        "sources": json.loads(row["sources"]),
+        "claims": json.loads(row["claims"]),
+        "changed": bool(row["changed"]),
+        "created_at": row["created_at"],
+    }
+
+
+def fingerprint_result(result: dict) -> dict:
+    """결과 하나의 지문: {"sources": {정규화 URL: 제목}, "claims": [{fingerprint, text, tokens}]}"""
+    refs = extract_result_sources(result)
+    sources = {}
+    for ref in refs["citations"] + refs["sources"]:
+        key = canonicalize_url(ref.get("url", ""))
+        if key and not sources.get(key):
+            sources[key] = ref.get("title", "")
+    claims = [
+        {"fingerprint": c["fingerprint"], "text": c["text"], "tokens": c["tokens"]}
+        for c in result.get("claims") or extract_claims(result.get("text", ""))
+    ]
+    return {"sources": sources, "claims": claims}
+
+
+def diff_snapshots(prev: dict, cur: dict, threshold: float = CLAIM_CHANGE_THRESHOLD) -> dict:
+    """
+    두 지문 비교.
+
+    반환: {"new_sources": [(url, title)], "dropped_sources": [...],
+           "changed_claims": [(이전 문장, 현재 문장)], "new_claims": [...], "removed_claims": [...]}
+    지문이 다른 현재 주장 중 이전 주장과 유사도 threshold 이상인 것은 "바뀐 주장"으로 봅니다.
+    """
+    new_sources = [(u, t) for u, t in cur["sources"].items() if u not in prev["sources"]]
+    dropped_sources = [(u, t) for u, t in prev["sources"].items() if u not in cur["sources"]]
+
+    prev_fps = {c["fingerprint"] for c in prev["claims"]}
+    cur_fps = {c["fingerprint"] for c in cur["claims"]}
+    unmatched_prev = [c for c in prev["claims"] if c["fingerprint"] not in cur_fps]
+    changed, new_claims = [], []
+    for claim in cur["claims"]:
+        if claim["fingerprint"] in prev_fps:
+            continue
+        tokens = set(claim["tokens"])
+        best, best_score = None, threshold
+        for old in unmatched_prev:
+            score = claim_similarity(tokens, set(old["tokens"]))
+            if score >= best_score:
+                best, best_score = old, score
+        if best is None:
+            new_claims.append(claim["text"])
+        else:
+            unmatched_prev.remove(best)
+            changed.append((best["text"], claim["text"]))
+
+    return {
+        "new_sources": new_sources,
+        "dropped_sources": dropped_sources,
+        "changed_claims": changed,
+        "new_claims": new_claims,
+        "removed_claims": [c["text"] for c in unmatched_prev],
+    }
+
+
+def has_changes(delta: dict) -> bool:
+    return any(delta.values())
+
+
+def should_skip(snapshot: dict | None, topic: sqlite3.Row, recheck_hours: float | None, now: float) -> bool:
+    """직전에 변화가 없었고 재확인 주기가 지나지 않은 프로바이더는 건너뜀"""
+    if snapshot is None or snapshot["changed"]:
+        return False
+    window = recheck_hours if recheck_hours is not None else topic["interval_hours"] * RECHECK_FACTOR
+    return now - snapshot["created_at"] < window * 3600
+
+
+def run_topics(
+    conn: sqlite3.Connection,
+    topics: list[sqlite3.Row],
+    workers: int = 3,
+    recheck_hours: float | None = None,
+) -> list[dict]:
+    """
+    주제들을 실행하고 주제별 변화 목록 반환.
+
+    반환 항목: {"topic", "providers": {provider: {"status", "delta" | "error" | None}}}
+    - status: "changed" | "unchanged" | "baseline"(첫 실행) | "skipped" | "error"
+    """
+    from multi_search import run_job
+
+    now = time.time()
+    reports = {t["id"]: {"topic": t, "providers": {}} for t in topics}
+    jobs = []
+    for topic in topics:
+        for provider in topic["providers"].split(","):
+            snapshot = latest_snapshot(conn, topic["id"], provider)
+            if should_skip(snapshot, topic, recheck_hours, now):
+                reports[topic["id"]]["providers"][provider] = {"status": "skipped"}
+            else:
+                jobs.append((topic, provider, snapshot))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(run_job, t["query"], p, t["mode"], t["lang"], None, None): (t, p, s)
+            for t, p, s in jobs
+        }
+        for future in concurrent.futures.as_completed(futures):
+            topic, provider, snapshot = futures[future]
+            entry = reports[topic["id"]]["providers"]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"status": "error", "text": str(e)}
+            if result["status"] != "success":
+                entry[provider] = {"status": "error", "error": result["text"]}
+                print(f"   ❌ [{topic['id']}] {provider} 오류: {result['text']}", file=sys.stderr)
+                continue
+
+            current = fingerprint_result(result)
+            if snapshot is None:
+                entry[provider] = {"status": "baseline", "sources": len(current["sources"])}
+                changed = True
+            else:
+                delta = diff_snapshots(snapshot, current)
+                changed = has_changes(delta)
+                entry[provider] = {"status": "changed" if changed else "unchanged", "delta": delta}
+            conn.execute(
+                "INSERT INTO snapshot (topic_id, provider, sources, claims, changed, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    topic["id"],
+                    provider,
+                    json.dumps(current["sources"], ensure_ascii=False),
+                    json.dumps(current["claims"], ensure_ascii=False),
+                    int(changed),
+                    time.time(),
+                ),
+            )
+            conn.commit()
+            print(f"   ✅ [{topic['id']}] {provider} {entry[provider]['status']}", file=sys.stderr)
+
+    # 모든 프로바이더가 실패한 주제는 last_run_at을 유지하고 지수 백오프(retry_delay)로 재시도
+    # (skipped는 최근 스냅샷이 이미 있어 건너뛴 것이므로 성공으로 침)
+    for topic in topics:
+        statuses = {e["status"] for e in reports[topic["id"]]["providers"].values()}
+        if statuses - {"error"}:
+            conn.execute(
+                "UPDATE topic SET last_run_at = ?, failures = 0, retry_at = NULL WHERE id = ?", (now, topic["id"])
+            )
+            continue
+        failures = topic["failures"] + 1
+        delay = retry_delay(failures, topic["interval_hours"])
+        conn.execute(
+            "UPDATE topic SET failures = ?, retry_at = ? WHERE id = ?", (failures, time.time() + delay, topic["id"])
+        )
+        print(
+            f"   ⚠️ [{topic['id']}] 모든 프로바이더 실패 ({failures}회 연속) — {delay / 60:.0f}분 후 다시 시도합니다",
+            file=sys.stderr,
+        )
+    conn.commit()
+    return list(reports.values())
+
+
+def format_deltas(reports: list[dict], limit: int = 20) -> str:
+    """변화가 있는 주제만 마크다운으로 (변화 없는 주제는 마지막에 한 줄 요약)"""
+    now = datetime.now().strftime("%Y-%m-%d %H:%M")
+    out = f"# 모니터링 변화 보고\n_생성일: {now}_\n\n"
+    quiet = []
+    for report in reports:
+        topic = report["topic"]
+        changed = {p: e for p, e in report["providers"].items() if e["status"] in ("changed", "baseline", "error")}
+        if not changed:
+            quiet.append(topic["query"])
+            continue
+        out += f"## {topic['query']}\n_모드: {topic['mode']} · 주제 #{topic['id']}_\n\n"
+        for provider, entry in changed.items():
+            if entry["status"] == "baseline":
+                out += f"### {provider}: 🆕 첫 실행 — 기준 스냅샷 저장 (소스 {entry['sources']}개)\n\n"
+                continue
+            if entry["status"] == "error":
+                out += f"### {provider}: ❌ 오류 — {entry['error']}\n\n"
+                continue
+            delta = entry["delta"]
+            out += f"### {provider}\n\n"
+            for label, icon, items in (
+                ("새 소스", "➕", delta["new_sources"]),
+                ("사라진 소스", "➖", delta["dropped_sources"]),
+            ):
+                if items:
+                    out += f"**{label} ({len(items)})**\n"
+                    for url, title in items[:limit]:
+                        out += f"- {icon} [{title or url}]({url})\n"
+                    if len(items) > limit:
+                        out += f"- … {len(items) - limit}개 더\n"
+                    out += "\n"
+            if delta["changed_claims"]:
+                out += f"**바뀐 주장 ({len(delta['changed_claims'])})**\n"
+                for old, new in delta["changed_claims"][:limit]:
+                    out += f"- 🔄 ~~{old}~~\n  → {new}\n"
+                out += "\n"
+            for label, icon, items in (
+                ("새 주장", "🆕", delta["new_claims"]),
+                ("사라진 주장", "🗑", delta["removed_claims"]),
+            ):
+                if items:
+                    out += f"**{label} ({len(items)})**\n"
+                    for text in items[:limit]:
+                        out += f"- {icon} {text}\n"
+                    out += "\n"
+        skipped = [p for p, e in report["providers"].items() if e["status"] in ("skipped", "unchanged")]
+        if skipped:
+            out += f"_변화 없음/건너뜀: {', '.join(skipped)}_\n\n"
+    if quiet:
+        out += f"---\n_변화 없는 주제 {len(quiet)}개: {', '.join(quiet)}_\n"
+    return out
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog="multi_search.py watch",
+        description="저장된 검색어를 주기적으로 재검색하고 변화만 보고",
+    )
+    parser.add_argument("--db", default=DB_PATH, help=f"감시 DB 경로 (기본: {DB_PATH})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_add = sub.add_parser("add", help="감시 주제 추가")
+    p_add.add_argument("query", help="검색할 주제 또는 질문")
+    p_add.add_argument("--mode", choices=["search", "verify", "deep"], default="search", help="검색 모드")
+    p_add.add_argument("--lang", choices=["ko", "en", "both"], default="both", help="검색 언어")
+    p_add.add_argument("--providers", default=",".join(PROVIDERS), help="사용할 프로바이더 (콤마 구분)")
+    p_add.add_argument(
+        "--every", type=float, default=DEFAULT_INTERVAL_HOURS, help=f"감시 주기(시간, 기본: {DEFAULT_INTERVAL_HOURS:g})"
+    )
+
+    p_remove = sub.add_parser("remove", help="감시 주제 삭제 (스냅샷 포함)")
+    p_remove.add_argument("topic_id", type=int, help="주제 ID (watch list로 확인)")
+
+    sub.add_parser("list", help="감시 주제 목록")
+
+    p_run = sub.add_parser("run", help="주기가 된 주제 실행 후 변화 보고")
+    p_run.add_argument("--all", action="store_true", help="주기와 무관하게 모든 주제 실행")
+    p_run.add_argument("--workers", type=int, default=3, help="동시 실행 수 (기본: 3)")
+    p_run.add_argument(
+        "--recheck-hours",
+        type=float,
+        default=None,
+        help="직전 실행에서 변화 없던 프로바이더를 다시 확인할 간격(시간, 기본: 감시 주기 x 2, 0이면 항상 실행)",
+    )
+    p_run.add_argument("--output", help="변화 보고서 저장 경로 (미지정 시 stdout)")
+    p_run.add_argument("--loop", action="store_true", help="종료하지 않고 다음 주기까지 대기하며 반복 실행")
+
+    args = parser.parse_args(argv)
+    conn = connect(args.db)
+    try:
+        if args.command == "add":
+            providers = [p.strip().lower() for p in args.providers.split(",") if p.strip()]
+            topic_id = add_topic(conn, args.query, args.mode, args.lang, providers, args.every)
+            print(f"👀 감시 주제 #{topic_id} 저장: '{args.query}' ({args.every:g}시간마다)", file=sys.stderr)
+        elif args.command == "remove":
+            if not remove_topic(conn, args.topic_id):
+                print(f"ERROR: 주제 #{args.topic_id} 없음", file=sys.stderr)
+                sys.exit(1)
+            print(f"🗑 감시 주제 #{args.topic_id} 삭제", file=sys.stderr)
+        elif args.command == "list":
+            for t in list_topics(conn):
+                last = datetime.fromtimestamp(t["last_run_at"]).strftime("%Y-%m-%d %H:%M") if t["last_run_at"] else "-"
+                failing = f", 연속 실패 {t['failures']}회" if t["failures"] else ""
+                print(
+                    f"#{t['id']:<4} {t['query']}  [{t['mode']}/{t['lang']}, {t['providers']}, {t['interval_hours']:g}h, "
+                    f"최근 {last}{failing}]"
+                )
+        elif args.command == "run":
+            while True:
+                topics = due_topics(conn, include_all=args.all)
+                if topics:
+                    print(f"👀 감시 주제 {len(topics)}개 실행", file=sys.stderr)
+                    report = format_deltas(run_topics(conn, topics, args.workers, args.recheck_hours))
+                    if args.output:
+                        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+                        with open(args.output, "a" if args.loop else "w", encoding="utf-8") as f:
+                            f.write(report)
+                        print(f"✅ 변화 보고서 저장: {args.output}", file=sys.stderr)
+                    else:
+                        print(report, flush=True)
+                elif not args.loop:
+                    print("💤 주기가 된 감시 주제 없음 (--all로 전체 실행)", file=sys.stderr)
+                if not args.loop:
+                    break
+                args.all = False
+                remaining = [next_run_at(t) - time.time() for t in list_topics(conn)]
+                wait = max(60.0, min(remaining, default=3600.0))
+                print(f"💤 다음 실행까지 {wait / 60:.0f}분 대기", file=sys.stderr)
+                time.sleep(wait)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()